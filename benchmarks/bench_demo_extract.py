@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: old MessageToDict + multi-pass regex extractor vs the typed fast path.
+
+    PYTHONPATH=src python benchmarks/bench_demo_extract.py [--fixtures DIR] [--number N]
+
+Without --fixtures, synthetic 30-round matches from components.steam.fixtures are used.
+"""
+
+import argparse
+import re
+import timeit
+from typing import Any, Iterable
+
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.message import Message
+
+from components.steam.demo import (
+    RE_730_PREFIX,
+    RE_FULL_DEMO_URL,
+    RE_REPLAY_HOST,
+    _demo_filename,
+    extract_demo_url,
+    extract_demo_url_scan,
+)
+from components.steam.fixtures import build_match_list, load_match_lists
+
+RE_DEMO_NAME = re.compile(r"/730/(\d+)_(\d+)\.dem")
+
+
+def _legacy_iter_strings(obj: Any) -> Iterable[str]:
+    if isinstance(obj, Message):
+        obj = MessageToDict(obj, preserving_proto_field_name=True)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield k
+            yield from _legacy_iter_strings(v)
+    elif isinstance(obj, list):
+        for x in obj:
+            yield from _legacy_iter_strings(x)
+    elif isinstance(obj, str):
+        yield obj
+
+
+def legacy_extract_demo_url(msg: Any, match_id: int, token: int) -> str | None:
+    strings = list(_legacy_iter_strings(msg))
+    for s in strings:
+        m = RE_FULL_DEMO_URL.search(s)
+        if m:
+            return m.group(0)
+    filename = _demo_filename(match_id, token)
+    for s in strings:
+        if RE_730_PREFIX.match(s.strip()):
+            return s.strip().rstrip("/") + "/" + filename
+    for s in strings:
+        m = RE_REPLAY_HOST.search(s)
+        if m:
+            return f"http://{m.group(1)}/730/{filename}"
+    return None
+
+
+def _cases(fixtures: str | None) -> list[tuple[Any, int, int]]:
+    if fixtures:
+        cases = []
+        for msg in load_match_lists(fixtures):
+            match = msg.matches[0]
+            m = RE_DEMO_NAME.search(match.roundstatsall[-1].map) if match.roundstatsall else None
+            token = int(m.group(2)) if m else 0
+            cases.append((msg, match.matchid, token))
+        return cases
+
+    return [
+        (build_match_list(3_600_000_000_000_000_000 + i, 3_600_000_000_000_000_500 + i, 1000 + i), 3_600_000_000_000_000_000 + i, 1000 + i)
+        for i in range(20)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = _cases(args.fixtures)
+    for msg, match_id, token in cases:
+        assert extract_demo_url(msg, match_id, token) == legacy_extract_demo_url(msg, match_id, token)
+
+    for name, fn in (
+        ("legacy (MessageToDict + 4 passes)", legacy_extract_demo_url),
+        ("scan fallback (lazy single pass)", extract_demo_url_scan),
+        ("extract_demo_url (typed fast path)", extract_demo_url),
+    ):
+        elapsed = timeit.timeit(lambda: [fn(*case) for case in cases], number=args.number)
+        per_call_us = elapsed / (args.number * len(cases)) * 1e6
+        print(f"{name:<40} {per_call_us:10.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
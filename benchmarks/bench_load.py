@@ -0,0 +1,237 @@
+"""
+Load test of /api/cs2/demo/ against the real FastAPI app wired to the in-process fake Steam/GC.
+
+    PYTHONPATH=src python benchmarks/bench_load.py [--scenarios warm,cold_gc,gc_flap,steam_disconnect,duplicates,batch]
+        [--requests 2000] [--concurrency 200] [--accounts 2] [--latency 0.2] [--launch-latency 2] [--gc-rate 10]
+
+Requests are sent straight through the ASGI interface (middlewares included, no sockets),
+so the numbers measure the service itself, not a client library.
+The GC rate limit is the production one by default: interactive load over it is answered with 429s.
+The batch scenario sends all --requests codes in one POST /api/cs2/demos/ and times every streamed item.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class Scenario:
+    name: str
+    # wait for every GC session before sending load
+    warm: bool = True
+    # number of distinct share codes; 0 = every request unique
+    distinct_codes: int = 0
+    # drop all GC sessions for flap_sec once a third of the requests were sent
+    flap_sec: float = 0.0
+    # drop every Steam connection at the same point instead
+    disconnect: bool = False
+    # all codes in one POST /api/cs2/demos/ instead of one GET each
+    batch: bool = False
+
+
+SCENARIOS = {
+    "warm": Scenario("warm"),
+    "cold_gc": Scenario("cold_gc", warm=False),
+    "gc_flap": Scenario("gc_flap", flap_sec=3.0),
+    "steam_disconnect": Scenario("steam_disconnect", disconnect=True),
+    "duplicates": Scenario("duplicates", distinct_codes=20),
+    "batch": Scenario("batch", batch=True),
+}
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    state_dir = tempfile.mkdtemp(prefix="pvb-bench-")
+    accounts = [f"bench{i}" for i in range(args.accounts)]
+
+    os.environ.update(
+        {
+            "STATE_DIR": state_dir,
+            "DEMO_CACHE_PATH": "",
+            "LOGGING_LEVEL": "WARNING",
+            "API_SECRET_KEY": "bench",
+            "STEAM_FAKE": "true",
+            "STEAM_FAKE_LATENCY_SEC": str(args.latency),
+            "STEAM_FAKE_DROP_RATE": str(args.drop_rate),
+            "STEAM_FAKE_LAUNCH_LATENCY_SEC": str(args.launch_latency),
+            "STEAM_GC_RATE_PER_SEC": str(args.gc_rate),
+            "STEAM_ACCOUNTS": ",".join(accounts),
+        }
+    )
+    for name in accounts:
+        os.environ[f"STEAM_ACCOUNT_{name.upper()}_USERNAME"] = name
+        os.environ[f"STEAM_ACCOUNT_{name.upper()}_PASSWORD"] = "password"
+
+
+async def asgi_request(
+    app,
+    method: str,
+    path: str,
+    query: str,
+    headers: dict[str, str],
+    body: bytes = b"",
+    on_body: Optional[Callable[[bytes], None]] = None,
+) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 40000),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+    never = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await never.wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and on_body is not None:
+            on_body(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _wait_gc_ready(steam_pool, timeout_sec: float = 60.0) -> None:
+    from csgo.proto_enums import GCConnectionStatus
+
+    end = time.monotonic() + timeout_sec
+    while time.monotonic() < end:
+        if all(api.gc_status == GCConnectionStatus.HAVE_SESSION for api in steam_pool.accounts.values()):
+            return
+        await asyncio.sleep(0.05)
+    raise RuntimeError("GC sessions did not come up")
+
+
+async def run_scenario(scenario: Scenario, args: argparse.Namespace) -> None:
+    from csgo import sharecode
+
+    import app as app_module
+
+    fastapi_app = app_module.prepare_app()
+    rnd = random.Random(scenario.name)
+    base_match_id = 3_600_000_000_000_000_000 + rnd.randrange(10 ** 9) * 10 ** 6
+
+    def next_code(i: int) -> str:
+        n = rnd.randrange(scenario.distinct_codes) if scenario.distinct_codes else i
+        return sharecode.encode(base_match_id + n, base_match_id + n + 7, 1000 + n % 5000)
+
+    codes = [next_code(i) for i in range(args.requests)]
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+    flap_at = args.requests // 3 if scenario.flap_sec or scenario.disconnect else -1
+
+    async with fastapi_app.router.lifespan_context(fastapi_app):
+        steam_pool = fastapi_app.state.steam_pool
+        if scenario.warm:
+            await _wait_gc_ready(steam_pool)
+
+        async def client() -> None:
+            nonlocal next_index
+            while next_index < len(codes):
+                i = next_index
+                next_index += 1
+
+                if i == flap_at:
+                    for steam_api in steam_pool.accounts.values():
+                        if scenario.disconnect:
+                            steam_api.hub_thread.spawn_threadsafe(steam_api.steam_client.disconnect)
+                        else:
+                            steam_api.hub_thread.spawn_threadsafe(steam_api.cs_client.flap, scenario.flap_sec)
+
+                started = time.perf_counter()
+                status = await asgi_request(
+                    fastapi_app, "GET", "/api/cs2/demo/", f"match_code={codes[i]}", {"X-API-Key": "bench"}
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+
+        async def batch_client() -> None:
+            started = time.perf_counter()
+            buffer = b""
+
+            def on_body(chunk: bytes) -> None:
+                nonlocal buffer
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    latencies.append(time.perf_counter() - started)
+                    statuses[json.loads(line)["status"]] += 1
+
+            body = json.dumps({"match_codes": codes}).encode()
+            await asgi_request(
+                fastapi_app,
+                "POST",
+                "/api/cs2/demos/",
+                "",
+                {"X-API-Key": "bench", "Content-Type": "application/json"},
+                body,
+                on_body,
+            )
+
+        started = time.perf_counter()
+        if scenario.batch:
+            await batch_client()
+        else:
+            await asyncio.gather(*(client() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stats = steam_pool.stats()
+
+    p50, p95, p99 = (statistics.quantiles(latencies, n=100)[q - 1] * 1000 for q in (50, 95, 99))
+    print(
+        f"{scenario.name:<11} n={len(latencies):<6} rps={len(latencies) / elapsed:9.1f} "
+        f"p50={p50:8.1f}ms p95={p95:8.1f}ms p99={p99:8.1f}ms "
+        f"gc_requests={stats.gc_requests:<6} coalesced={stats.coalesced_lookups:<6} "
+        f"statuses={dict(statuses)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--launch-latency", type=float, default=2.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    # GC requests per second per account, the STEAM_GC_RATE_PER_SEC default; 0 = no rate limit (raw capacity)
+    parser.add_argument("--gc-rate", type=float, default=10.0)
+    args = parser.parse_args()
+
+    _configure_env(args)
+
+    for name in args.scenarios.split(","):
+        if name not in SCENARIOS:
+            sys.exit(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        asyncio.run(run_scenario(SCENARIOS[name], args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: share code decode / encode, csgo.sharecode vs components.steam.match_code.
+
+    PYTHONPATH=src python benchmarks/bench_match_code.py [--codes 5000] [--distinct 1000] [--number 20]
+
+The batch is --codes codes drawn from --distinct matches, like a backfill with repeats.
+"LRU cold" rows clear the cache before each pass; "LRU warm" rows decode the same batch again.
+"""
+
+import argparse
+import random
+import timeit
+
+from csgo import sharecode
+
+from components.steam.match_code import (
+    _decode,
+    _encode,
+    decode_match_code,
+    decode_match_codes,
+    encode_match_code,
+    encode_match_codes,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    matches = [(rnd.getrandbits(64), rnd.getrandbits(64), rnd.getrandbits(16)) for _ in range(args.distinct)]
+    refs = [rnd.choice(matches) for _ in range(args.codes)]
+    codes = [sharecode.encode(*ref) for ref in refs]
+    assert decode_match_codes(codes) == [_decode(code) for code in codes] == refs
+    assert encode_match_codes(refs) == codes
+
+    def cold(fn, cache):
+        def run():
+            cache.cache_clear()
+            fn()
+
+        return run
+
+    for name, fn in (
+        ("decode csgo.sharecode", lambda: [sharecode.decode(code) for code in codes]),
+        ("decode match_code (no LRU)", lambda: [_decode(code) for code in codes]),
+        ("decode_match_codes (LRU cold)", cold(lambda: decode_match_codes(codes), decode_match_code)),
+        ("decode_match_codes (LRU warm)", lambda: decode_match_codes(codes)),
+        ("encode csgo.sharecode", lambda: [sharecode.encode(*ref) for ref in refs]),
+        ("encode match_code (no LRU)", lambda: [_encode(*ref) for ref in refs]),
+        ("encode_match_codes (LRU cold)", cold(lambda: encode_match_codes(refs), encode_match_code)),
+        ("encode_match_codes (LRU warm)", lambda: encode_match_codes(refs)),
+    ):
+        elapsed = timeit.timeit(fn, number=args.number)
+        per_code_us = elapsed / (args.number * len(codes)) * 1e6
+        print(f"{name:<32} {per_code_us:8.2f} us/code")
+
+
+if __name__ == "__main__":
+    main()
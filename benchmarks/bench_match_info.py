@@ -0,0 +1,52 @@
+"""
+Micro-benchmark: match metadata from the cached (compacted) full_match_info bytes, all fields vs a projection,
+against parsing the whole message and turning it into a dict.
+
+    PYTHONPATH=src python benchmarks/bench_match_info.py [--number N]
+
+Matches are the synthetic 30-round, 10-player ones from components.steam.fixtures.
+"""
+
+import argparse
+import timeit
+
+from csgo.protobufs import cstrike15_gcmessages_pb2 as pb_gclient
+from google.protobuf.json_format import MessageToDict
+
+from components.steam.fixtures import build_match_list
+from components.steam.match_info import MATCH_INFO_FIELDS, compact_match, find_match, parse_match_info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    matches, full, compact, ids = [], [], [], []
+    for i in range(20):
+        match_id, outcome_id, token = 3_600_000_000_000_000_000 + i, 3_600_000_000_000_000_500 + i, 1000 + i
+        match = find_match(build_match_list(match_id, outcome_id, token), match_id)
+        matches.append(match)
+        full.append(match.SerializeToString())
+        compact.append(compact_match(match))
+        ids.append((match_id, outcome_id, token))
+
+    print(f"bytes per match: full={sum(map(len, full)) // len(full)} compact={sum(map(len, compact)) // len(compact)}")
+
+    for name, fn in (
+        (
+            "MessageToDict (full bytes)",
+            lambda i: MessageToDict(pb_gclient.CDataGCCStrike15_v2_MatchInfo.FromString(full[i])),
+        ),
+        ("parse_match_info (full bytes)", lambda i: parse_match_info(full[i], *ids[i], MATCH_INFO_FIELDS)),
+        ("compact_match (once per GC reply)", lambda i: compact_match(matches[i])),
+        ("parse_match_info (all fields)", lambda i: parse_match_info(compact[i], *ids[i], MATCH_INFO_FIELDS)),
+        ("parse_match_info (map,duration)", lambda i: parse_match_info(compact[i], *ids[i], ("map", "duration"))),
+    ):
+        elapsed = timeit.timeit(lambda: [fn(i) for i in range(len(ids))], number=args.number)
+        per_call_us = elapsed / (args.number * len(ids)) * 1e6
+        print(f"{name:<36} {per_call_us:10.2f} us/match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Per-request overhead of the middleware stack: the former BaseHTTPMiddleware layers
+(API key check + one ExceptionMiddleware per mapped exception) vs the single pure ASGI RequestPipelineMiddleware.
+
+    PYTHONPATH=src python benchmarks/bench_middleware.py [--requests 20000] [--concurrency 50]
+
+Requests go straight through the ASGI interface to a trivial JSON route and a small streaming route,
+so the difference between the rows is the cost of the middlewares alone.
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import time
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from components.admission.clients import ApiClient, build_limiters
+from middlewares import RequestPipelineMiddleware
+
+API_KEY = "bench"
+
+EXCEPTION_STATUS_CODES = {
+    ValueError: 400,
+    LookupError: 404,
+    TimeoutError: 504,
+    ConnectionError: 503,
+    RuntimeError: 500,
+    OSError: 502,
+    ArithmeticError: 429,
+}
+
+
+class LegacyAPIKeyMiddleware(BaseHTTPMiddleware):
+    # the pre-pipeline APIKeyMiddleware, kept here as the baseline
+    def __init__(self, app, api_clients: list[ApiClient]):
+        super().__init__(app)
+        self.limiters = build_limiters(api_clients)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in ("/docs", "/openapi.json", "/redoc", "/metrics", "/api/ready"):
+            return await call_next(request)
+
+        client_key = request.headers.get("X-API-Key")
+        limiter = self.limiters.get(client_key) if client_key else None
+        if limiter is None:
+            return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+
+        admitted, reason, retry_after = limiter.try_acquire()
+        if not admitted:
+            return JSONResponse(status_code=429, content={"detail": f"Too many requests ({reason})"})
+
+        request.state.api_client = limiter.client
+        try:
+            response = await call_next(request)
+        except BaseException:
+            limiter.release()
+            raise
+
+        body_iterator = response.body_iterator
+
+        async def _release_after_body():
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                limiter.release()
+
+        response.body_iterator = _release_after_body()
+        return response
+
+
+class LegacyExceptionMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, exc_class: type[Exception], status_code: int = 500):
+        super().__init__(app)
+        self.exc_class = exc_class
+        self.status_code = status_code
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except self.exc_class as exc:
+            headers = None
+            retry_after = getattr(exc, "retry_after", None)
+            if retry_after is not None:
+                headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+            return JSONResponse(status_code=self.status_code, content={"detail": str(exc)}, headers=headers)
+
+
+def build_app(stack: str) -> FastAPI:
+    fastapi_app = FastAPI()
+    api_clients = [ApiClient(name="default", key=API_KEY)]
+
+    if stack == "legacy":
+        fastapi_app.add_middleware(LegacyAPIKeyMiddleware, api_clients=api_clients)
+        for exc_class, status_code in EXCEPTION_STATUS_CODES.items():
+            fastapi_app.add_middleware(LegacyExceptionMiddleware, exc_class=exc_class, status_code=status_code)
+    elif stack == "pipeline":
+        fastapi_app.add_middleware(
+            RequestPipelineMiddleware, api_clients=api_clients, exception_status_codes=EXCEPTION_STATUS_CODES
+        )
+
+    async def json_route():
+        return {"demo_url": "http://replay1.valve.net/730/1_2.dem.bz2"}
+
+    async def stream_route():
+        async def lines():
+            for i in range(10):
+                yield f'{{"i": {i}}}\n'
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    async def error_route():
+        raise LookupError("not found")
+
+    fastapi_app.add_api_route("/json", json_route, methods=["GET"])
+    fastapi_app.add_api_route("/stream", stream_route, methods=["GET"])
+    fastapi_app.add_api_route("/error", error_route, methods=["GET"])
+    return fastapi_app
+
+
+async def asgi_get(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"x-api-key", API_KEY.encode())],
+        "client": ("127.0.0.1", 40000),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+    never = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await never.wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(stack: str, path: str, args: argparse.Namespace) -> None:
+    fastapi_app = build_app(stack)
+    remaining = args.requests
+    statuses = set()
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            statuses.add(await asgi_get(fastapi_app, path))
+
+    # warm-up: route and middleware stack are built on the first request
+    await asgi_get(fastapi_app, path)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{stack:<9} {path:<8} rps={args.requests / elapsed:9.0f} "
+        f"per_request={elapsed / args.requests * 1e6:7.1f}us statuses={sorted(statuses)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # /error would otherwise measure traceback formatting
+    logging.disable(logging.CRITICAL)
+
+    for path in ("/json", "/stream", "/error"):
+        for stack in ("none", "legacy", "pipeline"):
+            # without a middleware the exception escapes the app
+            if stack != "none" or path != "/error":
+                asyncio.run(run(stack, path, args))
+
+
+if __name__ == "__main__":
+    main()
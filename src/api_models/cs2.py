@@ -1,8 +1,85 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from components.cache.constants import DemoVerifyStatus
+from components.steam.constants import DemoLookupStatus
+from conf.cs2 import CS2_DEMO_BATCH_MAX_SIZE, CS2_PLAYERS_BATCH_MAX_SIZE
 
 class CS2DemoUrlResponse(BaseModel):
     match_code: str
     match_id: int
     outcome_id: int
     token: int
-    demo_url: str | None = None
\ No newline at end of file
+    demo_url: str | None = None
+    # only with verify
+    demo_status: DemoVerifyStatus | None = None
+    demo_size: int | None = None
+
+
+class CS2DemoBatchRequest(BaseModel):
+    match_codes: list[str] = Field(min_length=1, max_length=CS2_DEMO_BATCH_MAX_SIZE)
+    verify: bool = False
+
+
+class CS2DemoBatchItem(BaseModel):
+    match_code: str
+    status: DemoLookupStatus
+    match_id: int | None = None
+    outcome_id: int | None = None
+    token: int | None = None
+    demo_url: str | None = None
+    demo_status: DemoVerifyStatus | None = None
+    demo_size: int | None = None
+    detail: str | None = None
+
+
+class CS2MatchPlayer(BaseModel):
+    account_id: int
+    kills: int
+    assists: int
+    deaths: int
+    score: int
+    mvps: int
+    headshots: int
+
+
+class CS2MatchInfoResponse(BaseModel):
+    # the match fields are only present when asked for with ?fields= (all of them by default)
+    match_code: str
+    match_id: int
+    outcome_id: int
+    token: int
+    match_time: int | None = None
+    map: str | None = None
+    duration: int | None = None
+    rounds: int | None = None
+    team_scores: list[int] | None = None
+    match_result: int | None = None
+    players: list[CS2MatchPlayer] | None = None
+    demo_url: str | None = None
+
+
+class CS2PlayerMatchDemo(BaseModel):
+    match_code: str
+    match_id: int
+    outcome_id: int
+    token: int
+    match_time: int
+    demo_url: str | None = None
+
+
+class CS2PlayerDemosResponse(BaseModel):
+    steamid: str
+    account_id: int
+    matches: list[CS2PlayerMatchDemo]
+
+
+class CS2PlayerDemosBatchRequest(BaseModel):
+    steamids: list[str] = Field(min_length=1, max_length=CS2_PLAYERS_BATCH_MAX_SIZE)
+
+
+class CS2PlayerDemosBatchItem(BaseModel):
+    steamid: str
+    status: DemoLookupStatus
+    account_id: int | None = None
+    matches: list[CS2PlayerMatchDemo] = []
+    detail: str | None = None
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+
+
+class TraceSpan(BaseModel):
+    name: str
+    start_ms: float
+    duration_ms: float
+
+
+class SlowRequest(BaseModel):
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration_ms: float
+    spans: list[TraceSpan]
+
+
+class SlowRequestsResponse(BaseModel):
+    threshold_ms: float
+    requests: list[SlowRequest]
+
+
+class BlockedLoopEvent(BaseModel):
+    loop: str
+    started_at: float
+    blocked_ms: float
+    stack: str
+
+
+class BlockedLoopsResponse(BaseModel):
+    enabled: bool
+    events: list[BlockedLoopEvent]
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+
+from components.jobs.constants import JobCallbackStatus, JobItemState, JobStatus
+from components.steam.constants import DemoLookupStatus
+from conf.cs2 import CS2_DEMO_BATCH_MAX_SIZE
+
+
+class CS2JobCreateRequest(BaseModel):
+    match_codes: list[str] = Field(min_length=1, max_length=CS2_DEMO_BATCH_MAX_SIZE)
+    callback_url: str | None = None
+
+
+class CS2JobItem(BaseModel):
+    match_code: str
+    state: JobItemState
+    status: DemoLookupStatus | None = None
+    match_id: int | None = None
+    outcome_id: int | None = None
+    token: int | None = None
+    demo_url: str | None = None
+    detail: str | None = None
+    attempts: int = 0
+
+
+class CS2JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    created_at: float
+    finished_at: float | None = None
+    callback_url: str | None = None
+    callback_status: JobCallbackStatus
+    total: int
+    remaining: int
+    items: list[CS2JobItem] = []
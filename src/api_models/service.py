@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    # account -> GC connection status
+    accounts: dict[str, str]
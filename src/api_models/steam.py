@@ -1,19 +1,37 @@
 from pydantic import BaseModel
 
-from components.steam.constants import SteamLoginStatus
+from components.steam.constants import GCState, SteamLoginStatus
 
 
 class SteamLoginRequest(BaseModel):
+    account: str | None = None
     username: str
     password: str
     email_code: str | None = None
     two_factor_code: str | None = None
 
 
+class SteamAccountInfo(BaseModel):
+    account: str
+    username: str | None
+    gc_status: str
+    gc_state: GCState
+    gc_retry_after: float
+    in_flight: int
+
+
 class SteamLoginInfo(BaseModel):
     username: str | None
+    accounts: list[SteamAccountInfo]
 
 
 class SteamLoginResponse(BaseModel):
     success: bool
-    status: SteamLoginStatus
\ No newline at end of file
+    status: SteamLoginStatus
+
+
+class SteamStatsResponse(BaseModel):
+    lookups: int
+    coalesced_lookups: int
+    gc_requests: int
+    in_flight: int
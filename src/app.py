@@ -1,44 +1,225 @@
 from contextlib import asynccontextmanager
-from logging.config import dictConfig
 
 from fastapi import FastAPI
-from gevent.lock import Semaphore
 
-from conf.logging import LOGGING_CONFIG
-from conf.secret import API_SECRET_KEY, API_SECRET_KEY_REQUIRED
-from middlewares import APIKeyMiddleware, ExceptionMiddleware
+from conf.cache import (
+    DEMO_CACHE_DISK_SIZE,
+    DEMO_CACHE_MEMORY_SIZE,
+    DEMO_CACHE_PATH,
+    DEMO_CACHE_TTL_SEC,
+    DEMO_FILES_DOWNLOAD_TIMEOUT_SEC,
+    DEMO_FILES_MAX_BYTES,
+    DEMO_FILES_PATH,
+    DEMO_FILES_POOL_SIZE,
+    DEMO_VERIFY_POOL_SIZE,
+    DEMO_VERIFY_TIMEOUT_SEC,
+    DEMO_VERIFY_TTL_SEC,
+)
+from conf.jobs import (
+    JOBS_CALLBACK_ATTEMPTS,
+    JOBS_CALLBACK_TIMEOUT_SEC,
+    JOBS_DB_PATH,
+    JOBS_MAX_ATTEMPTS,
+    JOBS_RETRY_DELAY_SEC,
+    JOBS_WORKERS,
+)
+from conf.logging import (
+    LOGGING_CONFIG,
+    LOGGING_QUEUE_SIZE,
+    LOGGING_RATE_LIMIT_BURST,
+    LOGGING_RATE_LIMIT_WINDOW_SEC,
+)
+from conf.tracing import (
+    BLOCKING_MONITOR_ENABLED,
+    BLOCKING_MONITOR_SIZE,
+    BLOCKING_MONITOR_THRESHOLD_MS,
+    TRACING_ENABLED,
+    TRACING_SLOW_REQUEST_MS,
+    TRACING_SLOW_REQUESTS_SIZE,
+)
+from conf.steam import (
+    STEAM_ACCOUNTS,
+    STEAM_ACCOUNT_CREDENTIALS,
+    STEAM_CREDENTIALS_DIR,
+    STEAM_FAKE,
+    STEAM_FAKE_DISCONNECT_RATE,
+    STEAM_FAKE_DROP_RATE,
+    STEAM_FAKE_FIXTURES_DIR,
+    STEAM_FAKE_LATENCY_SEC,
+    STEAM_FAKE_LAUNCH_LATENCY_SEC,
+)
+from conf.secret import API_CLIENTS, API_SECRET_KEY_REQUIRED
+from conf.workers import (
+    LOOKUP_CLAIM_BUSY_TIMEOUT_SEC,
+    LOOKUP_CLAIM_POLL_SEC,
+    LOOKUP_CLAIM_TTL_SEC,
+    LOOKUP_CLAIMS_PATH,
+    WORKERS,
+    WORKERS_LOCK_DIR,
+)
+from middlewares import RequestPipelineMiddleware
 from routes import prepare_routes
 
-from components.steam.steam import SteamAPI, SteamAPIException
+from components.admission.clients import ApiClient
+from components.cache.demo_files import DemoDownloadException, DemoFileCache, DemoFileNotFoundException
+from components.cache.demo_url import DemoUrlCache
+from components.cache.demo_verify import DemoUrlVerifier
+from components.jobs.runner import JobRunner
+from components.logs.setup import configure_logging
+from components.jobs.store import JobStore
+from components.steam.constants import LookupPriority
+from components.steam.pool import SteamAPIPool
+from components.steam.fake import FakeGCConfig, fake_client_factory
+from components.steam.steam import (
+    SteamAPIException,
+    SteamGCThrottledException,
+    SteamGCTimeoutException,
+    SteamGCUnavailableException,
+    default_client_factory,
+)
+from components.tracing.blocking import BlockingMonitor
+from components.tracing.trace import SlowRequestLog
+from components.workers.claims import LookupClaims
+from components.workers.slots import WorkerSlot
+
+
+def _client_factory():
+    if not STEAM_FAKE:
+        return default_client_factory
+
+    return fake_client_factory(
+        FakeGCConfig(
+            latency_sec=STEAM_FAKE_LATENCY_SEC,
+            drop_rate=STEAM_FAKE_DROP_RATE,
+            disconnect_rate=STEAM_FAKE_DISCONNECT_RATE,
+            launch_latency_sec=STEAM_FAKE_LAUNCH_LATENCY_SEC,
+            fixtures_dir=STEAM_FAKE_FIXTURES_DIR,
+        )
+    )
 
 
 @asynccontextmanager
 async def lifespan(app_: FastAPI):
-    steam_api = SteamAPI()
-    steam_api.connect()
-    steam_api.gc_lock = Semaphore(1)
-    app_.state.steam_api = steam_api
+    # several worker processes: each runs its own share of the accounts and they coalesce lookups through claims
+    worker_slot = None
+    account_names = STEAM_ACCOUNTS
+    lookup_claims = None
+    if WORKERS > 1:
+        worker_slot = WorkerSlot.acquire(WORKERS_LOCK_DIR, WORKERS)
+        account_names = worker_slot.accounts(STEAM_ACCOUNTS)
+        lookup_claims = LookupClaims(
+            LOOKUP_CLAIMS_PATH, ttl_sec=LOOKUP_CLAIM_TTL_SEC, busy_timeout_sec=LOOKUP_CLAIM_BUSY_TIMEOUT_SEC
+        )
+    app_.state.worker_slot = worker_slot
+
+    demo_cache = DemoUrlCache(
+        path=DEMO_CACHE_PATH,
+        ttl_sec=DEMO_CACHE_TTL_SEC,
+        memory_size=DEMO_CACHE_MEMORY_SIZE,
+        disk_size=DEMO_CACHE_DISK_SIZE,
+    )
+    steam_pool = SteamAPIPool(
+        account_names=account_names,
+        demo_cache=demo_cache,
+        credentials=STEAM_ACCOUNT_CREDENTIALS,
+        client_factory=_client_factory(),
+        credentials_dir=STEAM_CREDENTIALS_DIR,
+        claims=lookup_claims,
+        claim_poll_sec=LOOKUP_CLAIM_POLL_SEC,
+    )
+    await steam_pool.aconnect()
+    app_.state.steam_pool = steam_pool
+
+    # each worker keeps its own directory and share of the budget, linking files the others already have
+    demo_files = DemoFileCache(
+        path=worker_slot.directory(DEMO_FILES_PATH) if worker_slot is not None else DEMO_FILES_PATH,
+        max_bytes=DEMO_FILES_MAX_BYTES // WORKERS if worker_slot is not None else DEMO_FILES_MAX_BYTES,
+        timeout_sec=DEMO_FILES_DOWNLOAD_TIMEOUT_SEC,
+        pool_size=DEMO_FILES_POOL_SIZE,
+        sibling_paths=worker_slot.sibling_directories(DEMO_FILES_PATH) if worker_slot is not None else (),
+    )
+    app_.state.demo_files = demo_files
+    demo_verifier = DemoUrlVerifier(
+        demo_cache=demo_cache,
+        ttl_sec=DEMO_VERIFY_TTL_SEC,
+        timeout_sec=DEMO_VERIFY_TIMEOUT_SEC,
+        pool_size=DEMO_VERIFY_POOL_SIZE,
+    )
+    app_.state.demo_verifier = demo_verifier
+
+    job_store = JobStore(JOBS_DB_PATH, owner=worker_slot.index if worker_slot is not None else 0)
+    job_runner = JobRunner(
+        store=job_store,
+        steam_pool=steam_pool,
+        workers=JOBS_WORKERS,
+        max_attempts=JOBS_MAX_ATTEMPTS,
+        retry_delay_sec=JOBS_RETRY_DELAY_SEC,
+        callback_timeout_sec=JOBS_CALLBACK_TIMEOUT_SEC,
+        callback_attempts=JOBS_CALLBACK_ATTEMPTS,
+        deliver_pending_callbacks=worker_slot is None or worker_slot.index == 0,
+    )
+    job_runner.start()
+    app_.state.job_store = job_store
+    app_.state.job_runner = job_runner
+
+    blocking_monitor = None
+    if BLOCKING_MONITOR_ENABLED:
+        blocking_monitor = BlockingMonitor(BLOCKING_MONITOR_THRESHOLD_MS / 1000, size=BLOCKING_MONITOR_SIZE)
+        blocking_monitor.watch_asyncio()
+        for name, steam_api in steam_pool.accounts.items():
+            blocking_monitor.watch_gevent(name, steam_api.hub_thread)
+        blocking_monitor.start()
+    app_.state.blocking_monitor = blocking_monitor
+
     yield
-    steam_api.disconnect()
+
+    if blocking_monitor is not None:
+        blocking_monitor.stop()
+    await job_runner.stop()
+    job_store.close()
+    demo_files.close()
+    demo_verifier.close()
+    await steam_pool.adisconnect()
+    steam_pool.close()
+    demo_cache.close()
+    if lookup_claims is not None:
+        lookup_claims.close()
+    if worker_slot is not None:
+        worker_slot.release()
 
 def prepare_app() -> FastAPI:
-    dictConfig(LOGGING_CONFIG)
+    configure_logging(
+        LOGGING_CONFIG,
+        queue_size=LOGGING_QUEUE_SIZE,
+        rate_limit_burst=LOGGING_RATE_LIMIT_BURST,
+        rate_limit_window_sec=LOGGING_RATE_LIMIT_WINDOW_SEC,
+    )
 
     fastapi_app = FastAPI(lifespan=lifespan)
+    slow_requests = None
+    if TRACING_ENABLED:
+        slow_requests = SlowRequestLog(TRACING_SLOW_REQUEST_MS / 1000, size=TRACING_SLOW_REQUESTS_SIZE)
+    fastapi_app.state.slow_requests = slow_requests
 
     fastapi_app.add_middleware(
-        APIKeyMiddleware,
-        api_key=API_SECRET_KEY,
+        RequestPipelineMiddleware,
+        api_clients=[
+            ApiClient(name=name, **{**params, "priority": LookupPriority(params["priority"])})
+            for name, params in API_CLIENTS.items()
+            if params["key"]
+        ],
         api_key_required=API_SECRET_KEY_REQUIRED,
-    )
-    fastapi_app.add_middleware(
-        ExceptionMiddleware,
-        exc_class=SteamAPIException,
-    )
-    fastapi_app.add_middleware(
-        ExceptionMiddleware,
-        exc_class=ValueError,
-        status_code=400,
+        # the most specific class of a raised exception wins
+        exception_status_codes={
+            ValueError: 400,
+            SteamAPIException: 500,
+            SteamGCThrottledException: 429,
+            SteamGCUnavailableException: 503,
+            SteamGCTimeoutException: 504,
+            DemoDownloadException: 502,
+            DemoFileNotFoundException: 404,
+        },
+        slow_requests=slow_requests,
     )
 
     prepare_routes(fastapi_app)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from components.admission.limits import TokenBucket
+from components.steam.constants import LookupPriority
+
+
+@dataclass(frozen=True)
+class ApiClient:
+    name: str
+    key: str
+    # 0 = unlimited
+    rate_per_sec: float = 0.0
+    burst: float = 0.0
+    max_concurrent: int = 0
+    priority: LookupPriority = LookupPriority.INTERACTIVE
+
+
+class ApiClientLimiter:
+    """
+    Request quota (token bucket) and concurrency cap of one API client. Used from the asyncio loop only.
+    """
+
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self.bucket = TokenBucket(client.rate_per_sec, client.burst or client.rate_per_sec) if client.rate_per_sec > 0 else None
+        self.in_flight = 0
+
+    def try_acquire(self) -> tuple[bool, str, float]:
+        """
+        Takes a request slot; returns (admitted, reason, retry_after_sec).
+        """
+        if self.client.max_concurrent and self.in_flight >= self.client.max_concurrent:
+            return False, "concurrency", 1.0
+
+        if self.bucket is not None and self.bucket.reserve(max_wait_sec=0.0) is None:
+            return False, "quota", self.bucket.wait_sec()
+
+        self.in_flight += 1
+        return True, "", 0.0
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+def build_limiters(clients: list[ApiClient]) -> dict[str, ApiClientLimiter]:
+    """
+    API key -> limiter of its client.
+    """
+    limiters = {}
+    for client in clients:
+        if client.key in limiters:
+            raise ValueError(f"API clients {limiters[client.key].client.name} and {client.name} share a key")
+        limiters[client.key] = ApiClientLimiter(client)
+    return limiters
+
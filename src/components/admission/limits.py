@@ -0,0 +1,41 @@
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations: a caller that cannot get a token right away
+    is told how long to wait for one, and the token is taken on its behalf. Tokens going
+    negative are the queue of such callers. Not thread-safe: each bucket belongs to one thread.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: float):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1.0, burst)
+
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_sec)
+        self._refilled_at = now
+
+    def wait_sec(self) -> float:
+        """
+        How long a reservation made now would wait.
+        """
+        self._refill()
+        return max(0.0, (1.0 - self._tokens) / self.rate_per_sec)
+
+    def reserve(self, max_wait_sec: float) -> Optional[float]:
+        """
+        Takes a token and returns how long to wait before using it,
+        or None (nothing taken) when that would be longer than max_wait_sec.
+        """
+        wait_sec = self.wait_sec()
+        if wait_sec > max_wait_sec:
+            return None
+
+        self._tokens -= 1.0
+        return wait_sec
@@ -0,0 +1,19 @@
+from utils.base_types import StringEnum
+
+
+class DemoCacheStatus(StringEnum):
+    HIT = "hit"
+    MISS = "miss"
+    # joined a download, or another worker's lookup, already in progress
+    COALESCED = "coalesced"
+
+
+class DemoVerifyStatus(StringEnum):
+    # the replay server has the file
+    VERIFIED = "verified"
+    # not there (yet): the URL may be wrong or the demo not uploaded
+    MISSING = "missing"
+    # was there and is gone, or the server says so with 410
+    EXPIRED = "expired"
+    # the replay server could not be asked
+    UNKNOWN = "unknown"
@@ -0,0 +1,265 @@
+import asyncio
+import bz2
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from components.cache.constants import DemoCacheStatus
+from components.metrics.definitions import DEMO_FILE_REQUESTS, DEMO_FILES_BYTES
+
+logger = logging.getLogger(__name__)
+
+# replay server file names: <match_id>_<reservation>.dem[.bz2]
+RE_DEMO_FILE_NAME = re.compile(r"^\d{1,30}_\d{1,30}\.dem(?:\.bz2)?$")
+
+_PART_SUFFIX = ".part"
+
+
+class DemoDownloadException(Exception):
+    pass
+
+
+class DemoFileNotFoundException(DemoDownloadException):
+    pass
+
+
+def demo_file_name(demo_url: str) -> str:
+    name = urlsplit(demo_url).path.rsplit("/", 1)[-1]
+    if not RE_DEMO_FILE_NAME.match(name):
+        raise DemoDownloadException(f"Unexpected demo file name in {demo_url}")
+    return name
+
+
+class DemoFileCache:
+    """
+    Size-bounded LRU of downloaded demo files in a directory.
+
+    Each file is fetched from the replay server once, through a pooled requests.Session;
+    concurrent requests for a file that is being downloaded wait for the same download.
+    The index lives on the asyncio thread, downloads run in worker threads.
+
+    With several worker processes each one owns a directory; a miss hard-links the file from a sibling directory
+    when another worker already has it, so the demo is downloaded and stored once, while every worker only ever
+    removes its own links.
+
+    Files handed out by aget are pinned until release: eviction skips them, so a file is never removed between
+    the lookup and the response opening it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        timeout_sec: float = 60.0,
+        pool_size: int = 16,
+        chunk_size: int = 1024 * 1024,
+        sibling_paths: Iterable[str] = (),
+    ):
+        self.path = path
+        self.sibling_paths = list(sibling_paths)
+        self.max_bytes = max_bytes
+        self.timeout_sec = timeout_sec
+        self.chunk_size = chunk_size
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # file name -> size, least recently used first
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._downloads: dict[str, asyncio.Future] = {}
+        # file name -> responses still reading it
+        self._pins: dict[str, int] = {}
+
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+        DEMO_FILES_BYTES.set_function(lambda: self._total_bytes)
+
+    def _load_index(self) -> None:
+        files = []
+        for entry in os.scandir(self.path):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(_PART_SUFFIX):
+                # download interrupted by a previous process
+                os.remove(entry.path)
+                continue
+            if RE_DEMO_FILE_NAME.match(entry.name):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self._index[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    async def aget(self, demo_url: str) -> tuple[str, DemoCacheStatus]:
+        """
+        Returns the local path of the demo, downloading it first if it is not cached.
+        The file stays pinned until release(filepath).
+        """
+        name = demo_file_name(demo_url)
+        filepath = os.path.join(self.path, name)
+
+        status = DemoCacheStatus.HIT
+        # looped: another download finishing first may evict the file before this waiter resumes
+        while name not in self._index:
+            status = DemoCacheStatus.MISS
+            download = self._downloads.get(name)
+            if download is None:
+                DEMO_FILE_REQUESTS.labels(DemoCacheStatus.MISS.value).inc()
+                download = asyncio.ensure_future(self._adownload(demo_url, name))
+                self._downloads[name] = download
+                download.add_done_callback(lambda fut: self._on_download_done(name, fut))
+            else:
+                DEMO_FILE_REQUESTS.labels(DemoCacheStatus.COALESCED.value).inc()
+
+            # a client going away must not cancel the download the others wait for
+            await asyncio.shield(download)
+
+        if status == DemoCacheStatus.HIT:
+            self._index.move_to_end(name)
+            # mtime keeps the LRU order across restarts
+            os.utime(filepath)
+            DEMO_FILE_REQUESTS.labels(DemoCacheStatus.HIT.value).inc()
+
+        self._pins[name] = self._pins.get(name, 0) + 1
+        return filepath, status
+
+    def release(self, filepath: str) -> None:
+        name = os.path.basename(filepath)
+        pins = self._pins.pop(name, 0) - 1
+        if pins > 0:
+            self._pins[name] = pins
+        else:
+            self._evict()
+
+    def _on_download_done(self, name: str, fut: asyncio.Future) -> None:
+        self._downloads.pop(name, None)
+        if not fut.cancelled():
+            fut.exception()
+
+    async def _adownload(self, demo_url: str, name: str) -> str:
+        filepath = os.path.join(self.path, name)
+        size = await asyncio.to_thread(self._fetch, demo_url, name, filepath)
+
+        self._index[name] = size
+        self._total_bytes += size
+        self._evict(keep=name)
+        return filepath
+
+    def _fetch(self, demo_url: str, name: str, filepath: str) -> int:
+        size = self._link_sibling(name, filepath)
+        if size is not None:
+            return size
+        return self._download(demo_url, filepath)
+
+    def _link_sibling(self, name: str, filepath: str) -> Optional[int]:
+        for directory in self.sibling_paths:
+            tmp_filepath = f"{filepath}.{uuid.uuid4().hex}{_PART_SUFFIX}"
+            try:
+                os.link(os.path.join(directory, name), tmp_filepath)
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                # e.g. the directories are on different file systems
+                logger.warning("DemoFileCache[_link_sibling]: Cannot link %s from %s: %s", name, directory, exc)
+                return None
+
+            os.replace(tmp_filepath, filepath)
+            logger.debug("DemoFileCache[_link_sibling]: Linked %s from %s", name, directory)
+            return os.stat(filepath).st_size
+        return None
+
+    def _download(self, demo_url: str, filepath: str) -> int:
+        started = time.monotonic()
+        tmp_filepath = f"{filepath}.{uuid.uuid4().hex}{_PART_SUFFIX}"
+        size = 0
+
+        try:
+            with self._session.get(demo_url, stream=True, timeout=self.timeout_sec) as response:
+                if response.status_code in (404, 410):
+                    raise DemoFileNotFoundException(f"Demo {demo_url} is no longer available")
+                if not response.ok:
+                    raise DemoDownloadException(f"Replay server returned {response.status_code} for {demo_url}")
+
+                with open(tmp_filepath, "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise DemoDownloadException(f"Demo {demo_url} does not fit in the demo file cache")
+                        f.write(chunk)
+
+            os.replace(tmp_filepath, filepath)
+        except requests.RequestException as exc:
+            self._remove(tmp_filepath)
+            raise DemoDownloadException(f"Failed to download {demo_url}: {exc}") from exc
+        except BaseException:
+            self._remove(tmp_filepath)
+            raise
+
+        logger.info(
+            "DemoFileCache[_download]: Downloaded %s (%s bytes) in %.1fs", demo_url, size, time.monotonic() - started
+        )
+        return size
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        # least recently used first; pinned files are left until released
+        for name in list(self._index):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if name == keep or name in self._pins:
+                continue
+            self._total_bytes -= self._index.pop(name)
+            self._remove(os.path.join(self.path, name))
+
+    @staticmethod
+    def _remove(filepath: str) -> None:
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        for download in self._downloads.values():
+            download.cancel()
+        self._session.close()
+
+
+def iter_bz2_decompressed(filepath: str, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    """
+    Decompresses a .bz2 file chunk by chunk, never holding more than chunk_size of output in memory.
+    """
+    decompressor = bz2.BZ2Decompressor()
+    with open(filepath, "rb") as f:
+        while True:
+            if decompressor.eof:
+                # bzip2 allows several concatenated streams
+                data = decompressor.unused_data
+                decompressor = bz2.BZ2Decompressor()
+                if not data:
+                    data = f.read(chunk_size)
+                    if not data:
+                        return
+            elif decompressor.needs_input:
+                data = f.read(chunk_size)
+                if not data:
+                    raise DemoDownloadException(f"Truncated bz2 stream in {filepath}")
+            else:
+                data = b""
+
+            chunk = decompressor.decompress(data, max_length=chunk_size)
+            if chunk:
+                yield chunk
@@ -0,0 +1,437 @@
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
+from components.cache.constants import DemoVerifyStatus
+from utils.sqlite import connect_wal, from_sqlite_int, to_sqlite_int
+
+logger = logging.getLogger(__name__)
+
+# how many written rows between two disk prune passes
+_PRUNE_EVERY = 256
+
+
+@dataclass(frozen=True, slots=True)
+class DemoUrlCacheEntry:
+    match_id: int
+    outcome_id: int
+    token: int
+    demo_url: str
+    fetched_at: float
+    # result of the last HEAD of demo_url, if it was verified
+    verify_status: Optional[DemoVerifyStatus] = None
+    content_length: Optional[int] = None
+    verified_at: Optional[float] = None
+
+
+CacheKey = tuple[int, int, int]
+_Write = Callable[[sqlite3.Connection], int]
+
+
+class DemoUrlCache:
+    """
+    Two-tier cache of resolved demo URLs keyed on (match_id, outcome_id, token):
+    a bounded in-memory LRU in front of a persistent SQLite (WAL) table.
+    The serialized CDataGCCStrike15_v2_MatchInfo of a match can be stored next to its URL; it is kept on disk only.
+
+    Safe to use from both the asyncio thread and the gevent hub threads, and none of them ever waits for SQLite
+    to take a write: put/put_many/set_verification update the memory tier and queue the disk write to a writer
+    thread, which also prunes the table. Disk reads go through one WAL connection per thread and take no lock;
+    the event loop reads through the a* methods, which only leave the loop on a memory miss.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl_sec: int = 0,
+        memory_size: int = 10000,
+        disk_size: int = 0,
+    ):
+        self.ttl_sec = ttl_sec
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[CacheKey, DemoUrlCacheEntry] = OrderedDict()
+        # match_id -> latest key in _memory, for lookups by match id alone
+        self._match_keys: dict[int, CacheKey] = {}
+        # match infos queued for the writer, readable before they reach the disk
+        self._pending_info: dict[CacheKey, bytes] = {}
+
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes: queue.SimpleQueue[Optional[_Write]] = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        if path:
+            self._db = self._open_db(path)
+            self._writer = threading.Thread(target=self._write_loop, name="demo-cache-writer", daemon=True)
+            self._writer.start()
+        # per-thread read connections, all of them kept to be closed
+        self._readers = threading.local()
+        self._reader_dbs: list[sqlite3.Connection] = []
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        db = connect_wal(path)
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS demo_urls (
+                match_id INTEGER NOT NULL,
+                outcome_id INTEGER NOT NULL,
+                token INTEGER NOT NULL,
+                demo_url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (match_id, outcome_id, token)
+            ) WITHOUT ROWID
+            """
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS demo_urls_fetched_at ON demo_urls (fetched_at)")
+
+        # columns added after the first release, under the write lock since workers start together
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            columns = {row[1] for row in db.execute("PRAGMA table_info(demo_urls)")}
+            for column, column_type in (
+                ("verify_status", "TEXT"),
+                ("content_length", "INTEGER"),
+                ("verified_at", "REAL"),
+                ("match_info", "BLOB"),
+            ):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE demo_urls ADD COLUMN {column} {column_type}")
+        return db
+
+    @staticmethod
+    def _entry(match_id: int, outcome_id: int, token: int, row: tuple) -> DemoUrlCacheEntry:
+        demo_url, fetched_at, verify_status, content_length, verified_at = row
+        return DemoUrlCacheEntry(
+            match_id,
+            outcome_id,
+            token,
+            demo_url=demo_url,
+            fetched_at=fetched_at,
+            verify_status=DemoVerifyStatus(verify_status) if verify_status else None,
+            content_length=content_length,
+            verified_at=verified_at,
+        )
+
+    def _expired(self, entry: DemoUrlCacheEntry, now: float) -> bool:
+        # an expired replay never comes back: keep it, so the match is not asked to the GC again
+        if entry.verify_status == DemoVerifyStatus.EXPIRED:
+            return False
+        return self.ttl_sec > 0 and now - entry.fetched_at > self.ttl_sec
+
+    def get(self, match_id: int, outcome_id: int, token: int) -> Optional[DemoUrlCacheEntry]:
+        key = (match_id, outcome_id, token)
+        entry = self._get_memory(key)
+        if entry is not None:
+            return entry
+        return self._get_disk(key)
+
+    async def aget(self, match_id: int, outcome_id: int, token: int) -> Optional[DemoUrlCacheEntry]:
+        key = (match_id, outcome_id, token)
+        entry = self._get_memory(key)
+        if entry is not None or self._db is None:
+            return entry
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def _get_memory(self, key: CacheKey) -> Optional[DemoUrlCacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if not self._expired(entry, time.time()):
+                self._memory.move_to_end(key)
+                return entry
+            self._forget(key)
+            return None
+
+    def _get_disk(self, key: CacheKey) -> Optional[DemoUrlCacheEntry]:
+        reader = self._reader()
+        if reader is None:
+            return None
+
+        match_id, outcome_id, token = key
+        row = reader.execute(
+            "SELECT demo_url, fetched_at, verify_status, content_length, verified_at FROM demo_urls "
+            "WHERE match_id = ? AND outcome_id = ? AND token = ?",
+            (to_sqlite_int(match_id), to_sqlite_int(outcome_id), token),
+        ).fetchone()
+        if row is None:
+            return None
+
+        entry = self._entry(match_id, outcome_id, token, row)
+        if self._expired(entry, time.time()):
+            return None
+
+        return self._remember_read(key, entry)
+
+    def find(self, match_id: int) -> Optional[DemoUrlCacheEntry]:
+        """
+        Latest entry of a match when only its id is known (no outcome id / token).
+        """
+        entry = self._find_memory(match_id)
+        if entry is not None:
+            return entry
+        return self._find_disk(match_id)
+
+    async def afind(self, match_id: int) -> Optional[DemoUrlCacheEntry]:
+        entry = self._find_memory(match_id)
+        if entry is not None or self._db is None:
+            return entry
+        return await asyncio.to_thread(self._find_disk, match_id)
+
+    def _find_memory(self, match_id: int) -> Optional[DemoUrlCacheEntry]:
+        with self._lock:
+            key = self._match_keys.get(match_id)
+            if key is None:
+                return None
+            entry = self._memory[key]
+            if not self._expired(entry, time.time()):
+                self._memory.move_to_end(key)
+                return entry
+            self._forget(key)
+            return None
+
+    def _find_disk(self, match_id: int) -> Optional[DemoUrlCacheEntry]:
+        reader = self._reader()
+        if reader is None:
+            return None
+
+        row = reader.execute(
+            "SELECT outcome_id, token, demo_url, fetched_at, verify_status, content_length, verified_at "
+            "FROM demo_urls WHERE match_id = ? "
+            "ORDER BY fetched_at DESC LIMIT 1",
+            (to_sqlite_int(match_id),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        entry = self._entry(match_id, from_sqlite_int(row[0]), row[1], row[2:])
+        if self._expired(entry, time.time()):
+            return None
+
+        return self._remember_read((match_id, entry.outcome_id, entry.token), entry)
+
+    def get_match_info(self, match_id: int, outcome_id: int, token: int) -> Optional[bytes]:
+        key = (match_id, outcome_id, token)
+        with self._lock:
+            data = self._pending_info.get(key)
+        if data is not None:
+            return data
+        return self._get_match_info_disk(key)
+
+    async def aget_match_info(self, match_id: int, outcome_id: int, token: int) -> Optional[bytes]:
+        key = (match_id, outcome_id, token)
+        with self._lock:
+            data = self._pending_info.get(key)
+        if data is not None or self._db is None:
+            return data
+        return await asyncio.to_thread(self._get_match_info_disk, key)
+
+    def _get_match_info_disk(self, key: CacheKey) -> Optional[bytes]:
+        reader = self._reader()
+        if reader is None:
+            return None
+
+        match_id, outcome_id, token = key
+        row = reader.execute(
+            "SELECT match_info, fetched_at, verify_status FROM demo_urls "
+            "WHERE match_id = ? AND outcome_id = ? AND token = ?",
+            (to_sqlite_int(match_id), to_sqlite_int(outcome_id), token),
+        ).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+        if row[2] != DemoVerifyStatus.EXPIRED.value and self.ttl_sec > 0 and time.time() - row[1] > self.ttl_sec:
+            return None
+        return row[0]
+
+    def put(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        demo_url: str,
+        match_info: Optional[bytes] = None,
+    ) -> DemoUrlCacheEntry:
+        return self._store([(match_id, outcome_id, token, demo_url, match_info)])[0]
+
+    def put_many(self, entries: list[tuple[int, int, int, str, Optional[bytes]]]) -> None:
+        """
+        Stores several (match_id, outcome_id, token, demo_url, match_info) at once, in one SQLite transaction.
+        """
+        if entries:
+            self._store(entries)
+
+    def _store(self, entries: list[tuple[int, int, int, str, Optional[bytes]]]) -> list[DemoUrlCacheEntry]:
+        fetched_at = time.time()
+        stored = [
+            DemoUrlCacheEntry(match_id, outcome_id, token, demo_url=demo_url, fetched_at=fetched_at)
+            for match_id, outcome_id, token, demo_url, _ in entries
+        ]
+        with self._lock:
+            for entry, (_, _, _, _, match_info) in zip(stored, entries):
+                key = (entry.match_id, entry.outcome_id, entry.token)
+                self._remember(key, entry)
+                if match_info is not None and self._db is not None:
+                    self._pending_info[key] = match_info
+
+        if self._db is None:
+            return stored
+
+        rows = [
+            (to_sqlite_int(match_id), to_sqlite_int(outcome_id), token, demo_url, fetched_at, match_info)
+            for match_id, outcome_id, token, demo_url, match_info in entries
+        ]
+
+        def write(db: sqlite3.Connection) -> int:
+            try:
+                with db:
+                    db.execute("BEGIN")
+                    db.executemany(
+                        "INSERT OR REPLACE INTO demo_urls "
+                        "(match_id, outcome_id, token, demo_url, fetched_at, match_info) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            finally:
+                with self._lock:
+                    for match_id, outcome_id, token, _, match_info in entries:
+                        key = (match_id, outcome_id, token)
+                        if match_info is not None and self._pending_info.get(key) is match_info:
+                            del self._pending_info[key]
+            return len(rows)
+
+        self._writes.put(write)
+        return stored
+
+    def set_verification(
+        self,
+        entry: DemoUrlCacheEntry,
+        verify_status: DemoVerifyStatus,
+        content_length: Optional[int],
+    ) -> DemoUrlCacheEntry:
+        entry = replace(entry, verify_status=verify_status, content_length=content_length, verified_at=time.time())
+
+        with self._lock:
+            self._remember((entry.match_id, entry.outcome_id, entry.token), entry)
+
+        if self._db is not None:
+
+            def write(db: sqlite3.Connection) -> int:
+                db.execute(
+                    "UPDATE demo_urls SET verify_status = ?, content_length = ?, verified_at = ? "
+                    "WHERE match_id = ? AND outcome_id = ? AND token = ?",
+                    (
+                        verify_status.value,
+                        content_length,
+                        entry.verified_at,
+                        to_sqlite_int(entry.match_id),
+                        to_sqlite_int(entry.outcome_id),
+                        entry.token,
+                    ),
+                )
+                return 0
+
+            self._writes.put(write)
+
+        return entry
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the writes queued so far reached the disk, e.g. before other processes look for them.
+        """
+        if self._db is None:
+            return True
+
+        done = threading.Event()
+
+        def mark(db: sqlite3.Connection) -> int:
+            done.set()
+            return 0
+
+        self._writes.put(mark)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        with self._lock:
+            for reader in self._reader_dbs:
+                reader.close()
+            self._reader_dbs.clear()
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        if self._db is None:
+            return None
+
+        reader = getattr(self._readers, "db", None)
+        if reader is None:
+            reader = self._readers.db = connect_wal(self._path)
+            with self._lock:
+                self._reader_dbs.append(reader)
+        return reader
+
+    def _remember_read(self, key: CacheKey, entry: DemoUrlCacheEntry) -> DemoUrlCacheEntry:
+        with self._lock:
+            # a put that happened while the disk was read wins over what was read
+            current = self._memory.get(key)
+            if current is not None:
+                return current
+            self._remember(key, entry)
+            return entry
+
+    def _remember(self, key: CacheKey, entry: DemoUrlCacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        self._match_keys[key[0]] = key
+        while len(self._memory) > self.memory_size:
+            self._forget(next(iter(self._memory)))
+
+    def _forget(self, key: CacheKey) -> None:
+        del self._memory[key]
+        if self._match_keys.get(key[0]) == key:
+            del self._match_keys[key[0]]
+
+    def _write_loop(self) -> None:
+        rows_since_prune = 0
+        while True:
+            write = self._writes.get()
+            if write is None:
+                return
+
+            try:
+                rows_since_prune += write(self._db)
+                if rows_since_prune >= _PRUNE_EVERY:
+                    rows_since_prune = 0
+                    self._prune_disk()
+            except sqlite3.Error:
+                logger.exception("DemoUrlCache[_write_loop]: SQLite write failed")
+
+    def _prune_disk(self) -> None:
+        if self.ttl_sec > 0:
+            self._db.execute(
+                "DELETE FROM demo_urls WHERE fetched_at < ? AND verify_status IS NOT ?",
+                (time.time() - self.ttl_sec, DemoVerifyStatus.EXPIRED.value),
+            )
+
+        if self.disk_size > 0:
+            self._db.execute(
+                "DELETE FROM demo_urls WHERE fetched_at < ("
+                "SELECT fetched_at FROM demo_urls ORDER BY fetched_at DESC LIMIT 1 OFFSET ?"
+                ")",
+                (self.disk_size - 1,),
+            )
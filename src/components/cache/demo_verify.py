@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from components.cache.constants import DemoVerifyStatus
+from components.cache.demo_url import DemoUrlCache, DemoUrlCacheEntry
+from components.metrics.definitions import DEMO_VERIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+DemoVerification = tuple[DemoVerifyStatus, Optional[int]]
+
+
+class DemoUrlVerifier:
+    """
+    Checks that resolved demo URLs exist on the replay server with a HEAD request over a shared keep-alive pool,
+    and stores the outcome and Content-Length next to the URL in the DemoUrlCache.
+
+    Verified and missing results are trusted for ttl_sec, expired ones for good.
+    """
+
+    def __init__(
+        self,
+        demo_cache: Optional[DemoUrlCache],
+        ttl_sec: float = 24 * 3600,
+        timeout_sec: float = 5.0,
+        pool_size: int = 32,
+    ):
+        self.demo_cache = demo_cache
+        self.ttl_sec = ttl_sec
+        self.timeout_sec = timeout_sec
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # never more HEADs in flight than pooled connections
+        self._slots = asyncio.Semaphore(pool_size)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def averify(self, match_id: int, outcome_id: int, token: int, demo_url: str) -> DemoVerification:
+        entry = await self.demo_cache.aget(match_id, outcome_id, token) if self.demo_cache is not None else None
+        if entry is not None and entry.demo_url != demo_url:
+            entry = None
+
+        if entry is not None and self._fresh(entry):
+            DEMO_VERIFICATIONS.labels("cached").inc()
+            return entry.verify_status, entry.content_length
+
+        inflight = self._inflight.get(demo_url)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._averify(demo_url, entry))
+            self._inflight[demo_url] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(demo_url, None))
+
+        return await asyncio.shield(inflight)
+
+    def _fresh(self, entry: DemoUrlCacheEntry) -> bool:
+        if entry.verify_status is None or entry.verify_status == DemoVerifyStatus.UNKNOWN:
+            return False
+        if entry.verify_status == DemoVerifyStatus.EXPIRED:
+            return True
+        return time.time() - entry.verified_at < self.ttl_sec
+
+    async def _averify(self, demo_url: str, entry: Optional[DemoUrlCacheEntry]) -> DemoVerification:
+        was_verified = entry is not None and entry.verify_status == DemoVerifyStatus.VERIFIED
+
+        async with self._slots:
+            verify_status, content_length = await asyncio.to_thread(self._head, demo_url, was_verified)
+
+        DEMO_VERIFICATIONS.labels(verify_status.value).inc()
+        if entry is not None and verify_status != DemoVerifyStatus.UNKNOWN:
+            self.demo_cache.set_verification(entry, verify_status, content_length)
+        return verify_status, content_length
+
+    def _head(self, demo_url: str, was_verified: bool) -> DemoVerification:
+        try:
+            response = self._session.head(demo_url, timeout=self.timeout_sec, allow_redirects=True)
+        except requests.RequestException as exc:
+            logger.warning("DemoUrlVerifier[_head]: HEAD %s failed: %s", demo_url, exc)
+            return DemoVerifyStatus.UNKNOWN, None
+
+        if response.ok:
+            content_length = response.headers.get("Content-Length", "")
+            return DemoVerifyStatus.VERIFIED, int(content_length) if content_length.isdigit() else None
+
+        if response.status_code == 410 or (response.status_code == 404 and was_verified):
+            return DemoVerifyStatus.EXPIRED, None
+        if response.status_code == 404:
+            return DemoVerifyStatus.MISSING, None
+
+        logger.warning("DemoUrlVerifier[_head]: HEAD %s returned %s", demo_url, response.status_code)
+        return DemoVerifyStatus.UNKNOWN, None
+
+    def close(self) -> None:
+        self._session.close()
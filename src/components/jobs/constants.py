@@ -0,0 +1,19 @@
+from utils.base_types import StringEnum
+
+
+class JobStatus(StringEnum):
+    PENDING = "pending"
+    DONE = "done"
+
+
+class JobItemState(StringEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+
+
+class JobCallbackStatus(StringEnum):
+    NONE = "none"
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
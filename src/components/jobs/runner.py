@@ -0,0 +1,189 @@
+import asyncio
+import dataclasses
+import logging
+from typing import Optional
+
+import requests
+
+from components.jobs.constants import JobCallbackStatus
+from components.jobs.store import Job, JobItem, JobStore
+from components.metrics.definitions import JOBS_QUEUE_DEPTH
+from components.steam.constants import DemoLookupStatus, LookupPriority
+from components.steam.pool import SteamAPIPool
+from components.steam.steam import (
+    SteamAPIException,
+    SteamGCThrottledException,
+    SteamGCTimeoutException,
+    SteamGCUnavailableException,
+)
+
+logger = logging.getLogger(__name__)
+
+# how often the idle claimer looks for items whose retry delay has passed
+_IDLE_POLL_SEC = 1.0
+
+
+class JobRunner:
+    """
+    Drains the JobStore through the SteamAPIPool, at most `workers` items at a time,
+    and delivers completion callbacks.
+
+    One claimer task takes items from the store whenever a slot is free and waits for notify() (or the idle poll)
+    when there is nothing to claim; the store is only ever queried off the event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        steam_pool: SteamAPIPool,
+        workers: int = 16,
+        max_attempts: int = 5,
+        retry_delay_sec: float = 30.0,
+        callback_timeout_sec: float = 10.0,
+        callback_attempts: int = 3,
+        deliver_pending_callbacks: bool = True,
+    ):
+        self.store = store
+        self.steam_pool = steam_pool
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay_sec = retry_delay_sec
+        self.callback_timeout_sec = callback_timeout_sec
+        self.callback_attempts = callback_attempts
+        # with several workers sharing the store, one of them takes over the callbacks left pending at startup
+        self.deliver_pending_callbacks = deliver_pending_callbacks
+
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(workers)
+        self._claimer: Optional[asyncio.Task] = None
+        self._items: set[asyncio.Task] = set()
+        self._callbacks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.warning("JobRunner[start]: Requeued %s items left running by a previous process", requeued)
+
+        self._claimer = asyncio.create_task(self._claim_loop())
+        JOBS_QUEUE_DEPTH.set_function(self.store.queue_depth)
+
+        if self.deliver_pending_callbacks:
+            for job_id in self.store.pending_callbacks():
+                self._spawn_callback(job_id)
+
+    async def stop(self) -> None:
+        tasks = ([self._claimer] if self._claimer is not None else []) + list(self._items) + list(self._callbacks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._claimer = None
+
+    def notify(self, job: Optional[Job] = None) -> None:
+        self._wakeup.set()
+
+        # jobs made only of invalid codes are finished on creation
+        if job is not None and job.remaining == 0 and job.callback_status == JobCallbackStatus.PENDING:
+            self._spawn_callback(job.job_id)
+
+    async def _claim_loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+
+            # cleared before the claim: a notify() during it is not lost
+            self._wakeup.clear()
+            try:
+                items = await self.store.aclaim(1)
+            except Exception:
+                logger.exception("JobRunner[_claim_loop]: Claim failed")
+                items = []
+
+            if not items:
+                self._slots.release()
+                try:
+                    async with asyncio.timeout(_IDLE_POLL_SEC):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._run_item(items[0]))
+            self._items.add(task)
+            task.add_done_callback(self._items.discard)
+
+    async def _run_item(self, item: JobItem) -> None:
+        try:
+            await self._process(item)
+        except Exception as exc:
+            logger.exception("JobRunner[_run_item]: Failed to process item %s/%s", item.job_id, item.position)
+            await self._fail(item, exc)
+        finally:
+            self._slots.release()
+
+    async def _process(self, item: JobItem) -> None:
+        try:
+            # jobs are backfill traffic: they must not hold up users waiting for a demo
+            demo_url, _ = await self.steam_pool.aget_demo_url(
+                item.match_id, item.outcome_id, item.token, priority=LookupPriority.BULK
+            )
+        except (SteamGCUnavailableException, SteamGCThrottledException) as exc:
+            # GC circuit open or rate limited: come back once it is expected to let us in, without giving up on the item
+            await self.store.aretry(item, max(exc.retry_after, 1.0), str(exc), count_attempt=False)
+            return
+        except SteamAPIException as exc:
+            # the Steam connection or GC is down: keep the item queued until it comes back
+            status = DemoLookupStatus.TIMEOUT if isinstance(exc, SteamGCTimeoutException) else DemoLookupStatus.ERROR
+            if item.attempts < self.max_attempts:
+                await self.store.aretry(item, self.retry_delay_sec * item.attempts, str(exc))
+                return
+            finished = await self.store.afinish(item, status, detail=str(exc))
+        else:
+            status = DemoLookupStatus.OK if demo_url else DemoLookupStatus.NO_URL
+            finished = await self.store.afinish(item, status, demo_url=demo_url)
+
+        if finished:
+            self._spawn_callback(item.job_id)
+
+    async def _fail(self, item: JobItem, exc: Exception) -> None:
+        """
+        An item that failed with anything but a Steam error (a bug, the store) is retried like one
+        and finished as error after max_attempts, so its job still completes.
+        """
+        try:
+            if item.attempts < self.max_attempts:
+                await self.store.aretry(item, self.retry_delay_sec * item.attempts, str(exc))
+            elif await self.store.afinish(item, DemoLookupStatus.ERROR, detail=str(exc)):
+                self._spawn_callback(item.job_id)
+        except Exception:
+            logger.exception(
+                "JobRunner[_fail]: Item %s/%s is left running until the next start", item.job_id, item.position
+            )
+
+    def _spawn_callback(self, job_id: str) -> None:
+        task = asyncio.create_task(self._deliver_callback(job_id))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _deliver_callback(self, job_id: str) -> None:
+        job = await self.store.aget_job(job_id)
+        if job is None or not job.callback_url:
+            return
+
+        payload = dataclasses.asdict(job)
+        for attempt in range(1, self.callback_attempts + 1):
+            try:
+                response = await asyncio.to_thread(
+                    requests.post, job.callback_url, json=payload, timeout=self.callback_timeout_sec
+                )
+                if response.ok:
+                    await self.store.aset_callback_status(job_id, JobCallbackStatus.DELIVERED)
+                    return
+                logger.warning(
+                    "JobRunner[_deliver_callback]: Callback for job %s returned %s (attempt %s)",
+                    job_id, response.status_code, attempt,
+                )
+            except requests.RequestException:
+                logger.warning("JobRunner[_deliver_callback]: Callback for job %s failed (attempt %s)", job_id, attempt)
+
+            await asyncio.sleep(2 ** attempt)
+
+        await self.store.aset_callback_status(job_id, JobCallbackStatus.FAILED)
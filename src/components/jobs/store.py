@@ -0,0 +1,319 @@
+import asyncio
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from components.jobs.constants import JobCallbackStatus, JobItemState, JobStatus
+from components.steam.constants import DemoLookupStatus
+from utils.sqlite import connect_wal, from_sqlite_int, to_sqlite_int
+
+
+@dataclass
+class JobItem:
+    job_id: str
+    position: int
+    match_code: str
+    match_id: Optional[int] = None
+    outcome_id: Optional[int] = None
+    token: Optional[int] = None
+    state: JobItemState = JobItemState.QUEUED
+    status: Optional[DemoLookupStatus] = None
+    demo_url: Optional[str] = None
+    detail: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: JobStatus
+    created_at: float
+    finished_at: Optional[float]
+    callback_url: Optional[str]
+    callback_status: JobCallbackStatus
+    total: int
+    remaining: int
+    items: list[JobItem] = field(default_factory=list)
+
+
+_ITEM_COLUMNS = "job_id, position, match_code, match_id, outcome_id, token, state, status, demo_url, detail, attempts"
+
+
+def _item_from_row(row: tuple) -> JobItem:
+    return JobItem(
+        job_id=row[0],
+        position=row[1],
+        match_code=row[2],
+        match_id=from_sqlite_int(row[3]),
+        outcome_id=from_sqlite_int(row[4]),
+        token=row[5],
+        state=JobItemState(row[6]),
+        status=DemoLookupStatus(row[7]) if row[7] else None,
+        demo_url=row[8],
+        detail=row[9],
+        attempts=row[10],
+    )
+
+
+class JobStore:
+    """
+    Durable SQLite (WAL) queue of demo URL lookups grouped into jobs.
+
+    Items move queued -> running -> finished. Running items left behind by a crash
+    are put back with requeue_running(); finished items are never handed out again.
+
+    Several worker processes can share the store: claimed items are marked with the claiming worker's slot (owner),
+    so a worker only requeues what the previous process in its own slot left running.
+
+    The a* methods run the queries off the event loop: a write may wait for another worker's transaction.
+    """
+
+    def __init__(self, path: str, owner: int = 0):
+        self.owner = owner
+        self._lock = threading.Lock()
+        self._db = connect_wal(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                callback_url TEXT,
+                callback_status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                remaining INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                match_code TEXT NOT NULL,
+                match_id INTEGER,
+                outcome_id INTEGER,
+                token INTEGER,
+                state TEXT NOT NULL,
+                status TEXT,
+                demo_url TEXT,
+                detail TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS job_items_queue ON job_items (state, not_before);
+            CREATE INDEX IF NOT EXISTS jobs_callbacks ON jobs (callback_status);
+            """
+        )
+
+        # columns added after the first release
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(job_items)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE job_items ADD COLUMN owner INTEGER")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    async def acreate_job(self, items: list[JobItem], callback_url: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self.create_job, items, callback_url)
+
+    async def aclaim(self, limit: int = 1) -> list[JobItem]:
+        return await asyncio.to_thread(self.claim, limit)
+
+    async def aretry(
+        self, item: JobItem, delay_sec: float, detail: Optional[str] = None, count_attempt: bool = True
+    ) -> None:
+        await asyncio.to_thread(self.retry, item, delay_sec, detail, count_attempt)
+
+    async def afinish(
+        self,
+        item: JobItem,
+        status: DemoLookupStatus,
+        demo_url: Optional[str] = None,
+        detail: Optional[str] = None,
+    ) -> bool:
+        return await asyncio.to_thread(self.finish, item, status, demo_url, detail)
+
+    async def aget_job(self, job_id: str, with_items: bool = True) -> Optional[Job]:
+        return await asyncio.to_thread(self.get_job, job_id, with_items)
+
+    async def aset_callback_status(self, job_id: str, status: JobCallbackStatus) -> None:
+        await asyncio.to_thread(self.set_callback_status, job_id, status)
+
+    def create_job(self, items: list[JobItem], callback_url: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        remaining = sum(1 for item in items if item.state != JobItemState.FINISHED)
+        callback_status = JobCallbackStatus.PENDING if callback_url else JobCallbackStatus.NONE
+
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute(
+                "INSERT INTO jobs (job_id, created_at, finished_at, callback_url, callback_status, total, remaining) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, now, now if remaining == 0 else None, callback_url, callback_status, len(items), remaining),
+            )
+            self._db.executemany(
+                f"INSERT INTO job_items ({_ITEM_COLUMNS}, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job_id,
+                        position,
+                        item.match_code,
+                        to_sqlite_int(item.match_id) if item.match_id is not None else None,
+                        to_sqlite_int(item.outcome_id) if item.outcome_id is not None else None,
+                        item.token,
+                        item.state,
+                        item.status,
+                        item.demo_url,
+                        item.detail,
+                        item.attempts,
+                        now,
+                    )
+                    for position, item in enumerate(items)
+                ],
+            )
+
+        return job_id
+
+    def requeue_running(self) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE job_items SET state = ?, owner = NULL, updated_at = ? "
+                "WHERE state = ? AND (owner = ? OR owner IS NULL)",
+                (JobItemState.QUEUED, time.time(), JobItemState.RUNNING, self.owner),
+            )
+            return cursor.rowcount
+
+    def claim(self, limit: int = 1) -> list[JobItem]:
+        now = time.time()
+
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            rows = self._db.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM job_items WHERE state = ? AND not_before <= ? "
+                "ORDER BY not_before LIMIT ?",
+                (JobItemState.QUEUED, now, limit),
+            ).fetchall()
+
+            items = []
+            for row in rows:
+                item = _item_from_row(row)
+                item.state = JobItemState.RUNNING
+                item.attempts += 1
+                self._db.execute(
+                    "UPDATE job_items SET state = ?, attempts = ?, owner = ?, updated_at = ? "
+                    "WHERE job_id = ? AND position = ?",
+                    (item.state, item.attempts, self.owner, now, item.job_id, item.position),
+                )
+                items.append(item)
+
+        return items
+
+    def retry(
+        self, item: JobItem, delay_sec: float, detail: Optional[str] = None, count_attempt: bool = True
+    ) -> None:
+        """
+        Puts the item back in the queue; without count_attempt the claim does not count against max_attempts.
+        """
+        now = time.time()
+        attempts = item.attempts if count_attempt else item.attempts - 1
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_items SET state = ?, detail = ?, attempts = ?, not_before = ?, updated_at = ? "
+                "WHERE job_id = ? AND position = ? AND state = ?",
+                (
+                    JobItemState.QUEUED,
+                    detail,
+                    attempts,
+                    now + delay_sec,
+                    now,
+                    item.job_id,
+                    item.position,
+                    JobItemState.RUNNING,
+                ),
+            )
+
+    def finish(
+        self,
+        item: JobItem,
+        status: DemoLookupStatus,
+        demo_url: Optional[str] = None,
+        detail: Optional[str] = None,
+    ) -> bool:
+        """
+        Marks the item finished; returns True when it was the last unfinished item of its job.
+        """
+        now = time.time()
+
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            cursor = self._db.execute(
+                "UPDATE job_items SET state = ?, status = ?, demo_url = ?, detail = ?, updated_at = ? "
+                "WHERE job_id = ? AND position = ? AND state != ?",
+                (JobItemState.FINISHED, status, demo_url, detail, now, item.job_id, item.position, JobItemState.FINISHED),
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            self._db.execute("UPDATE jobs SET remaining = remaining - 1 WHERE job_id = ?", (item.job_id,))
+            (remaining,) = self._db.execute("SELECT remaining FROM jobs WHERE job_id = ?", (item.job_id,)).fetchone()
+            if remaining > 0:
+                return False
+
+            self._db.execute("UPDATE jobs SET finished_at = ? WHERE job_id = ?", (now, item.job_id))
+            return True
+
+    def get_job(self, job_id: str, with_items: bool = True) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, created_at, finished_at, callback_url, callback_status, total, remaining "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            items = []
+            if with_items:
+                items = [
+                    _item_from_row(item_row)
+                    for item_row in self._db.execute(
+                        f"SELECT {_ITEM_COLUMNS} FROM job_items WHERE job_id = ? ORDER BY position",
+                        (job_id,),
+                    )
+                ]
+
+        return Job(
+            job_id=row[0],
+            status=JobStatus.DONE if row[6] == 0 else JobStatus.PENDING,
+            created_at=row[1],
+            finished_at=row[2],
+            callback_url=row[3],
+            callback_status=JobCallbackStatus(row[4]),
+            total=row[5],
+            remaining=row[6],
+            items=items,
+        )
+
+    def pending_callbacks(self) -> list[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE callback_status = ? AND remaining = 0",
+                (JobCallbackStatus.PENDING,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_callback_status(self, job_id: str, status: JobCallbackStatus) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET callback_status = ? WHERE job_id = ?", (status, job_id))
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            (depth,) = self._db.execute(
+                "SELECT COUNT(*) FROM job_items WHERE state != ?",
+                (JobItemState.FINISHED,),
+            ).fetchone()
+        return depth
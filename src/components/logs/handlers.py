@@ -0,0 +1,156 @@
+import copy
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from components.metrics.definitions import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+
+# rate limiter keys kept at most; beyond that the table is reset rather than grown
+_RATE_LIMIT_MAX_KEYS = 10000
+
+
+class LogQueue:
+    """
+    One bounded queue of (handler, record) and one listener thread that hands each record to its handler.
+
+    Loggers get QueuedHandlers in front of their real handlers, so a slow stdout only ever stalls
+    the listener. When the queue is full records are dropped and counted, never waited for.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._handlers: dict[logging.Handler, QueuedHandler] = {}
+        self.dropped = 0
+        self._reported_dropped = 0
+
+    def handler_for(self, target: logging.Handler) -> "QueuedHandler":
+        handler = self._handlers.get(target)
+        if handler is None:
+            handler = self._handlers[target] = QueuedHandler(self, target)
+        return handler
+
+    def put(self, target: logging.Handler, record: logging.LogRecord) -> None:
+        try:
+            self._queue.put_nowait((target, record))
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._listen, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Writes out what is queued and stops the listener.
+        """
+        if self._thread is None:
+            return
+        # blocking put: the stop marker must get in even if the queue is full
+        self._queue.put((None, None))
+        self._thread.join()
+        self._thread = None
+
+    def _listen(self) -> None:
+        while True:
+            target, record = self._queue.get()
+            if target is None:
+                return
+
+            if self.dropped != self._reported_dropped:
+                # told on the first handler that has room again
+                dropped, self._reported_dropped = self.dropped - self._reported_dropped, self.dropped
+                self._handle(target, self._dropped_record(dropped))
+            self._handle(target, record)
+
+    @staticmethod
+    def _handle(target: logging.Handler, record: logging.LogRecord) -> None:
+        try:
+            target.handle(record)
+        except Exception:
+            target.handleError(record)
+
+    @staticmethod
+    def _dropped_record(dropped: int) -> logging.LogRecord:
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "LogQueue[_listen]: %s log records dropped, the log queue was full", (dropped,), None,
+        )
+
+
+class QueuedHandler(logging.Handler):
+    """
+    Stand-in for a real handler: prepares the record in the calling thread and queues it for the listener.
+    """
+
+    def __init__(self, log_queue: LogQueue, target: logging.Handler):
+        super().__init__(level=target.level)
+        self.log_queue = log_queue
+        self.target = target
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.log_queue.put(self.target, self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def prepare(record: logging.LogRecord) -> logging.LogRecord:
+        # args may be mutable objects that change before the listener gets to them: render the message now.
+        # exc_info stays, so the traceback is formatted by the listener, not here
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most burst records per (logger, level, message template) every window_sec.
+    The first record let through after some were suppressed says how many.
+
+    Only records of min_level and up are limited: access and info logs share a few templates by design.
+    """
+
+    def __init__(self, burst: int, window_sec: float, min_level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window_sec = window_sec
+        self.min_level = min_level
+        self._lock = threading.Lock()
+        # key -> [window start, records in the window, suppressed in the previous window(s)]
+        self._windows: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+
+        # logger.exception(exc) passes the exception itself as msg: key on its type, never keep the object
+        template = record.msg if isinstance(record.msg, str) else type(record.msg).__qualname__
+        key = (record.name, record.levelno, template)
+        now = time.monotonic()
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                if len(self._windows) >= _RATE_LIMIT_MAX_KEYS:
+                    self._windows.clear()
+                window = self._windows[key] = [now, 0, 0]
+            elif now - window[0] >= self.window_sec:
+                window[0], window[1] = now, 0
+
+            window[1] += 1
+            if window[1] > self.burst:
+                window[2] += 1
+                LOG_RECORDS_SUPPRESSED.labels(record.name).inc()
+                return False
+
+            suppressed, window[2] = window[2], 0
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
@@ -0,0 +1,53 @@
+import atexit
+import logging
+from logging.config import dictConfig
+from typing import Optional
+
+from components.logs.handlers import LogQueue, RateLimitFilter
+
+_log_queue: Optional[LogQueue] = None
+
+
+def configure_logging(
+    config: dict,
+    queue_size: int = 0,
+    rate_limit_burst: int = 0,
+    rate_limit_window_sec: float = 0.0,
+) -> None:
+    """
+    Applies a dictConfig, then puts a QueuedHandler in front of every configured handler,
+    so log calls only format the message and enqueue it. Safe to call again (e.g. once per app instance).
+    """
+    global _log_queue
+
+    if _log_queue is not None:
+        _log_queue.stop()
+        _log_queue = None
+
+    dictConfig(config)
+
+    rate_limit = None
+    if rate_limit_burst > 0 and rate_limit_window_sec > 0:
+        rate_limit = RateLimitFilter(rate_limit_burst, rate_limit_window_sec)
+
+    log_queue = LogQueue(queue_size) if queue_size > 0 else None
+    for name in config.get("loggers", {}):
+        logger = logging.getLogger(name or None)
+        handlers = [log_queue.handler_for(handler) if log_queue is not None else handler for handler in logger.handlers]
+        if rate_limit is not None:
+            for handler in handlers:
+                if rate_limit not in handler.filters:
+                    handler.addFilter(rate_limit)
+        logger.handlers = handlers
+
+    if log_queue is not None:
+        log_queue.start()
+        _log_queue = log_queue
+
+
+def _flush_logs() -> None:
+    if _log_queue is not None:
+        _log_queue.stop()
+
+
+atexit.register(_flush_logs)
@@ -0,0 +1,82 @@
+from components.metrics.prometheus import REGISTRY
+
+GC_WINDOW_WAIT_SECONDS = REGISTRY.histogram(
+    "pvb_gc_window_wait_seconds",
+    "Time spent waiting for a free slot in the GC request window",
+    ["account", "lane"],
+)
+GC_REQUEST_SECONDS = REGISTRY.histogram(
+    "pvb_gc_request_seconds",
+    "Round trip of request_full_match_info until the matching full_match_info arrives",
+    ["account"],
+)
+EXTRACT_DEMO_URL_SECONDS = REGISTRY.histogram(
+    "pvb_extract_demo_url_seconds",
+    "CPU time spent in extract_demo_url",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+
+GC_REQUESTS = REGISTRY.counter("pvb_gc_requests", "request_full_match_info calls sent to the GC", ["account"])
+GC_TIMEOUTS = REGISTRY.counter("pvb_gc_timeouts", "request_full_match_info calls that timed out", ["account"])
+GC_RETRIES = REGISTRY.counter("pvb_gc_retries", "Lookups retried after a GC timeout", ["account"])
+GC_RETRIES_DENIED = REGISTRY.counter(
+    "pvb_gc_retries_denied", "Retries skipped because the retry budget was exhausted", ["account"]
+)
+DEADLINE_EXCEEDED = REGISTRY.counter("pvb_deadline_exceeded", "Lookups that ran out of the caller's deadline", ["account"])
+GC_RELAUNCHES = REGISTRY.counter("pvb_gc_relaunches", "GC relaunches", ["account", "reason"])
+STEAM_RECONNECTS = REGISTRY.counter("pvb_steam_reconnects", "Steam reconnects", ["account"])
+STEAM_RELOGINS = REGISTRY.counter("pvb_steam_relogins", "Automatic Steam re-logins", ["account"])
+STEAM_CM_FAILOVERS = REGISTRY.counter(
+    "pvb_steam_cm_failovers", "Steam disconnects after which the next best CM server is used", ["account"]
+)
+GC_REQUESTS_REISSUED = REGISTRY.counter(
+    "pvb_gc_requests_reissued", "full_match_info requests sent again after the GC session was lost", ["account"]
+)
+LOOKUPS_COALESCED = REGISTRY.counter(
+    "pvb_lookups_coalesced", "Lookups that joined an in-flight lookup for the same match", ["account"]
+)
+LOOKUP_CLAIM_WAITS = REGISTRY.counter(
+    "pvb_lookup_claim_waits",
+    "Lookups that waited for another worker process resolving the same match, by how the wait ended "
+    "(unavailable: the claims table was busy, the lookup was done without waiting)",
+    ["result"],
+)
+GC_FAST_FAILS = REGISTRY.counter(
+    "pvb_gc_fast_fails", "Lookups rejected right away because the GC circuit was open", ["account"]
+)
+GC_ADMISSION_REJECTED = REGISTRY.counter(
+    "pvb_gc_admission_rejected", "Lookups shed with 429 before reaching the GC", ["account", "reason"]
+)
+REQUESTS_REJECTED = REGISTRY.counter("pvb_requests_rejected", "API requests rejected with 429", ["client", "reason"])
+DEMO_CACHE_REQUESTS = REGISTRY.counter("pvb_demo_cache_requests", "Demo URL cache lookups", ["result"])
+LOG_RECORDS_DROPPED = REGISTRY.counter("pvb_log_records_dropped", "Log records dropped because the log queue was full")
+LOG_RECORDS_SUPPRESSED = REGISTRY.counter(
+    "pvb_log_records_suppressed", "Repeated log records suppressed by the rate limit", ["logger"]
+)
+EVENT_LOOP_BLOCKED = REGISTRY.counter(
+    "pvb_event_loop_blocked", "Times an event loop did not run for longer than the blocking threshold", ["loop"]
+)
+DEMO_VERIFICATIONS = REGISTRY.counter(
+    "pvb_demo_verifications", "Demo URL liveness checks by result (cached = answered from the cache)", ["result"]
+)
+DEMO_FILE_REQUESTS = REGISTRY.counter("pvb_demo_file_requests", "Demo file cache lookups", ["result"])
+
+GC_CONNECTION_STATUS = REGISTRY.gauge(
+    "pvb_gc_connection_status", "GCConnectionStatus of the account (0 = HAVE_SESSION)", ["account"]
+)
+GC_CIRCUIT_OPEN = REGISTRY.gauge(
+    "pvb_gc_circuit_open", "1 while the account's GC is offline or backing off and lookups fail fast", ["account"]
+)
+GC_TIMEOUT_SECONDS = REGISTRY.gauge(
+    "pvb_gc_timeout_seconds", "Current adaptive timeout of request_full_match_info", ["account"]
+)
+STEAM_CM_LATENCY_SECONDS = REGISTRY.gauge(
+    "pvb_steam_cm_latency_seconds", "Probed connect latency of the best ranked CM server", ["account"]
+)
+GC_QUEUE_DEPTH = REGISTRY.gauge(
+    "pvb_gc_queue_depth", "Lookups waiting for a slot in the GC request window", ["account", "lane"]
+)
+GC_IN_FLIGHT = REGISTRY.gauge("pvb_gc_in_flight", "request_full_match_info calls awaiting an answer", ["account"])
+LOOKUPS_IN_FLIGHT = REGISTRY.gauge("pvb_lookups_in_flight", "Lookups handed to the gevent hub", ["account"])
+JOBS_QUEUE_DEPTH = REGISTRY.gauge("pvb_jobs_queue_depth", "Unfinished job items in the durable queue")
+DEMO_FILES_BYTES = REGISTRY.gauge("pvb_demo_files_bytes", "Size of the demo files kept in the on-disk cache")
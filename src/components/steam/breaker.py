@@ -0,0 +1,108 @@
+import random
+import time
+from typing import Optional
+
+from components.steam.constants import GCState
+
+
+class GCCircuitBreaker:
+    """
+    Readiness state machine of one account's GC session, driven by Steam/GC events.
+
+        OFFLINE --launch--> LAUNCHING --ready--> READY --notready--> LAUNCHING
+        READY --Steam disconnect, relogin possible--> LAUNCHING
+        LAUNCHING --launch timeout--> BACKOFF --relaunch--> LAUNCHING
+        READY --N consecutive request timeouts--> BACKOFF
+
+    Requests are let through while READY and wait for the session while LAUNCHING;
+    OFFLINE and BACKOFF fail fast with a retry hint.
+    Only the hub thread changes the state; other threads just read it.
+    """
+
+    def __init__(
+        self,
+        launch_timeout_sec: float,
+        backoff_base_sec: float,
+        backoff_max_sec: float,
+        trip_after_timeouts: int,
+    ):
+        self.launch_timeout_sec = launch_timeout_sec
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.trip_after_timeouts = trip_after_timeouts
+
+        self.state = GCState.OFFLINE
+        # launch attempts that did not end in a session, reset by ready
+        self.failures = 0
+        # LAUNCHING: when the launch is given up; BACKOFF: when the next relaunch is due (time.monotonic)
+        self.deadline = 0.0
+        self._consecutive_timeouts = 0
+
+    @property
+    def allows_requests(self) -> bool:
+        return self.state in (GCState.READY, GCState.LAUNCHING)
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        if self.state == GCState.READY:
+            return 0.0
+        if self.state == GCState.OFFLINE:
+            return self.launch_timeout_sec
+        return max(0.0, self.deadline - now)
+
+    def seconds_to_deadline(self, now: Optional[float] = None) -> Optional[float]:
+        if self.state not in (GCState.LAUNCHING, GCState.BACKOFF):
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.deadline - now)
+
+    def on_launch(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.state = GCState.LAUNCHING
+        self.deadline = now + self.launch_timeout_sec
+
+    def on_ready(self) -> None:
+        self.state = GCState.READY
+        self.failures = 0
+        self._consecutive_timeouts = 0
+
+    def on_session_lost(self, now: Optional[float] = None) -> None:
+        # the GC client keeps knocking by itself; give it a launch timeout before relaunching
+        if self.state == GCState.READY:
+            self.on_launch(now)
+
+    def on_reconnect(self, now: Optional[float] = None) -> None:
+        # reconnect, relogin and relaunch all have to fit in one launch timeout; a pending backoff still applies
+        if self.state != GCState.BACKOFF:
+            self.on_launch(now)
+
+    def on_offline(self) -> None:
+        self.state = GCState.OFFLINE
+        self._consecutive_timeouts = 0
+
+    def on_failure(self, now: Optional[float] = None) -> float:
+        """
+        Opens the circuit; returns the backoff before the next relaunch.
+        """
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        delay = min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (self.failures - 1))
+        # jitter, so accounts that failed together do not relaunch together
+        delay *= random.uniform(0.8, 1.0)
+
+        self.state = GCState.BACKOFF
+        self.deadline = now + delay
+        self._consecutive_timeouts = 0
+        return delay
+
+    def on_reply(self) -> None:
+        self._consecutive_timeouts = 0
+
+    def on_timeout(self) -> bool:
+        """
+        Returns True when the session should be considered wedged.
+        """
+        if self.state != GCState.READY:
+            return False
+        self._consecutive_timeouts += 1
+        return self._consecutive_timeouts >= self.trip_after_timeouts
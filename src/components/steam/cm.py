@@ -0,0 +1,102 @@
+import logging
+import math
+import random
+import time
+from typing import Optional
+
+import gevent
+from gevent import socket
+from gevent.pool import Pool
+from steam.core.cm import CMServerList
+
+logger = logging.getLogger(__name__)
+
+ServerAddr = tuple[str, int]
+
+# weight of a new probe in the latency average
+_LATENCY_EWMA_ALPHA = 0.5
+
+
+class RankedCMServerList(CMServerList):
+    """
+    CMServerList that hands servers to CMClient.connect() fastest first, by measured TCP connect latency,
+    instead of in random order. Servers that were not probed yet come after the measured ones.
+
+    CMClient.connect() only asks for the next server after the previous one failed,
+    so every server handed out and then passed over is marked bad for bad_timestamp seconds.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.latency: dict[ServerAddr, float] = {}
+        # best_latency() as of the last probe, for readers on other threads (the metrics exporter):
+        # best_latency() itself may reset the server list
+        self.best_latency_sec: float = math.nan
+
+    def observe(self, server_addr: ServerAddr, latency_sec: float) -> None:
+        prev = self.latency.get(server_addr)
+        self.latency[server_addr] = latency_sec if prev is None else prev + _LATENCY_EWMA_ALPHA * (latency_sec - prev)
+
+    def ranked(self) -> list[ServerAddr]:
+        now = time.time()
+        usable = [
+            server_addr
+            for server_addr, meta in self.list.items()
+            if meta["quality"] == CMServerList.Good or now - meta["timestamp"] > self.bad_timestamp
+        ]
+        if not usable:
+            # all of them failed lately: start over rather than give up
+            self.reset_all()
+            usable = list(self.list)
+
+        unmeasured = [server_addr for server_addr in usable if server_addr not in self.latency]
+        random.shuffle(unmeasured)
+        measured = sorted((server_addr for server_addr in usable if server_addr in self.latency), key=self.latency.get)
+        return measured + unmeasured
+
+    def __iter__(self):
+        def ranked_iter():
+            for server_addr in self.ranked():
+                yield server_addr
+                self.mark_bad(server_addr)
+
+        return ranked_iter()
+
+    def best_latency(self) -> Optional[float]:
+        ranked = self.ranked()
+        return self.latency.get(ranked[0]) if ranked else None
+
+    def probe(self, timeout_sec: float, concurrency: int) -> int:
+        """
+        Measures the TCP connect time of every server; unreachable ones are marked bad.
+        Returns the number of reachable servers.
+        """
+        servers = list(self.list)
+        if not servers:
+            return 0
+
+        reachable = 0
+        for server_addr, latency_sec in Pool(concurrency).imap_unordered(
+            lambda addr: (addr, _connect_latency(addr, timeout_sec)), servers
+        ):
+            if latency_sec is None:
+                self.mark_bad(server_addr)
+                continue
+            self.observe(server_addr, latency_sec)
+            self.mark_good(server_addr)
+            reachable += 1
+
+        best_latency = self.best_latency()
+        self.best_latency_sec = math.nan if best_latency is None else best_latency
+        return reachable
+
+
+def _connect_latency(server_addr: ServerAddr, timeout_sec: float) -> Optional[float]:
+    started = time.perf_counter()
+    try:
+        sock = socket.create_connection(server_addr, timeout=timeout_sec)
+    except (OSError, gevent.Timeout):
+        return None
+    latency_sec = time.perf_counter() - started
+    sock.close()
+    return latency_sec
@@ -5,4 +5,31 @@ class SteamLoginStatus(StringEnum):
     SUCCESS = "SUCCESS"
     FAILED = "FAILED"
     EMAIL_CODE_REQUIRED = "EMAIL_CODE_REQUIRED"
-    TWO_FACTOR_CODE_REQUIRED = "TWO_FACTOR_CODE_REQUIRED"
\ No newline at end of file
+    TWO_FACTOR_CODE_REQUIRED = "TWO_FACTOR_CODE_REQUIRED"
+
+class DemoLookupStatus(StringEnum):
+    OK = "ok"
+    INVALID_CODE = "invalid_code"
+    INVALID_STEAMID = "invalid_steamid"
+    TIMEOUT = "timeout"
+    NO_URL = "no_url"
+    ERROR = "error"
+    UNAVAILABLE = "unavailable"
+    THROTTLED = "throttled"
+
+
+class GCState(StringEnum):
+    # not logged in / Steam disconnected
+    OFFLINE = "offline"
+    # launched, waiting for the GC session
+    LAUNCHING = "launching"
+    READY = "ready"
+    # launch failed or the session is wedged: circuit open until the next relaunch
+    BACKOFF = "backoff"
+
+
+class LookupPriority(StringEnum):
+    # a user waiting for a demo
+    INTERACTIVE = "interactive"
+    # batch / backfill traffic
+    BULK = "bulk"
@@ -4,9 +4,9 @@ Looks crazy but works fine =)
 """
 
 import re
+from dataclasses import dataclass
 from typing import Any, Iterable
 
-from google.protobuf.json_format import MessageToDict
 from google.protobuf.message import Message
 
 DEMO_URL_KEYS = ("demo_url", "demo_download_url", "download_url", "url")
@@ -17,6 +17,16 @@ RE_FULL_DEMO_URL = re.compile(
 )
 RE_REPLAY_HOST = re.compile(r"(replay\d+\.valve\.net)", re.IGNORECASE)
 RE_730_PREFIX = re.compile(r"https?://replay\d+\.valve\.net/730/?$", re.IGNORECASE)
+RE_DEMO_TOKEN = re.compile(r"/\d{1,30}_(\d{1,15})\.dem(?:\.bz2)?$", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class MatchDemo:
+    match_id: int
+    outcome_id: int
+    token: int
+    match_time: int
+    demo_url: str | None
 
 def find_first_url(obj: Any) -> str | None:
 
@@ -53,17 +63,26 @@ def _demo_filename(match_id: int, token: int) -> str:
     return f"{match_id:021d}_{token:010d}.dem.bz2"
 
 def _iter_strings(obj: Any) -> Iterable[str]:
+    """
+    Lazily yields every key/string found in obj. Protos are walked field by field
+    (no MessageToDict), so callers can stop early without paying for the whole message.
+    """
     if obj is None:
         return
 
+    if isinstance(obj, str):
+        yield obj
+        return
+
     if isinstance(obj, Message):
-        try:
-            obj = MessageToDict(obj, preserving_proto_field_name=True)
-        except Exception:
-            for field_desc, value in obj.ListFields():
-                yield field_desc.name
+        for field_desc, value in obj.ListFields():
+            yield field_desc.name
+            if field_desc.label == field_desc.LABEL_REPEATED:
+                for item in value:
+                    yield from _iter_strings(item)
+            else:
                 yield from _iter_strings(value)
-            return
+        return
 
     if isinstance(obj, dict):
         for k, v in obj.items():
@@ -77,15 +96,8 @@ def _iter_strings(obj: Any) -> Iterable[str]:
             yield from _iter_strings(x)
         return
 
-    if isinstance(obj, str):
-        yield obj
-        return
-
     if isinstance(obj, (bytes, bytearray)):
-        try:
-            yield obj.decode("utf-8", errors="ignore")
-        except Exception:
-            pass
+        yield obj.decode("utf-8", errors="ignore")
         return
 
     if hasattr(obj, "__dict__"):
@@ -96,37 +108,131 @@ def _iter_strings(obj: Any) -> Iterable[str]:
         return
 
 
+def _url_from_map(value: str, match_id: int, token: int) -> str | None:
+    # round stats `map` normally holds the full replay URL, sometimes only the /730/ prefix
+    if not value.startswith(("http://replay", "https://replay")):
+        return None
+
+    if value.endswith((".dem.bz2", ".dem")):
+        return value
+
+    if value.endswith(("/730/", "/730")):
+        return value.rstrip("/") + "/" + _demo_filename(match_id, token)
+
+    return None
+
+
+def extract_demo_url_fast(msg: Any, match_id: int, token: int) -> str | None:
+    """
+    Reads the replay URL from CMsgGCCStrike15_v2_MatchList round stats directly.
+    """
+    matches = getattr(msg, "matches", None)
+    if not matches:
+        return None
+
+    for match in matches:
+        if match.matchid and match.matchid != match_id:
+            continue
+
+        url = match_demo_url(match, match_id, token)
+        if url:
+            return url
+
+    return None
+
+
+def match_demo_url(match: Any, match_id: int, token: int) -> str | None:
+    """
+    Demo URL of one CDataGCCStrike15_v2_MatchInfo, None when it has none.
+    """
+    # the last round carries the final reservation, walk backwards
+    roundstats = match.roundstatsall
+    for i in range(len(roundstats) - 1, -1, -1):
+        value = roundstats[i].map
+        if value:
+            url = _url_from_map(value, match_id, token)
+            if url:
+                return url
+
+    if match.HasField("roundstats_legacy"):
+        value = match.roundstats_legacy.map
+        if value:
+            return _url_from_map(value, match_id, token)
+
+    return None
+
+
+def extract_match_demos(msg: Any) -> list[MatchDemo]:
+    """
+    Every match of a CMsgGCCStrike15_v2_MatchList (recent_user_games) with its share code parts and demo URL,
+    in one pass over the message. The share code token is the match's tv_port.
+    """
+    demos = []
+    for match in getattr(msg, "matches", ()):
+        if not match.matchid:
+            continue
+
+        roundstats = match.roundstatsall
+        if roundstats:
+            outcome_id = roundstats[-1].reservationid
+        elif match.HasField("roundstats_legacy"):
+            outcome_id = match.roundstats_legacy.reservationid
+        else:
+            outcome_id = match.watchablematchinfo.reservation_id
+
+        token = match.watchablematchinfo.tv_port
+        demo_url = match_demo_url(match, match.matchid, token)
+        if demo_url and not token:
+            m = RE_DEMO_TOKEN.search(demo_url)
+            if m:
+                token = int(m.group(1))
+
+        demos.append(MatchDemo(match.matchid, outcome_id, token, match.matchtime, demo_url))
+
+    return demos
+
+
 def extract_demo_url(msg: Any, match_id: int, token: int) -> str | None:
-    strings = list(_iter_strings(msg))
+    if isinstance(msg, Message):
+        try:
+            url = extract_demo_url_fast(msg, match_id, token)
+        except (AttributeError, ValueError):
+            url = None
+        if url:
+            return url
+
+    return extract_demo_url_scan(msg, match_id, token)
+
+
+def extract_demo_url_scan(msg: Any, match_id: int, token: int) -> str | None:
+    """
+    Single lazy pass over every string in msg. Candidates rank like the old separate passes:
+    full URL > /730/ prefix > replay host. Returns as soon as a full URL shows up.
+    (The old loose-path pass needed a replay host in the same string, so the host pass always won first.)
+    """
+    filename = _demo_filename(match_id, token)
+
+    best: str | None = None
+    best_rank = 3
 
-    for s in strings:
+    for s in _iter_strings(msg):
         m = RE_FULL_DEMO_URL.search(s)
         if m:
             return m.group(0)
 
-    filename = _demo_filename(match_id, token)
+        if best_rank <= 1:
+            continue
 
-    for s in strings:
         s2 = s.strip()
         if RE_730_PREFIX.match(s2):
-            base = s2.rstrip("/") + "/"
-            return base + filename
+            best, best_rank = s2.rstrip("/") + "/" + filename, 1
+            continue
+
+        if best_rank <= 2:
+            continue
 
-    # 2b) Ищем просто host
-    for s in strings:
         m = RE_REPLAY_HOST.search(s)
         if m:
-            host = m.group(1)
-            return f"http://{host}/730/{filename}"
-
-    loose_path = f"/730/{match_id:021d}_{token:010d}.dem"
-    for s in strings:
-        if loose_path in s:
-            m = RE_REPLAY_HOST.search(s)
-            if m:
-                host = m.group(1)
-                tail = s[s.find("/730/"):]
-                tail = tail.split()[0].strip('"\',')
-                return f"http://{host}{tail}"
+            best, best_rank = f"http://{m.group(1)}/730/{filename}", 2
 
-    return None
\ No newline at end of file
+    return best
@@ -0,0 +1,239 @@
+"""
+In-process stand-ins for SteamClient / CSGOClient, for load tests and local runs without Steam.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import gevent
+from csgo.proto_enums import GCConnectionStatus
+from eventemitter import EventEmitter
+from steam.enums import EResult
+
+from components.steam.fixtures import build_match_list, build_recent_games, load_match_lists
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeGCConfig:
+    # GC round trip of request_full_match_info: latency_sec +- latency_jitter_sec
+    latency_sec: float = 0.2
+    latency_jitter_sec: float = 0.1
+    # probability that a request_full_match_info never gets an answer
+    drop_rate: float = 0.0
+    # probability per second that the Steam connection drops
+    disconnect_rate: float = 0.0
+    # time from launch() to HAVE_SESSION
+    launch_latency_sec: float = 0.5
+    connect_latency_sec: float = 0.05
+    fixtures_dir: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class FakeSteamClient(EventEmitter):
+    def __init__(self, config: FakeGCConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+
+        self.connected = False
+        self.logged_on = False
+        self.username: Optional[str] = None
+        self.login_key: Optional[str] = None
+        self.credential_location: Optional[str] = None
+        self.relogin_available = False
+        self.current_games_played: list[int] = []
+
+    def connect(self, *args, **kwargs) -> bool:
+        gevent.sleep(self.config.connect_latency_sec)
+        self.connected = True
+        self.emit("connected")
+        return True
+
+    def disconnect(self) -> None:
+        self._drop(emit=True)
+
+    def run_forever(self) -> None:
+        while True:
+            gevent.sleep(1)
+            if self.connected and self.random.random() < self.config.disconnect_rate:
+                logger.warning("FakeSteamClient[run_forever]: Simulated disconnect")
+                self._drop(emit=True)
+
+    def set_credential_location(self, path: str) -> None:
+        self.credential_location = path
+
+    def login(
+        self, username, password=None, login_key=None, auth_code=None, two_factor_code=None, *args, **kwargs
+    ) -> EResult:
+        if not self.connected:
+            return EResult.TryAnotherCM
+        # any key is accepted, like one issued to the previous process
+        if not password and not login_key:
+            return EResult.InvalidPassword
+
+        self.username = username
+        self.logged_on = True
+        self.relogin_available = True
+        self.emit("logged_on")
+
+        if not login_key:
+            self.login_key = f"fake-login-key-{self.random.getrandbits(64):x}"
+            self.emit("new_login_key")
+        else:
+            self.login_key = login_key
+        return EResult.OK
+
+    def relogin(self) -> EResult:
+        if not self.relogin_available or not self.connected:
+            return EResult.Fail
+        self.logged_on = True
+        self.emit("logged_on")
+        return EResult.OK
+
+    def logout(self) -> None:
+        self.logged_on = False
+        self.relogin_available = False
+        self.current_games_played = []
+        self.emit("logged_off", EResult.OK)
+
+    def games_played(self, app_ids: list[int]) -> None:
+        self.current_games_played = list(app_ids)
+
+    def _drop(self, emit: bool) -> None:
+        was_connected = self.connected
+        self.connected = False
+        self.logged_on = False
+        self.current_games_played = []
+        if emit and was_connected:
+            self.emit("disconnected")
+
+
+class FakeCSGOClient(EventEmitter):
+    app_id = 730
+
+    def __init__(self, steam_client: FakeSteamClient, config: FakeGCConfig):
+        self.steam = steam_client
+        self.config = config
+        self.random = random.Random(None if config.seed is None else config.seed + 1)
+
+        self.connection_status = GCConnectionStatus.NO_SESSION
+        self.ready = False
+
+        self.fixtures = {}
+        if config.fixtures_dir:
+            self.fixtures = {msg.matches[0].matchid: msg for msg in load_match_lists(config.fixtures_dir) if msg.matches}
+
+        # bumped on every session loss; replies computed for an older session are dropped
+        self._session = 0
+        self._launching: Optional[gevent.Greenlet] = None
+        self._flap_until = 0.0
+
+        self.steam.on("disconnected", self._on_steam_disconnected)
+
+    def launch(self) -> None:
+        if not self.steam.logged_on:
+            self.steam.wait_event("logged_on")
+
+        if self.app_id not in self.steam.current_games_played:
+            self.steam.games_played(self.steam.current_games_played + [self.app_id])
+
+        if self._launching is None or self._launching.dead:
+            self._launching = gevent.spawn(self._establish_session)
+
+    def exit(self) -> None:
+        if self._launching is not None:
+            self._launching.kill()
+            self._launching = None
+        if self.app_id in self.steam.current_games_played:
+            self.steam.games_played([app_id for app_id in self.steam.current_games_played if app_id != self.app_id])
+        self._set_connection_status(GCConnectionStatus.NO_SESSION)
+
+    def flap(self, duration_sec: float) -> None:
+        """
+        Drops the GC session and refuses to give it back for duration_sec.
+        """
+        self._flap_until = time.monotonic() + duration_sec
+        self._set_connection_status(GCConnectionStatus.NO_SESSION_IN_LOGON_QUEUE)
+
+        # like CSGOClient's hello loop, keep knocking until the GC takes us back
+        if self._launching is None or self._launching.dead:
+            self._launching = gevent.spawn(self._establish_session)
+
+    def request_full_match_info(self, matchid: int, outcomeid: int, token: int) -> None:
+        if self.connection_status != GCConnectionStatus.HAVE_SESSION:
+            return
+        if self.random.random() < self.config.drop_rate:
+            return
+
+        gevent.spawn(self._reply_full_match_info, self._session, matchid, outcomeid, token)
+
+    def request_recent_user_games(self, account_id: int) -> None:
+        if self.connection_status != GCConnectionStatus.HAVE_SESSION:
+            return
+        if self.random.random() < self.config.drop_rate:
+            return
+
+        gevent.spawn(self._reply_recent_user_games, self._session, account_id)
+
+    def _reply_recent_user_games(self, session: int, account_id: int) -> None:
+        jitter = self.random.uniform(-self.config.latency_jitter_sec, self.config.latency_jitter_sec)
+        gevent.sleep(max(0.0, self.config.latency_sec + jitter))
+
+        if session != self._session or self.connection_status != GCConnectionStatus.HAVE_SESSION:
+            return
+
+        self.emit("recent_user_games", build_recent_games(account_id))
+
+    def _reply_full_match_info(self, session: int, matchid: int, outcomeid: int, token: int) -> None:
+        jitter = self.random.uniform(-self.config.latency_jitter_sec, self.config.latency_jitter_sec)
+        gevent.sleep(max(0.0, self.config.latency_sec + jitter))
+
+        if session != self._session or self.connection_status != GCConnectionStatus.HAVE_SESSION:
+            return
+
+        msg = self.fixtures.get(matchid)
+        if msg is None:
+            msg = build_match_list(matchid, outcomeid, token, rounds=3)
+        self.emit("full_match_info", msg)
+
+    def _establish_session(self) -> None:
+        gevent.sleep(self.config.launch_latency_sec)
+
+        flap_left = self._flap_until - time.monotonic()
+        if flap_left > 0:
+            gevent.sleep(flap_left)
+
+        if self.steam.logged_on and self.app_id in self.steam.current_games_played:
+            self._set_connection_status(GCConnectionStatus.HAVE_SESSION)
+
+    def _on_steam_disconnected(self, *args) -> None:
+        self._set_connection_status(GCConnectionStatus.NO_SESSION)
+
+    def _set_connection_status(self, status: GCConnectionStatus) -> None:
+        prev_status = self.connection_status
+        self.connection_status = status
+
+        if status != GCConnectionStatus.HAVE_SESSION:
+            self._session += 1
+
+        if status != prev_status:
+            self.emit("connection_status", status)
+
+        if status == GCConnectionStatus.HAVE_SESSION and not self.ready:
+            self.ready = True
+            self.emit("ready")
+        elif status != GCConnectionStatus.HAVE_SESSION and self.ready:
+            self.ready = False
+            self.emit("notready")
+
+
+def fake_client_factory(config: FakeGCConfig) -> Callable[[], tuple[FakeSteamClient, FakeCSGOClient]]:
+    def _factory() -> tuple[FakeSteamClient, FakeCSGOClient]:
+        steam_client = FakeSteamClient(config)
+        return steam_client, FakeCSGOClient(steam_client, config)
+
+    return _factory
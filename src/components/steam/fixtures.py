@@ -0,0 +1,91 @@
+"""
+Recorded / synthetic CMsgGCCStrike15_v2_MatchList messages for benchmarks and the fake GC.
+"""
+
+import os
+import random
+from pathlib import Path
+
+from csgo.enums import ECsgoGCMsg
+from csgo.protobufs import cstrike15_gcmessages_pb2 as pb_gclient
+
+FIXTURE_SUFFIX = ".matchlist.bin"
+
+
+def build_match_list(
+    match_id: int,
+    outcome_id: int,
+    token: int,
+    rounds: int = 30,
+    players: int = 10,
+    replay_host: str = "replay183.valve.net",
+    msgrequestid: int = ECsgoGCMsg.EMsgGCCStrike15_v2_MatchListRequestFullGameInfo,
+) -> pb_gclient.CMsgGCCStrike15_v2_MatchList:
+    """
+    Builds a full_match_info-shaped message with per-round stats for every player,
+    the replay URL set on the last round like the real GC does.
+    """
+    rnd = random.Random(match_id)
+    account_ids = [rnd.randrange(10 ** 8, 10 ** 9) for _ in range(players)]
+
+    msg = pb_gclient.CMsgGCCStrike15_v2_MatchList(msgrequestid=msgrequestid, servertime=1700000000)
+    match = msg.matches.add(matchid=match_id, matchtime=1700000000)
+    match.watchablematchinfo.server_ip = rnd.getrandbits(32)
+    # the GC hands the share code token out as tv_port
+    match.watchablematchinfo.tv_port = token
+    match.watchablematchinfo.game_map = "de_mirage"
+    match.watchablematchinfo.game_mapgroup = "mg_active"
+    match.watchablematchinfo.reservation_id = outcome_id
+
+    for round_no in range(1, rounds + 1):
+        stats = match.roundstatsall.add(reservationid=outcome_id, round=round_no)
+        stats.reservation.account_ids.extend(account_ids)
+        stats.reservation.match_id = match_id
+        stats.kills.extend(rnd.randrange(0, round_no + 1) for _ in range(players))
+        stats.assists.extend(rnd.randrange(0, round_no + 1) for _ in range(players))
+        stats.deaths.extend(rnd.randrange(0, round_no + 1) for _ in range(players))
+        stats.scores.extend(rnd.randrange(0, 3 * round_no + 1) for _ in range(players))
+        stats.pings.extend(rnd.randrange(5, 120) for _ in range(players))
+        stats.enemy_kills.extend(rnd.randrange(0, 3) for _ in range(players))
+        stats.enemy_headshots.extend(rnd.randrange(0, 3) for _ in range(players))
+        stats.mvps.extend(rnd.randrange(0, 2) for _ in range(players))
+        stats.team_scores.extend([round_no // 2, round_no - round_no // 2])
+        stats.round_result = rnd.randrange(1, 10)
+        stats.match_duration = round_no * 110
+
+    match.roundstatsall[-1].map = f"http://{replay_host}/730/{match_id:021d}_{token:010d}.dem.bz2"
+    return msg
+
+
+def build_recent_games(account_id: int, matches: int = 8) -> pb_gclient.CMsgGCCStrike15_v2_MatchList:
+    """
+    Builds a recent_user_games-shaped message: several matches of one player in one MatchList.
+    """
+    rnd = random.Random(account_id)
+    msg = pb_gclient.CMsgGCCStrike15_v2_MatchList(
+        msgrequestid=ECsgoGCMsg.EMsgGCCStrike15_v2_MatchListRequestRecentUserGames,
+        accountid=account_id,
+        servertime=1700000000,
+    )
+    for _ in range(matches):
+        match_id = 3_600_000_000_000_000_000 + rnd.getrandbits(48)
+        single = build_match_list(match_id, match_id + rnd.getrandbits(16), rnd.getrandbits(16), rounds=3)
+        msg.matches.append(single.matches[0])
+    return msg
+
+
+def save_match_list(msg: pb_gclient.CMsgGCCStrike15_v2_MatchList, directory: str) -> Path:
+    os.makedirs(directory, exist_ok=True)
+    match_id = msg.matches[0].matchid if msg.matches else 0
+    path = Path(directory) / f"{match_id}{FIXTURE_SUFFIX}"
+    path.write_bytes(msg.SerializeToString())
+    return path
+
+
+def load_match_lists(directory: str) -> list[pb_gclient.CMsgGCCStrike15_v2_MatchList]:
+    messages = []
+    for path in sorted(Path(directory).glob(f"*{FIXTURE_SUFFIX}")):
+        msg = pb_gclient.CMsgGCCStrike15_v2_MatchList()
+        msg.ParseFromString(path.read_bytes())
+        messages.append(msg)
+    return messages
@@ -0,0 +1,133 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+import gevent
+from gevent.event import Event
+from gevent.hub import Hub
+
+logger = logging.getLogger(__name__)
+
+
+class GeventHubThread:
+    """
+    Runs a gevent hub in a dedicated OS thread.
+
+    Everything gevent-based (SteamClient, CSGOClient, their greenlets) lives on this hub,
+    so blocking waits on GC events never stall the asyncio loop that serves HTTP.
+    """
+
+    def __init__(self, name: str = "gevent-hub"):
+        self.name = name
+        self.hub: Optional[Hub] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._stop_event: Optional[Event] = None
+        self._stop_watcher = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self.hub is not None
+
+    @property
+    def thread_id(self) -> Optional[int]:
+        return self._thread.ident if self._thread is not None else None
+
+    def in_hub_thread(self) -> bool:
+        return self._thread is not None and threading.get_ident() == self._thread.ident
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+
+        self._stop_watcher.send()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("GeventHubThread[stop]: %s did not stop in %ss", self.name, timeout)
+
+    def spawn_threadsafe(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        if not self.running:
+            raise RuntimeError(f"Gevent hub thread {self.name} is not running")
+
+        self.hub.loop.run_callback_threadsafe(gevent.spawn, functools.partial(fn, *args, **kwargs))
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+        """
+        Runs fn in a new greenlet on the hub and returns a future bound to the running asyncio loop.
+        fn sees the caller's contextvars (e.g. the request trace).
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        context = contextvars.copy_context()
+
+        def _resolve(result: Any, exc: Optional[BaseException]) -> None:
+            if future.done():
+                return
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+        def _task() -> None:
+            try:
+                result = context.run(fn, *args, **kwargs)
+            except BaseException as exc:
+                outcome = (None, exc)
+            else:
+                outcome = (result, None)
+
+            try:
+                loop.call_soon_threadsafe(_resolve, *outcome)
+            except RuntimeError:
+                logger.warning("GeventHubThread[submit]: asyncio loop closed before %r finished", fn)
+
+        self.spawn_threadsafe(_task)
+        return future
+
+    def call(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Runs fn on the hub and blocks the calling OS thread until it finishes.
+        Meant for startup/shutdown paths, not for request handling.
+        """
+        if self.in_hub_thread():
+            return fn(*args, **kwargs)
+
+        result = concurrent.futures.Future()
+
+        def _task() -> None:
+            try:
+                result.set_result(fn(*args, **kwargs))
+            except BaseException as exc:
+                result.set_exception(exc)
+
+        self.spawn_threadsafe(_task)
+        return result.result(timeout)
+
+    def _run(self) -> None:
+        self.hub = gevent.get_hub()
+        self._stop_event = Event()
+        # a referenced async watcher keeps the loop alive while idle and doubles as the stop signal
+        self._stop_watcher = self.hub.loop.async_()
+        self._stop_watcher.start(self._stop_event.set)
+        self._started.set()
+
+        try:
+            self._stop_event.wait()
+        finally:
+            self._stop_watcher.close()
+            hub, self.hub = self.hub, None
+            hub.destroy(destroy_loop=True)
@@ -0,0 +1,85 @@
+"""
+CS2 match share codes (CSGO-xxxxx-xxxxx-xxxxx-xxxxx-xxxxx) <-> (match_id, outcome_id, token),
+bit for bit compatible with csgo.sharecode.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from conf.cs2 import CS2_MATCH_CODE_CACHE_SIZE
+
+ALPHABET = "ABCDEFGHJKLMNOPQRSTUVWXYZabcdefhijkmnopqrstuvwxyz23456789"
+RE_MATCH_CODE = re.compile(rf"(?:CSGO)?(?:-?[{ALPHABET}]{{5}}){{5}}")
+
+_BASE = len(ALPHABET)
+# char -> digit
+_DIGITS = {char: digit for digit, char in enumerate(ALPHABET)}
+# a code is 25 digits of a 144-bit little-endian number: matchid (64) | outcomeid (64) | token (16)
+_CODE_BYTES = 18
+_CODE_MAX = 1 << (8 * _CODE_BYTES)
+_MASK64 = (1 << 64) - 1
+
+
+class MatchRef(NamedTuple):
+    """
+    A decoded share code; unpacks into the (match_id, outcome_id, token) arguments of the lookups.
+    """
+
+    match_id: int
+    outcome_id: int
+    token: int
+
+
+def _decode(match_code: str) -> MatchRef:
+    if not RE_MATCH_CODE.fullmatch(match_code):
+        raise ValueError(f"Invalid share code: {match_code!r}")
+
+    digits = match_code.replace("-", "")
+    # 29 characters: the regex took the first four as the CSGO prefix
+    if len(digits) == 29:
+        digits = digits[4:]
+
+    value = 0
+    for char in reversed(digits):
+        value = value * _BASE + _DIGITS[char]
+    # 25 digits hold a little more than 144 bits; encode never produces those
+    if value >= _CODE_MAX:
+        raise ValueError(f"Invalid share code: {match_code!r}")
+
+    value = int.from_bytes(value.to_bytes(_CODE_BYTES, "big"), "little")
+    return MatchRef(value & _MASK64, (value >> 64) & _MASK64, (value >> 128) & 0xFFFF)
+
+
+def _encode(match_id: int, outcome_id: int, token: int) -> str:
+    value = (token << 128) | (outcome_id << 64) | match_id
+    value = int.from_bytes(value.to_bytes(_CODE_BYTES, "little"), "big")
+
+    chars = []
+    for _ in range(25):
+        value, digit = divmod(value, _BASE)
+        chars.append(ALPHABET[digit])
+    code = "".join(chars)
+    return f"CSGO-{code[:5]}-{code[5:10]}-{code[10:15]}-{code[15:20]}-{code[20:]}"
+
+
+# hot codes (retries, duplicates in batches, the same match asked by several callers) skip the arithmetic
+decode_match_code = lru_cache(maxsize=CS2_MATCH_CODE_CACHE_SIZE)(_decode)
+encode_match_code = lru_cache(maxsize=CS2_MATCH_CODE_CACHE_SIZE)(_encode)
+
+
+def decode_match_codes(match_codes: Iterable[str]) -> list[MatchRef | ValueError]:
+    """
+    Decodes a batch; a malformed code gives its ValueError in its place instead of failing the whole batch.
+    """
+    decoded = []
+    for match_code in match_codes:
+        try:
+            decoded.append(decode_match_code(match_code))
+        except ValueError as exc:
+            decoded.append(exc)
+    return decoded
+
+
+def encode_match_codes(refs: Iterable[tuple[int, int, int]]) -> list[str]:
+    return [encode_match_code(*ref) for ref in refs]
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from csgo.protobufs import cstrike15_gcmessages_pb2 as pb_gclient
+
+from components.steam.demo import match_demo_url
+
+# everything a MatchInfo can carry besides the share code parts, which are always there
+MATCH_INFO_FIELDS = frozenset(
+    {"match_time", "map", "duration", "rounds", "team_scores", "match_result", "players", "demo_url"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MatchPlayer:
+    account_id: int
+    kills: int
+    assists: int
+    deaths: int
+    score: int
+    mvps: int
+    headshots: int
+
+
+@dataclass(frozen=True, slots=True)
+class MatchInfo:
+    """
+    Metadata of one match from its CDataGCCStrike15_v2_MatchInfo. Fields that were not asked for stay None.
+    """
+
+    match_id: int
+    outcome_id: int
+    token: int
+    match_time: Optional[int] = None
+    map: Optional[str] = None
+    duration: Optional[int] = None
+    rounds: Optional[int] = None
+    team_scores: Optional[tuple[int, ...]] = None
+    match_result: Optional[int] = None
+    players: Optional[tuple[MatchPlayer, ...]] = None
+    demo_url: Optional[str] = None
+
+
+def parse_match_fields(value: Optional[str]) -> frozenset[str]:
+    """
+    ?fields= value (comma separated) -> set of MatchInfo fields; all of them when empty.
+    """
+    if not value:
+        return MATCH_INFO_FIELDS
+
+    fields = frozenset(name.strip() for name in value.split(",") if name.strip())
+    unknown = fields - MATCH_INFO_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Unknown match fields: {', '.join(sorted(unknown))}; expected any of {', '.join(sorted(MATCH_INFO_FIELDS))}"
+        )
+    return fields
+
+
+def find_match(msg: Any, match_id: int) -> Any:
+    """
+    The CDataGCCStrike15_v2_MatchInfo of match_id in a MatchList, None when the GC sent no such match.
+    """
+    for match in getattr(msg, "matches", ()):
+        if not match.matchid or match.matchid == match_id:
+            return match
+    return None
+
+
+def compact_match(match: Any) -> bytes:
+    """
+    Serialized CDataGCCStrike15_v2_MatchInfo with only what a MatchInfo is built from: the match header
+    and the last round, which carries the final totals and the replay URL. Round stats are cumulative,
+    so the earlier rounds (nearly all of the message) add nothing, and would make every parse pay for them.
+    """
+    compact = pb_gclient.CDataGCCStrike15_v2_MatchInfo(matchid=match.matchid, matchtime=match.matchtime)
+    if match.HasField("watchablematchinfo"):
+        compact.watchablematchinfo.CopyFrom(match.watchablematchinfo)
+    if match.roundstatsall:
+        compact.roundstatsall.add().CopyFrom(match.roundstatsall[-1])
+    elif match.HasField("roundstats_legacy"):
+        compact.roundstats_legacy.CopyFrom(match.roundstats_legacy)
+    return compact.SerializeToString()
+
+
+def parse_match_info(
+    data: bytes,
+    match_id: int,
+    outcome_id: int,
+    token: int,
+    fields: Iterable[str] = MATCH_INFO_FIELDS,
+) -> MatchInfo:
+    """
+    Builds a MatchInfo from serialized CDataGCCStrike15_v2_MatchInfo bytes (see compact_match),
+    reading only the requested fields: per player records are only built when players are asked for.
+    """
+    match = pb_gclient.CDataGCCStrike15_v2_MatchInfo.FromString(data)
+    fields = frozenset(fields)
+    values: dict[str, Any] = {}
+
+    # the last round carries the final totals
+    last_round = match.roundstatsall[-1] if match.roundstatsall else None
+    if last_round is None and match.HasField("roundstats_legacy"):
+        last_round = match.roundstats_legacy
+
+    if "match_time" in fields:
+        values["match_time"] = match.matchtime or None
+    if "map" in fields:
+        values["map"] = match.watchablematchinfo.game_map or None
+    if "demo_url" in fields:
+        values["demo_url"] = match_demo_url(match, match_id, token)
+
+    if last_round is not None:
+        if "duration" in fields:
+            values["duration"] = last_round.match_duration
+        if "rounds" in fields:
+            values["rounds"] = last_round.round
+        if "team_scores" in fields:
+            values["team_scores"] = tuple(last_round.team_scores)
+        if "match_result" in fields:
+            values["match_result"] = last_round.match_result
+        if "players" in fields:
+            values["players"] = _players(last_round)
+
+    return MatchInfo(match_id, outcome_id, token, **values)
+
+
+def _players(round_stats: Any) -> tuple[MatchPlayer, ...]:
+    def at(values: Any, i: int) -> int:
+        return values[i] if i < len(values) else 0
+
+    return tuple(
+        MatchPlayer(
+            account_id=account_id,
+            kills=at(round_stats.kills, i),
+            assists=at(round_stats.assists, i),
+            deaths=at(round_stats.deaths, i),
+            score=at(round_stats.scores, i),
+            mvps=at(round_stats.mvps, i),
+            headshots=at(round_stats.enemy_headshots, i),
+        )
+        for i, account_id in enumerate(round_stats.reservation.account_ids)
+    )
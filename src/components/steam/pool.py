@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from csgo.proto_enums import GCConnectionStatus
+
+from components.cache.constants import DemoCacheStatus
+from components.cache.demo_url import DemoUrlCache
+from components.metrics.definitions import DEMO_CACHE_REQUESTS, LOOKUP_CLAIM_WAITS
+from components.steam.constants import GCState, LookupPriority, SteamLoginStatus
+from components.steam.demo import MatchDemo
+from components.steam.match_code import decode_match_code
+from components.steam.match_info import MATCH_INFO_FIELDS, MatchInfo, parse_match_info
+from components.steam.retry import RetryBudget
+from components.steam.session import SteamSessionStore
+from components.steam.steam import (
+    ClientFactory,
+    SteamAPI,
+    SteamAPIException,
+    SteamDeadlineExceededException,
+    SteamGCUnavailableException,
+    SteamAPIStats,
+    default_client_factory,
+    remaining_sec,
+)
+from components.tracing.trace import span
+from components.workers.claims import LookupClaims
+from conf.steam import STEAM_GC_RETRY_BUDGET_MIN_PER_SEC, STEAM_GC_RETRY_BUDGET_RATIO
+
+logger = logging.getLogger(__name__)
+
+# longest wait for the demo cache writer before a claim is released anyway
+_CACHE_FLUSH_TIMEOUT_SEC = 1.0
+
+
+class SteamAPIPool:
+    """
+    A set of named SteamAPI accounts, each with its own Steam session and GC.
+
+    Lookups go to the least-loaded account whose GC has a session, or failing that to one
+    that is launching it; accounts whose GC circuit is open are skipped. Lookups for a match id (or player) that is
+    already being resolved stick to the same account, so its single-flight coalesces them.
+
+    With claims, demo URL lookups are also coalesced across worker processes: a match being resolved by another
+    worker is waited for in the shared demo cache instead of being asked to the GC again.
+    """
+
+    def __init__(
+        self,
+        account_names: list[str],
+        demo_cache: Optional[DemoUrlCache] = None,
+        credentials: Optional[dict[str, tuple[str, str]]] = None,
+        client_factory: ClientFactory = default_client_factory,
+        credentials_dir: Optional[str] = None,
+        claims: Optional[LookupClaims] = None,
+        claim_poll_sec: float = 0.05,
+    ):
+        if not account_names:
+            raise SteamAPIException("SteamAPIPool: at least one account is required")
+
+        self.demo_cache = demo_cache
+        self.credentials = credentials or {}
+        # waiting for another worker needs a cache both can see
+        self.claims = claims if demo_cache is not None else None
+        self.claim_poll_sec = claim_poll_sec
+        # one budget for all accounts: an outage of every GC at once must not multiply retries per account
+        self.retry_budget = RetryBudget(STEAM_GC_RETRY_BUDGET_RATIO, STEAM_GC_RETRY_BUDGET_MIN_PER_SEC)
+        self.accounts: dict[str, SteamAPI] = {
+            name: SteamAPI(
+                name=name,
+                demo_cache=demo_cache,
+                client_factory=client_factory,
+                retry_budget=self.retry_budget,
+                session_store=SteamSessionStore(os.path.join(credentials_dir, name)) if credentials_dir else None,
+            )
+            for name in account_names
+        }
+
+        # match_id / ("player", account_id) -> (account, number of callers routed to it)
+        self._routes: dict[Hashable, tuple[SteamAPI, int]] = {}
+
+    @property
+    def default_account(self) -> str:
+        return next(iter(self.accounts))
+
+    def get(self, name: Optional[str] = None) -> SteamAPI:
+        steam_api = self.accounts.get(name or self.default_account)
+        if steam_api is None:
+            raise ValueError(f"Unknown Steam account: {name}")
+        return steam_api
+
+    def pick(self, priority: LookupPriority = LookupPriority.INTERACTIVE) -> SteamAPI:
+        logged_in = [api for api in self.accounts.values() if api.login_user]
+        if not logged_in:
+            # logged out accounts are OFFLINE until the supervisor logs them back in and launches the GC
+            raise SteamGCUnavailableException(
+                "No Steam account is logged in",
+                retry_after=min(api.gc_retry_after for api in self.accounts.values()),
+            )
+
+        ready = [api for api in logged_in if api.gc_state == GCState.READY]
+        # nobody has a session (cold start, GC flap): launching accounts make callers wait for the session
+        candidates = ready or [api for api in logged_in if api.gc_state == GCState.LAUNCHING]
+        if not candidates:
+            raise SteamGCUnavailableException(
+                "No Steam account has a GC session",
+                retry_after=min(api.gc_retry_after for api in logged_in),
+            )
+
+        # an account with GC tokens to spare beats a less loaded one that would make the caller wait
+        return min(candidates, key=lambda api: (api.estimated_wait_sec(priority), api.in_flight))
+
+    def stats(self) -> SteamAPIStats:
+        total = SteamAPIStats()
+        for steam_api in self.accounts.values():
+            total.lookups += steam_api.stats.lookups
+            total.coalesced_lookups += steam_api.stats.coalesced_lookups
+            total.gc_requests += steam_api.stats.gc_requests
+        return total
+
+    @property
+    def in_flight(self) -> int:
+        return sum(steam_api.in_flight for steam_api in self.accounts.values())
+
+    @property
+    def ready(self) -> bool:
+        return any(steam_api.gc_status == GCConnectionStatus.HAVE_SESSION for steam_api in self.accounts.values())
+
+    async def aconnect(self) -> None:
+        # accounts come up side by side: startup takes as long as the slowest login, not the sum
+        await asyncio.gather(*(self._astart(name, steam_api) for name, steam_api in self.accounts.items()))
+
+    async def _astart(self, name: str, steam_api: SteamAPI) -> None:
+        """
+        Connects and logs the account in, by the login key of the previous process when there is one,
+        else by the configured password; the GC is launched right after login.
+        """
+        await steam_api.aconnect()
+
+        if await steam_api.aresume_session():
+            return
+
+        credentials = self.credentials.get(name)
+        if credentials is None:
+            return
+
+        success, status = await steam_api.alogin(*credentials)
+        if not success:
+            logger.warning("SteamAPIPool[_astart]: Login for account %s failed: %s", name, status)
+
+    async def adisconnect(self) -> None:
+        await asyncio.gather(
+            *(steam_api.adisconnect() for steam_api in self.accounts.values()),
+            return_exceptions=True,
+        )
+
+    def close(self) -> None:
+        for steam_api in self.accounts.values():
+            steam_api.close()
+
+    async def alogin(
+        self,
+        account: Optional[str],
+        username: str,
+        password: str,
+        email_code: Optional[str] = None,
+        two_factor_code: Optional[str] = None,
+    ) -> tuple[bool, SteamLoginStatus]:
+        return await self.get(account).alogin(username, password, email_code, two_factor_code)
+
+    async def alogout(self, account: Optional[str]) -> None:
+        await self.get(account).alogout()
+
+    async def aget_cs2_match_url(
+        self,
+        match_code: str,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[str], DemoCacheStatus]:
+        return await self.aget_demo_url(*decode_match_code(match_code), deadline=deadline, priority=priority)
+
+    async def aget_demo_url(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[str], DemoCacheStatus]:
+        if self.demo_cache is not None:
+            entry = await self.demo_cache.aget(match_id, outcome_id, token)
+            if entry is not None:
+                DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.HIT.value).inc()
+                return entry.demo_url, DemoCacheStatus.HIT
+            DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.MISS.value).inc()
+
+        async def cached() -> Optional[str]:
+            entry = await self.demo_cache.aget(match_id, outcome_id, token)
+            return entry.demo_url if entry is not None else None
+
+        return await self._aresolve(
+            match_id,
+            priority,
+            lambda steam_api: steam_api.aresolve_demo_url(match_id, outcome_id, token, deadline, priority),
+            cached,
+            deadline,
+        )
+
+    async def aget_match_info(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        fields: Iterable[str] = MATCH_INFO_FIELDS,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[MatchInfo], DemoCacheStatus]:
+        """
+        Match metadata with only the requested fields, parsed from the full_match_info bytes cached next to
+        the demo URL; a miss asks the GC the same way aget_demo_url does.
+        """
+        if self.demo_cache is not None:
+            data = await self.demo_cache.aget_match_info(match_id, outcome_id, token)
+            if data is not None:
+                DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.HIT.value).inc()
+                return parse_match_info(data, match_id, outcome_id, token, fields), DemoCacheStatus.HIT
+            DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.MISS.value).inc()
+
+        data, cache_status = await self._aresolve(
+            match_id,
+            priority,
+            lambda steam_api: steam_api.aresolve_match_info(match_id, outcome_id, token, deadline, priority),
+            lambda: self.demo_cache.aget_match_info(match_id, outcome_id, token),
+            deadline,
+        )
+        if data is None:
+            return None, cache_status
+
+        return parse_match_info(data, match_id, outcome_id, token, fields), cache_status
+
+    async def _aresolve(
+        self,
+        match_id: int,
+        priority: LookupPriority,
+        call: Callable[[SteamAPI], Awaitable[Any]],
+        cached: Callable[[], Awaitable[Any]],
+        deadline: Optional[float],
+    ) -> tuple[Any, DemoCacheStatus]:
+        """
+        Runs call on an account; with claims, only once across workers: the others wait and read
+        the stored result with cached.
+        """
+        if self.claims is None:
+            return await self._arouted(match_id, priority, call), DemoCacheStatus.MISS
+
+        while True:
+            try:
+                claimed = await self.claims.atry_claim(match_id)
+            except sqlite3.Error as exc:
+                # claims table locked by the other workers: the in-process single-flight still coalesces this one's
+                LOOKUP_CLAIM_WAITS.labels("unavailable").inc()
+                logger.warning("SteamAPIPool[_aresolve]: Lookup claims unavailable (%s), looking up match here", exc)
+                return await self._arouted(match_id, priority, call), DemoCacheStatus.MISS
+
+            if claimed:
+                try:
+                    return await self._arouted(match_id, priority, call), DemoCacheStatus.MISS
+                finally:
+                    # the workers waiting for the claim read the result from the shared cache: it must be on disk
+                    await asyncio.to_thread(self.demo_cache.flush, _CACHE_FLUSH_TIMEOUT_SEC)
+                    await self.claims.arelease(match_id)
+
+            with span("claim_wait"):
+                while await self.claims.aclaimed_elsewhere(match_id):
+                    left = remaining_sec(deadline)
+                    if left == 0:
+                        LOOKUP_CLAIM_WAITS.labels("deadline").inc()
+                        raise SteamDeadlineExceededException(
+                            f"Deadline exceeded waiting for another worker to look up match {match_id}"
+                        )
+                    await asyncio.sleep(self.claim_poll_sec if left is None else min(self.claim_poll_sec, left))
+
+            result = await cached()
+            if result is not None:
+                LOOKUP_CLAIM_WAITS.labels("resolved").inc()
+                return result, DemoCacheStatus.COALESCED
+
+            # the other worker stored nothing (failed, or the match has no URL): try it here
+            LOOKUP_CLAIM_WAITS.labels("retried").inc()
+
+    async def aget_recent_demos(
+        self,
+        account_id: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> list[MatchDemo]:
+        return await self._arouted(
+            ("player", account_id),
+            priority,
+            lambda steam_api: steam_api.aget_recent_demos(account_id, deadline, priority),
+        )
+
+    async def _arouted(
+        self,
+        key: Hashable,
+        priority: LookupPriority,
+        call: Callable[[SteamAPI], Awaitable[Any]],
+    ) -> Any:
+        route = self._routes.get(key)
+        steam_api = route[0] if route is not None else self.pick(priority)
+        self._routes[key] = (steam_api, route[1] + 1 if route is not None else 1)
+
+        try:
+            return await call(steam_api)
+        finally:
+            steam_api, callers = self._routes[key]
+            if callers > 1:
+                self._routes[key] = (steam_api, callers - 1)
+            else:
+                del self._routes[key]
@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class RetryBudget:
+    """
+    Caps retries relative to regular traffic: every lookup deposits `ratio` of a retry and
+    the budget refills by `min_per_sec` on its own, so a GC outage cannot multiply the load
+    (and the relaunches) it causes. Shared by all accounts of a pool, hence the lock.
+    """
+
+    def __init__(self, ratio: float, min_per_sec: float, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_tokens = max_tokens
+
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+        self._refilled_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._refilled_at) * self.min_per_sec)
+        self._refilled_at = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
@@ -0,0 +1,98 @@
+from collections import deque
+from typing import Optional
+
+import gevent
+from gevent.event import Event
+
+from components.admission.limits import TokenBucket
+from components.steam.constants import LookupPriority
+
+
+class GCTicket:
+    __slots__ = ("lane", "granted", "_event")
+
+    def __init__(self, lane: LookupPriority):
+        self.lane = lane
+        self.granted = False
+        self._event = Event()
+
+
+class GCScheduler:
+    """
+    The GC request window of one account: at most max_in_flight requests out, at most
+    rate_per_sec of them sent per second (0 = unlimited), interactive lookups first.
+    While both lanes wait, bulk still gets at least bulk_min_share of the grants,
+    so a backfill keeps moving under interactive load. Lives on the hub thread.
+    """
+
+    def __init__(self, max_in_flight: int, rate_per_sec: float, burst: float, bulk_min_share: float):
+        self.max_in_flight = max_in_flight
+        self.bulk_min_share = bulk_min_share
+
+        self._free = max_in_flight
+        self._bucket = TokenBucket(rate_per_sec, burst) if rate_per_sec > 0 else None
+        self._queues: dict[LookupPriority, deque[GCTicket]] = {lane: deque() for lane in LookupPriority}
+        self._bulk_credit = 0.0
+        self._timer: Optional[gevent.Greenlet] = None
+
+    def queue_depth(self, lane: LookupPriority) -> int:
+        return len(self._queues[lane])
+
+    def acquire(self, ticket: GCTicket, timeout: Optional[float] = None) -> bool:
+        self._queues[ticket.lane].append(ticket)
+        self._dispatch()
+
+        if not ticket.granted:
+            ticket._event.wait(timeout)
+
+        if not ticket.granted:
+            self._queues[ticket.lane].remove(ticket)
+            return False
+        return True
+
+    def release(self) -> None:
+        self._free += 1
+        self._dispatch()
+
+    def promote(self, ticket: GCTicket, lane: LookupPriority) -> None:
+        """
+        Moves a waiting ticket to another lane, e.g. when an interactive lookup joins a queued bulk one.
+        """
+        if ticket.granted or ticket.lane == lane:
+            return
+        self._queues[ticket.lane].remove(ticket)
+        ticket.lane = lane
+        self._queues[lane].append(ticket)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._free > 0 and any(self._queues.values()):
+            if self._bucket is not None:
+                wait_sec = self._bucket.wait_sec()
+                if wait_sec > 0:
+                    if self._timer is None:
+                        self._timer = gevent.spawn_later(wait_sec, self._on_timer)
+                    return
+                self._bucket.reserve(0.0)
+
+            ticket = self._queues[self._next_lane()].popleft()
+            self._free -= 1
+            ticket.granted = True
+            ticket._event.set()
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _next_lane(self) -> LookupPriority:
+        if not self._queues[LookupPriority.BULK]:
+            return LookupPriority.INTERACTIVE
+        if not self._queues[LookupPriority.INTERACTIVE]:
+            return LookupPriority.BULK
+
+        # both lanes waiting: interactive first, but every grant earns bulk its share
+        self._bulk_credit += self.bulk_min_share
+        if self._bulk_credit >= 1.0:
+            self._bulk_credit -= 1.0
+            return LookupPriority.BULK
+        return LookupPriority.INTERACTIVE
@@ -0,0 +1,49 @@
+import json
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_LOGIN_KEY_FILE = "login_key.json"
+
+
+class SteamSessionStore:
+    """
+    Per-account state directory that survives restarts: SteamClient keeps the CM server list and
+    sentry files here (set_credential_location), this class adds the login key for password-less relogin.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, mode=0o700, exist_ok=True)
+
+    def load_login_key(self) -> Optional[tuple[str, str]]:
+        """
+        Returns (username, login_key) saved by a previous process, if any.
+        """
+        try:
+            with open(os.path.join(self.path, _LOGIN_KEY_FILE)) as f:
+                data = json.load(f)
+            return data["username"], data["login_key"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            logger.exception("SteamSessionStore[load_login_key]: Unreadable login key in %s", self.path)
+            return None
+
+    def save_login_key(self, username: str, login_key: str) -> None:
+        filepath = os.path.join(self.path, _LOGIN_KEY_FILE)
+        tmp_filepath = f"{filepath}.tmp"
+
+        # written aside and renamed, so a crash never leaves a truncated key behind
+        fd = os.open(tmp_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"username": username, "login_key": login_key}, f)
+        os.replace(tmp_filepath, filepath)
+
+    def clear_login_key(self) -> None:
+        try:
+            os.remove(os.path.join(self.path, _LOGIN_KEY_FILE))
+        except FileNotFoundError:
+            pass
@@ -1,29 +1,163 @@
+import asyncio
+import contextvars
 import logging
 import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Hashable, Iterable, Optional
 
 import gevent
 from gevent import Timeout
-from gevent.lock import Semaphore
+from gevent.event import AsyncResult, Event
 
-from csgo import sharecode
 from csgo.client import CSGOClient
 from csgo.proto_enums import GCConnectionStatus
 from steam.client import SteamClient
 from steam.enums import EResult
-
-from components.steam.constants import SteamLoginStatus
-from components.steam.demo import extract_demo_url
-from conf.steam import STEAM_GC_TIMEOUT_SEC
+from steam.steamid import SteamID
+
+from components.cache.constants import DemoCacheStatus
+from components.cache.demo_url import DemoUrlCache
+from components.metrics.definitions import (
+    DEADLINE_EXCEEDED,
+    DEMO_CACHE_REQUESTS,
+    EXTRACT_DEMO_URL_SECONDS,
+    GC_ADMISSION_REJECTED,
+    GC_CIRCUIT_OPEN,
+    GC_CONNECTION_STATUS,
+    GC_FAST_FAILS,
+    GC_IN_FLIGHT,
+    GC_QUEUE_DEPTH,
+    GC_RELAUNCHES,
+    GC_REQUEST_SECONDS,
+    GC_REQUESTS,
+    GC_REQUESTS_REISSUED,
+    GC_RETRIES,
+    GC_RETRIES_DENIED,
+    GC_TIMEOUT_SECONDS,
+    GC_TIMEOUTS,
+    GC_WINDOW_WAIT_SECONDS,
+    LOOKUPS_COALESCED,
+    LOOKUPS_IN_FLIGHT,
+    STEAM_CM_FAILOVERS,
+    STEAM_CM_LATENCY_SECONDS,
+    STEAM_RECONNECTS,
+    STEAM_RELOGINS,
+)
+from components.steam.breaker import GCCircuitBreaker
+from components.steam.cm import RankedCMServerList
+from components.steam.constants import GCState, LookupPriority, SteamLoginStatus
+from components.steam.demo import MatchDemo, extract_demo_url, extract_match_demos
+from components.steam.match_code import decode_match_code
+from components.steam.match_info import (
+    MATCH_INFO_FIELDS,
+    MatchInfo,
+    compact_match,
+    find_match,
+    parse_match_info,
+)
+from components.steam.fixtures import save_match_list
+from components.steam.hub import GeventHubThread
+from components.steam.retry import RetryBudget
+from components.steam.scheduler import GCScheduler, GCTicket
+from components.steam.session import SteamSessionStore
+from components.steam.timeouts import AdaptiveTimeout
+from components.tracing.trace import span
+from conf.steam import (
+    STEAM_CM_PROBE_CONCURRENCY,
+    STEAM_CM_PROBE_INTERVAL_SEC,
+    STEAM_CM_PROBE_TIMEOUT_SEC,
+    STEAM_GC_BACKOFF_BASE_SEC,
+    STEAM_GC_BACKOFF_MAX_SEC,
+    STEAM_GC_BULK_MAX_QUEUED,
+    STEAM_GC_BULK_MIN_SHARE,
+    STEAM_GC_LAUNCH_TIMEOUT_SEC,
+    STEAM_GC_MAX_IN_FLIGHT,
+    STEAM_GC_QUEUE_MAX,
+    STEAM_GC_QUEUE_MAX_WAIT_SEC,
+    STEAM_GC_RATE_BURST,
+    STEAM_GC_RATE_PER_SEC,
+    STEAM_GC_RETRY_BUDGET_MIN_PER_SEC,
+    STEAM_GC_RETRY_BUDGET_RATIO,
+    STEAM_GC_TIMEOUT_MIN_SEC,
+    STEAM_GC_TIMEOUT_P99_FACTOR,
+    STEAM_GC_TIMEOUT_SEC,
+    STEAM_GC_TRIP_TIMEOUTS,
+    STEAM_RECORD_FIXTURES_DIR,
+)
 
 logger = logging.getLogger(__name__)
 
+# the supervisor wakes up on Steam/GC events; this is only a safety net
+_SUPERVISOR_IDLE_SEC = 30.0
+_STEAM_RECONNECT_BACKOFF_MAX_SEC = 60.0
+# tries of request_full_match_info per lookup; the retry also needs the retry budget
+_GC_MAX_ATTEMPTS = 2
+# requests lost with the GC session are sent again for free, up to this many times per lookup
+_GC_MAX_REISSUES = 3
+
 
 class SteamAPIException(Exception):
     pass
 
 
+class SteamGCTimeoutException(SteamAPIException):
+    pass
+
+
+class SteamDeadlineExceededException(SteamGCTimeoutException):
+    pass
+
+
+class SteamGCUnavailableException(SteamAPIException):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SteamGCSessionLostException(SteamGCUnavailableException):
+    pass
+
+
+class SteamGCThrottledException(SteamAPIException):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def remaining_sec(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds left until a time.monotonic() deadline, None for no deadline.
+    """
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def steamid_to_account_id(steamid: str) -> int:
+    """
+    Account id of a SteamID64, account id, STEAM_X:Y:Z or [U:1:Z] string; raises ValueError for anything else.
+    """
+    parsed = SteamID(steamid)
+    if not parsed.is_valid() or not parsed.account_id:
+        raise ValueError(f"Invalid steamid: {steamid}")
+    return parsed.account_id
+
+
+ClientFactory = Callable[[], tuple[Any, Any]]
+
+
+def default_client_factory() -> tuple[SteamClient, CSGOClient]:
+    steam_client = SteamClient()
+    return steam_client, CSGOClient(steam_client)
+
+
+@dataclass
+class SteamAPIStats:
+    lookups: int = 0
+    coalesced_lookups: int = 0
+    gc_requests: int = 0
+
+
 @dataclass
 class _Creds:
     username: str
@@ -33,30 +167,359 @@ class _Creds:
 
 
 class SteamAPI:
-    def __init__(self):
-        self.steam_client = SteamClient()
-        self.cs_client = CSGOClient(self.steam_client)
+    """
+    Gevent-side methods (connect, login, get_cs2_match_url, ...) must run on the hub thread.
+    Asyncio code uses the a*-prefixed facade, which hands the work across and awaits the result.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        demo_cache: Optional[DemoUrlCache] = None,
+        client_factory: ClientFactory = default_client_factory,
+        retry_budget: Optional[RetryBudget] = None,
+        session_store: Optional[SteamSessionStore] = None,
+    ):
+        self.name = name
+        self.demo_cache = demo_cache
+        self.client_factory = client_factory
+        self.session_store = session_store
+        self.retry_budget = retry_budget or RetryBudget(STEAM_GC_RETRY_BUDGET_RATIO, STEAM_GC_RETRY_BUDGET_MIN_PER_SEC)
+        self.gc_timeout = AdaptiveTimeout(STEAM_GC_TIMEOUT_MIN_SEC, STEAM_GC_TIMEOUT_SEC, STEAM_GC_TIMEOUT_P99_FACTOR)
+
+        self.hub_thread = GeventHubThread(name=f"steam-gevent-hub-{name}")
+        self.hub_thread.start()
+
+        self.steam_client: Optional[SteamClient] = None
+        self.cs_client: Optional[CSGOClient] = None
 
         self.steam_loop: Optional[gevent.Greenlet] = None
-        self.watchdog_loop: Optional[gevent.Greenlet] = None
+        self.supervisor_loop: Optional[gevent.Greenlet] = None
+        self.cm_prober_loop: Optional[gevent.Greenlet] = None
+        # CM servers ranked by probed latency; None for clients without a CM list (the fake one)
+        self._cm_servers: Optional[RankedCMServerList] = None
 
         self.connected: bool = False
         self.login_user: Optional[str] = None
 
-        self._gc_lock = Semaphore(1)
-        self._last_gc_relaunch_ts = 0.0
+        # window of concurrent request_full_match_info calls, by priority; replies are routed by matchid
+        self._gc_scheduler: Optional[GCScheduler] = None
+        self._pending: dict[int, list[AsyncResult]] = {}
+        # recent_user_games requests, replies are routed by accountid
+        self._pending_players: dict[int, list[AsyncResult]] = {}
+        # single-flight: one lookup per match id / player, concurrent callers share its result or failure
+        self._inflight: dict[int, AsyncResult] = {}
+        self._inflight_players: dict[int, AsyncResult] = {}
+        # tickets of lookups waiting for the window, so a more urgent caller joining them can promote them
+        self._queued_tickets: dict[int, GCTicket] = {}
+
+        self.stats = SteamAPIStats()
+        # lookups handed to the hub and not finished yet, per lane and per key (match id, ("player", account id));
+        # only touched from the asyncio thread
+        self._submitted: int = 0
+        self._submitted_by_lane: dict[LookupPriority, int] = {lane: 0 for lane in LookupPriority}
+        self._submitted_keys: dict[Hashable, int] = {}
+        # bulk lookups are paced instead of rejected: the ones over this wait here, not in the GC queue
+        self._bulk_slots = asyncio.Semaphore(STEAM_GC_BULK_MAX_QUEUED)
         self._last_steam_reconnect_ts = 0.0
+        self._steam_reconnect_failures = 0
+
+        self.breaker = GCCircuitBreaker(
+            launch_timeout_sec=STEAM_GC_LAUNCH_TIMEOUT_SEC,
+            backoff_base_sec=STEAM_GC_BACKOFF_BASE_SEC,
+            backoff_max_sec=STEAM_GC_BACKOFF_MAX_SEC,
+            trip_after_timeouts=STEAM_GC_TRIP_TIMEOUTS,
+        )
+        self._gc_ready: Optional[Event] = None
+        self._supervisor_wakeup: Optional[Event] = None
+        # launch() was called for the current Steam session
+        self._gc_launched: bool = False
 
         self._creds: Optional[_Creds] = None
         self.needs_email_code: bool = False
         self.needs_2fa_code: bool = False
 
+        # gevent primitives bind to the hub of the thread they are first used in,
+        # so clients and locks are created on the hub thread
+        self.hub_thread.call(self._init_clients)
+
+        GC_CONNECTION_STATUS.labels(self.name).set_function(lambda: int(self.cs_client.connection_status))
+        GC_IN_FLIGHT.labels(self.name).set_function(
+            lambda: sum(len(waiters) for pending in (self._pending, self._pending_players) for waiters in pending.values())
+        )
+        LOOKUPS_IN_FLIGHT.labels(self.name).set_function(lambda: self._submitted)
+        GC_CIRCUIT_OPEN.labels(self.name).set_function(lambda: not self.breaker.allows_requests)
+        GC_TIMEOUT_SECONDS.labels(self.name).set_function(lambda: self.gc_timeout.value)
+        for lane in LookupPriority:
+            GC_QUEUE_DEPTH.labels(self.name, lane.value).set_function(
+                lambda lane=lane: self._gc_scheduler.queue_depth(lane)
+            )
+        if self._cm_servers is not None:
+            STEAM_CM_LATENCY_SECONDS.labels(self.name).set_function(lambda: self._cm_servers.best_latency_sec)
+
+    def _init_clients(self) -> None:
+        self.steam_client, self.cs_client = self.client_factory()
+        self._gc_scheduler = GCScheduler(
+            max_in_flight=STEAM_GC_MAX_IN_FLIGHT,
+            rate_per_sec=STEAM_GC_RATE_PER_SEC,
+            burst=STEAM_GC_RATE_BURST,
+            bulk_min_share=STEAM_GC_BULK_MIN_SHARE,
+        )
+        self._gc_ready = Event()
+        self._supervisor_wakeup = Event()
+
+        if hasattr(self.steam_client, "cm_servers"):
+            self._cm_servers = self.steam_client.cm_servers = RankedCMServerList()
+
         self.steam_client.on("disconnected", self._on_disconnected)
+        self.steam_client.on("logged_on", self._on_logged_on)
         self.steam_client.on("logged_off", self._on_logged_off)
 
+        if self.session_store is not None:
+            # CM server list and sentry files are kept there by SteamClient itself
+            self.steam_client.set_credential_location(self.session_store.path)
+            self.steam_client.on("new_login_key", self._on_new_login_key)
+
         self.cs_client.on("notready", self._on_gc_notready)
         self.cs_client.on("ready", self._on_gc_ready)
+        self.cs_client.on("full_match_info", self._on_full_match_info)
+        self.cs_client.on("recent_user_games", self._on_recent_user_games)
+
+    async def aconnect(self) -> None:
+        await self.hub_thread.submit(self.connect)
 
+    async def adisconnect(self) -> None:
+        await self.hub_thread.submit(self.disconnect)
+
+    async def aget_cs2_match_url(
+        self,
+        match_code: str,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[str], DemoCacheStatus]:
+        return await self.aget_demo_url(*decode_match_code(match_code), deadline=deadline, priority=priority)
+
+    async def aget_demo_url(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[str], DemoCacheStatus]:
+        # cache hits are served right here on the asyncio side, without a trip to the hub
+        if self.demo_cache is not None:
+            entry = await self.demo_cache.aget(match_id, outcome_id, token)
+            if entry is not None:
+                DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.HIT.value).inc()
+                return entry.demo_url, DemoCacheStatus.HIT
+            DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.MISS.value).inc()
+
+        demo_url = await self.aresolve_demo_url(match_id, outcome_id, token, deadline, priority)
+        return demo_url, DemoCacheStatus.MISS
+
+    async def aresolve_demo_url(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> Optional[str]:
+        return await self._asubmit(
+            match_id, deadline, priority, self.get_demo_url, match_id, outcome_id, token, deadline, priority
+        )
+
+    async def aget_match_info(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        fields: Iterable[str] = MATCH_INFO_FIELDS,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[MatchInfo], DemoCacheStatus]:
+        if self.demo_cache is not None:
+            data = await self.demo_cache.aget_match_info(match_id, outcome_id, token)
+            if data is not None:
+                DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.HIT.value).inc()
+                return parse_match_info(data, match_id, outcome_id, token, fields), DemoCacheStatus.HIT
+            DEMO_CACHE_REQUESTS.labels(DemoCacheStatus.MISS.value).inc()
+
+        data = await self.aresolve_match_info(match_id, outcome_id, token, deadline, priority)
+        if data is None:
+            return None, DemoCacheStatus.MISS
+        return parse_match_info(data, match_id, outcome_id, token, fields), DemoCacheStatus.MISS
+
+    async def aresolve_match_info(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> Optional[bytes]:
+        return await self._asubmit(
+            match_id, deadline, priority, self.get_match_info, match_id, outcome_id, token, deadline, priority
+        )
+
+    async def aget_recent_demos(
+        self,
+        account_id: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> list[MatchDemo]:
+        return await self._asubmit(
+            ("player", account_id), deadline, priority, self.get_recent_demos, account_id, deadline, priority
+        )
+
+    async def _asubmit(
+        self,
+        key: Hashable,
+        deadline: Optional[float],
+        priority: LookupPriority,
+        function: Callable[..., Any],
+        *args,
+    ) -> Any:
+        # circuit open, no time left or too far back in the GC queue: fail before tying up a greenlet on the hub
+        self._check_gc_available()
+        self._check_deadline(deadline)
+        self._admit(key, deadline, priority)
+
+        bulk_slot = priority == LookupPriority.BULK and key not in self._submitted_keys
+        if bulk_slot:
+            await self._acquire_bulk_slot(deadline)
+
+        self._submitted += 1
+        self._submitted_by_lane[priority] += 1
+        self._submitted_keys[key] = self._submitted_keys.get(key, 0) + 1
+        try:
+            # the hub side adds its own spans (session, window, GC round trip) inside this one
+            with span("steam"):
+                return await self.hub_thread.submit(function, *args)
+        finally:
+            if bulk_slot:
+                self._bulk_slots.release()
+            self._submitted -= 1
+            self._submitted_by_lane[priority] -= 1
+            if self._submitted_keys[key] > 1:
+                self._submitted_keys[key] -= 1
+            else:
+                del self._submitted_keys[key]
+
+    def _admit(self, key: Hashable, deadline: Optional[float], priority: LookupPriority) -> None:
+        """
+        Admission control of the asyncio side: raises SteamGCThrottledException when the GC queue
+        is full or an interactive lookup would wait longer than allowed for its turn.
+        """
+        # joins the lookup already running for this key: no GC request of its own
+        if key in self._submitted_keys:
+            return
+        # bulk lookups (jobs, backfills) wait for a bulk slot instead, see _acquire_bulk_slot
+        if priority == LookupPriority.BULK:
+            return
+
+        if self._submitted >= STEAM_GC_QUEUE_MAX:
+            GC_ADMISSION_REJECTED.labels(self.name, "queue_full").inc()
+            raise SteamGCThrottledException(
+                f"GC queue of account {self.name} is full",
+                retry_after=max(1.0, self.estimated_wait_sec(priority)),
+            )
+
+        max_wait_sec = STEAM_GC_QUEUE_MAX_WAIT_SEC
+        if deadline is not None:
+            max_wait_sec = min(max_wait_sec, remaining_sec(deadline))
+
+        wait_sec = self.estimated_wait_sec(priority)
+        if wait_sec > max_wait_sec:
+            GC_ADMISSION_REJECTED.labels(self.name, "rate").inc()
+            raise SteamGCThrottledException(
+                f"GC request rate of account {self.name} exceeded",
+                retry_after=wait_sec,
+            )
+
+    async def _acquire_bulk_slot(self, deadline: Optional[float]) -> None:
+        left = remaining_sec(deadline)
+        if left is None:
+            await self._bulk_slots.acquire()
+            return
+
+        try:
+            async with asyncio.timeout(left):
+                await self._bulk_slots.acquire()
+        except TimeoutError:
+            DEADLINE_EXCEEDED.labels(self.name).inc()
+            raise SteamDeadlineExceededException("Deadline exceeded waiting for a bulk GC slot") from None
+
+    def estimated_wait_sec(self, priority: LookupPriority = LookupPriority.INTERACTIVE) -> float:
+        """
+        Rough wait for a GC rate token of a lookup submitted now: interactive ones only queue
+        behind other interactive ones, bulk ones behind everything.
+        """
+        if STEAM_GC_RATE_PER_SEC <= 0:
+            return 0.0
+
+        ahead = self._submitted_by_lane[priority] if priority == LookupPriority.INTERACTIVE else self._submitted
+        return max(0.0, ahead + 1 - STEAM_GC_RATE_BURST) / STEAM_GC_RATE_PER_SEC
+
+    async def alogin(
+        self,
+        username: str,
+        password: str,
+        email_code: Optional[str] = None,
+        two_factor_code: Optional[str] = None,
+    ) -> tuple[bool, SteamLoginStatus]:
+        return await self.hub_thread.submit(self.login, username, password, email_code, two_factor_code)
+
+    async def aresume_session(self) -> bool:
+        return await self.hub_thread.submit(self.resume_session)
+
+    async def alogout(self) -> None:
+        await self.hub_thread.submit(self.logout)
+
+    def close(self) -> None:
+        self.hub_thread.stop()
+
+        for gauge in (
+            GC_CONNECTION_STATUS,
+            GC_IN_FLIGHT,
+            LOOKUPS_IN_FLIGHT,
+            GC_CIRCUIT_OPEN,
+            GC_TIMEOUT_SECONDS,
+            STEAM_CM_LATENCY_SECONDS,
+        ):
+            gauge.remove(self.name)
+        for lane in LookupPriority:
+            GC_QUEUE_DEPTH.remove(self.name, lane.value)
+
+    @property
+    def in_flight(self) -> int:
+        return self._submitted
+
+    @property
+    def gc_status(self) -> GCConnectionStatus:
+        return self.cs_client.connection_status
+
+    @property
+    def gc_state(self) -> GCState:
+        return self.breaker.state
+
+    @property
+    def gc_retry_after(self) -> float:
+        return self.breaker.retry_after()
+
+    def _check_gc_available(self) -> None:
+        if not self.breaker.allows_requests:
+            GC_FAST_FAILS.labels(self.name).inc()
+            raise SteamGCUnavailableException(
+                f"GC of account {self.name} is {self.breaker.state.value}",
+                retry_after=self.breaker.retry_after(),
+            )
+
+    def _check_deadline(self, deadline: Optional[float], stage: str = "lookup") -> None:
+        if deadline is not None and deadline <= time.monotonic():
+            DEADLINE_EXCEEDED.labels(self.name).inc()
+            raise SteamDeadlineExceededException(f"Deadline exceeded before {stage}")
 
     def connect(self) -> None:
         if self.steam_loop is None or self.steam_loop.dead:
@@ -67,15 +530,20 @@ class SteamAPI:
 
         self.connected = bool(self.steam_client.connected)
 
-        if self.watchdog_loop is None or self.watchdog_loop.dead:
-            self.watchdog_loop = gevent.spawn(self._watchdog)
+        if self.supervisor_loop is None or self.supervisor_loop.dead:
+            self.supervisor_loop = gevent.spawn(self._supervisor)
+
+        if self._cm_servers is not None and STEAM_CM_PROBE_INTERVAL_SEC > 0:
+            if self.cm_prober_loop is None or self.cm_prober_loop.dead:
+                self.cm_prober_loop = gevent.spawn(self._cm_prober)
 
     def disconnect(self) -> None:
-        try:
-            if self.watchdog_loop and not self.watchdog_loop.dead:
-                self.watchdog_loop.kill()
-        except Exception:
-            logger.exception("SteamAPI[disconnect]: Watchdog kill failed")
+        for loop in (self.supervisor_loop, self.cm_prober_loop):
+            try:
+                if loop and not loop.dead:
+                    loop.kill()
+            except Exception:
+                logger.exception("SteamAPI[disconnect]: Background greenlet kill failed")
 
         try:
             if self.steam_loop and not self.steam_loop.dead:
@@ -91,39 +559,360 @@ class SteamAPI:
         self.connected = False
 
 
-    def get_cs2_match_url(self, match_code: str) -> Optional[str]:
-        self._ensure_connected()
+    def get_cs2_match_url(
+        self,
+        match_code: str,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> Optional[str]:
+        return self.get_demo_url(*decode_match_code(match_code), deadline=deadline, priority=priority)
+
+    def get_demo_url(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> Optional[str]:
+        if self.demo_cache is not None:
+            entry = self.demo_cache.get(match_id, outcome_id, token)
+            if entry is not None:
+                return entry.demo_url
+
+        return self._lookup_match(match_id, outcome_id, token, deadline, priority)[0]
+
+    def get_match_info(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> Optional[bytes]:
+        """
+        Serialized CDataGCCStrike15_v2_MatchInfo of the match, from the cache or the same full_match_info lookup
+        get_demo_url makes.
+        """
+        if self.demo_cache is not None:
+            data = self.demo_cache.get_match_info(match_id, outcome_id, token)
+            if data is not None:
+                return data
+
+        return self._lookup_match(match_id, outcome_id, token, deadline, priority)[1]
+
+    def _lookup_match(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float],
+        priority: LookupPriority,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        self.stats.lookups += 1
+
+        inflight = self._inflight.get(match_id)
+        if inflight is not None:
+            # an interactive caller must not wait in the bulk lane behind a backfill
+            ticket = self._queued_tickets.get(match_id)
+            if ticket is not None and priority == LookupPriority.INTERACTIVE:
+                self._gc_scheduler.promote(ticket, priority)
+
+            return self._join_inflight(inflight, deadline)
+
+        inflight = self._start_inflight(
+            self._inflight, match_id, self._fetch_cs2_match_url, match_id, outcome_id, token, None, priority
+        )
+        return self._wait_inflight(inflight, deadline)
+
+    def get_recent_demos(
+        self,
+        account_id: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> list[MatchDemo]:
+        """
+        Recent matches of a player with their demo URLs, from one recent_user_games GC request;
+        every demo URL seen goes into the demo cache.
+        """
+        self.stats.lookups += 1
+
+        inflight = self._inflight_players.get(account_id)
+        if inflight is not None:
+            return self._join_inflight(inflight, deadline)
+
+        inflight = self._start_inflight(
+            self._inflight_players, account_id, self._fetch_recent_demos, account_id, None, priority
+        )
+        return self._wait_inflight(inflight, deadline)
+
+    def _start_inflight(
+        self,
+        inflights: dict[int, AsyncResult],
+        key: int,
+        fetch: Callable[..., Any],
+        *args,
+    ) -> AsyncResult:
+        """
+        Runs a lookup shared by every caller of key in a greenlet of its own. It gets no caller deadline,
+        only the adaptive GC timeout: each caller applies its own deadline to its wait for the result,
+        so nobody inherits the deadline of whoever came first.
+        """
+        inflight = inflights[key] = AsyncResult()
+
+        def run() -> None:
+            try:
+                inflight.set(fetch(*args))
+            except BaseException as exc:
+                inflight.set_exception(exc)
+            finally:
+                del inflights[key]
+
+        # the fetch spans land in the trace of the request that started it
+        gevent.spawn(contextvars.copy_context().run, run)
+        return inflight
 
-        decoded = sharecode.decode(match_code)
-        match_id = int(decoded["matchid"])
-        outcome_id = int(decoded["outcomeid"])
-        token = int(decoded["token"])
+    def _join_inflight(self, inflight: AsyncResult, deadline: Optional[float]) -> Any:
+        self.stats.coalesced_lookups += 1
+        LOOKUPS_COALESCED.labels(self.name).inc()
 
-        with self._gc_lock:
-            for attempt in (1, 2):
-                try:
-                    self._ensure_gc_usable()
+        with span("coalesced_wait"):
+            return self._wait_inflight(inflight, deadline)
 
-                    self.cs_client.request_full_match_info(match_id, outcome_id, token)
+    def _wait_inflight(self, inflight: AsyncResult, deadline: Optional[float]) -> Any:
+        try:
+            return inflight.get(timeout=remaining_sec(deadline))
+        except Timeout:
+            DEADLINE_EXCEEDED.labels(self.name).inc()
+            raise SteamDeadlineExceededException("Deadline exceeded waiting for the GC lookup")
 
-                    with Timeout(STEAM_GC_TIMEOUT_SEC, SteamAPIException("GC timed out")):
-                        ev = self.cs_client.wait_event(
-                            "full_match_info",
-                            timeout=STEAM_GC_TIMEOUT_SEC,
-                            raises=True,
-                        )
+    def _fetch_cs2_match_url(
+        self,
+        match_id: int,
+        outcome_id: int,
+        token: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """
+        Demo URL of the match and its CDataGCCStrike15_v2_MatchInfo, compacted and serialized for the cache.
+        """
+        msg = self._fetch_match_list(
+            lambda: self._request_full_match_info(match_id, outcome_id, token, deadline),
+            deadline,
+            priority,
+            ticket_key=match_id,
+            what=f"full_match_info for match {match_id}",
+        )
+        if msg is None:
+            return None, None
 
-                    msg = ev[0] if isinstance(ev, (list, tuple)) else ev
-                    return extract_demo_url(msg, match_id, token)
+        cpu_started = time.thread_time()
+        with span("extract"):
+            demo_url = extract_demo_url(msg, match_id, token)
+        EXTRACT_DEMO_URL_SECONDS.observe(time.thread_time() - cpu_started)
 
-                except SteamAPIException:
-                    logger.warning("SteamAPI[get_cs2_match_url]: GC timeout. Relaunch and retry (attempt %s)", attempt)
-                    self._relaunch_gc(reason="full_match_info_timeout")
-                except Exception:
-                    logger.exception("SteamAPI[disconnect]: Unexpected error in get_cs2_match_url")
-                    return None
+        match = find_match(msg, match_id)
+        match_info = compact_match(match) if match is not None else None
+        if demo_url and self.demo_cache is not None:
+            self.demo_cache.put(match_id, outcome_id, token, demo_url, match_info)
+        return demo_url, match_info
 
-        return None
+    def _fetch_recent_demos(
+        self,
+        account_id: int,
+        deadline: Optional[float] = None,
+        priority: LookupPriority = LookupPriority.INTERACTIVE,
+    ) -> list[MatchDemo]:
+        msg = self._fetch_match_list(
+            lambda: self._request_recent_user_games(account_id, deadline),
+            deadline,
+            priority,
+            ticket_key=None,
+            what=f"recent_user_games for account {account_id}",
+        )
+        if msg is None:
+            return []
+
+        cpu_started = time.thread_time()
+        with span("extract"):
+            demos = extract_match_demos(msg)
+        EXTRACT_DEMO_URL_SECONDS.observe(time.thread_time() - cpu_started)
+        if self.demo_cache is not None:
+            matches = {match.matchid: match for match in msg.matches}
+            self.demo_cache.put_many(
+                [
+                    (demo.match_id, demo.outcome_id, demo.token, demo.demo_url, compact_match(matches[demo.match_id]))
+                    for demo in demos
+                    if demo.demo_url
+                ]
+            )
+        return demos
+
+    def _fetch_match_list(
+        self,
+        send_request: Callable[[], Any],
+        deadline: Optional[float],
+        priority: LookupPriority,
+        ticket_key: Optional[int],
+        what: str,
+    ) -> Any:
+        """
+        Runs one GC request through the session wait, the request window, re-issues and retries;
+        returns the MatchList reply, or None after an unexpected error.
+        """
+        # no reconnect from here: the supervisor owns the Steam connection, _await_gc_session waits for it
+        self.retry_budget.deposit()
+
+        attempt = 1
+        reissues = 0
+        while True:
+            with span("gc_session"):
+                self._await_gc_session(deadline)
+
+            try:
+                return self._request_in_window(send_request, deadline, priority, ticket_key)
+
+            except SteamDeadlineExceededException:
+                DEADLINE_EXCEEDED.labels(self.name).inc()
+                raise
+            except SteamGCThrottledException:
+                raise
+            except SteamGCSessionLostException:
+                # not the request's fault: send it again once the session is back, without spending a retry
+                reissues += 1
+                if reissues > _GC_MAX_REISSUES:
+                    raise
+                GC_REQUESTS_REISSUED.labels(self.name).inc()
+                continue
+            except SteamGCUnavailableException:
+                # the session went away under the request: wait for it to come back, if allowed to retry
+                if not self._may_retry(attempt, deadline):
+                    raise
+            except SteamGCTimeoutException:
+                logger.warning("SteamAPI[_fetch_match_list]: GC timeout on %s (attempt %s)", what, attempt)
+                if self.breaker.on_timeout():
+                    self._trip_gc(reason="request_timeout")
+                if not self._may_retry(attempt, deadline):
+                    raise SteamGCTimeoutException(f"GC did not answer {what}")
+            except Exception:
+                logger.exception("SteamAPI[_fetch_match_list]: Unexpected error on %s", what)
+                return None
+
+            attempt += 1
+            GC_RETRIES.labels(self.name).inc()
+
+    def _may_retry(self, attempt: int, deadline: Optional[float]) -> bool:
+        if attempt >= _GC_MAX_ATTEMPTS or remaining_sec(deadline) == 0:
+            return False
+        if not self.retry_budget.try_withdraw():
+            GC_RETRIES_DENIED.labels(self.name).inc()
+            return False
+        return True
+
+    def _request_in_window(
+        self,
+        send_request: Callable[[], Any],
+        deadline: Optional[float],
+        priority: LookupPriority,
+        ticket_key: Optional[int] = None,
+    ):
+        # bulk lookups are already paced by the bulk slots: they wait in their lane for as long as the caller allows
+        timeout = STEAM_GC_QUEUE_MAX_WAIT_SEC if priority == LookupPriority.INTERACTIVE else None
+        remaining = remaining_sec(deadline)
+        caller_bound = remaining is not None and (timeout is None or remaining < timeout)
+        if caller_bound:
+            timeout = remaining
+
+        ticket = GCTicket(priority)
+        if ticket_key is not None:
+            self._queued_tickets[ticket_key] = ticket
+        wait_started = time.perf_counter()
+        try:
+            with span("gc_window"):
+                acquired = self._gc_scheduler.acquire(ticket, timeout=timeout)
+        finally:
+            if ticket_key is not None:
+                del self._queued_tickets[ticket_key]
+
+        GC_WINDOW_WAIT_SECONDS.labels(self.name, ticket.lane.value).observe(time.perf_counter() - wait_started)
+        if not acquired:
+            if caller_bound:
+                raise SteamDeadlineExceededException("Deadline exceeded waiting for the GC request window")
+            GC_ADMISSION_REJECTED.labels(self.name, "queue_wait").inc()
+            raise SteamGCThrottledException(
+                f"Waited {timeout:.0f}s for the GC request window of account {self.name}",
+                retry_after=self.estimated_wait_sec(priority),
+            )
+
+        try:
+            return send_request()
+        finally:
+            self._gc_scheduler.release()
+
+    def _request_full_match_info(self, match_id: int, outcome_id: int, token: int, deadline: Optional[float] = None):
+        return self._gc_request(
+            self._pending,
+            match_id,
+            lambda: self.cs_client.request_full_match_info(match_id, outcome_id, token),
+            deadline,
+        )
+
+    def _request_recent_user_games(self, account_id: int, deadline: Optional[float] = None):
+        return self._gc_request(
+            self._pending_players,
+            account_id,
+            lambda: self.cs_client.request_recent_user_games(account_id),
+            deadline,
+        )
+
+    def _gc_request(
+        self,
+        pending: dict[int, list[AsyncResult]],
+        key: int,
+        send: Callable[[], None],
+        deadline: Optional[float] = None,
+    ):
+        """
+        Sends one GC request and waits for the reply routed to pending[key], bounded by the adaptive timeout.
+        """
+        # the session may have dropped while waiting for the window; the GC would never answer
+        if self.cs_client.connection_status != GCConnectionStatus.HAVE_SESSION:
+            raise SteamGCSessionLostException("GC session lost", retry_after=self.breaker.retry_after())
+
+        timeout = self.gc_timeout.value
+        caller_bound = False
+        remaining = remaining_sec(deadline)
+        if remaining is not None and remaining < timeout:
+            timeout, caller_bound = remaining, True
+
+        waiter = AsyncResult()
+        pending.setdefault(key, []).append(waiter)
+
+        started = time.perf_counter()
+        try:
+            self.stats.gc_requests += 1
+            GC_REQUESTS.labels(self.name).inc()
+            with span("gc_request"):
+                send()
+                msg = waiter.get(timeout=timeout)
+
+            latency = time.perf_counter() - started
+            GC_REQUEST_SECONDS.labels(self.name).observe(latency)
+            self.gc_timeout.observe(latency)
+            return msg
+        except Timeout:
+            if caller_bound:
+                raise SteamDeadlineExceededException("Deadline exceeded waiting for full_match_info")
+            GC_TIMEOUTS.labels(self.name).inc()
+            raise SteamGCTimeoutException(f"GC timed out after {timeout:.1f}s")
+        finally:
+            waiters = pending.get(key)
+            if waiters is not None:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    del pending[key]
 
     def login(
         self,
@@ -147,8 +936,9 @@ class SteamAPI:
         if res == EResult.OK:
             self.login_user = username
             self._creds = _Creds(username, password, email_code, two_factor_code)
+            self._launch_gc()
 
-            logger.info("SteamAPI[login]: Login OK. Username = %s", username)
+            logger.info("SteamAPI[login]: Login OK. Account = %s, username = %s", self.name, username)
             return True, SteamLoginStatus.SUCCESS
 
         if res == EResult.AccountLogonDenied:
@@ -165,11 +955,42 @@ class SteamAPI:
 
         return False, SteamLoginStatus.FAILED
 
+    def resume_session(self) -> bool:
+        """
+        Logs in with the login key saved by a previous process and launches the GC;
+        no password or email/2FA code needed. Returns False when there is nothing to resume.
+        """
+        saved = self.session_store.load_login_key() if self.session_store is not None else None
+        if saved is None:
+            return False
+
+        username, login_key = saved
+        self._ensure_connected()
+
+        res = self.steam_client.login(username=username, login_key=login_key)
+        if res != EResult.OK:
+            logger.warning("SteamAPI[resume_session]: Login by saved key failed for %s: %r", username, res)
+            # Steam revoked the key; keep it on transient failures (TryAnotherCM, ...)
+            if res == EResult.InvalidPassword:
+                self.session_store.clear_login_key()
+            return False
+
+        self.login_user = username
+        self._launch_gc()
+
+        logger.info("SteamAPI[resume_session]: Session resumed. Account = %s, username = %s", self.name, username)
+        return True
+
     def logout(self) -> None:
         self._ensure_connected()
         self.steam_client.logout()
         self.login_user = None
         self._creds = None
+        self.breaker.on_offline()
+
+        # logged out on purpose: the next process must not log back in by itself
+        if self.session_store is not None:
+            self.session_store.clear_login_key()
 
     def reconnect(self) -> None:
         self.disconnect()
@@ -183,6 +1004,7 @@ class SteamAPI:
             self._last_steam_reconnect_ts = now
 
             logger.warning("SteamAPI[_ensure_connected]: Steam disconnected, reconnecting...")
+            STEAM_RECONNECTS.labels(self.name).inc()
             ok = self.steam_client.connect()
             if not ok:
                 raise SteamAPIException("SteamAPI[_ensure_connected]: Steam API not connected")
@@ -196,6 +1018,7 @@ class SteamAPI:
         try:
             if getattr(self.steam_client, "relogin_available", False):
                 logger.warning("SteamAPI[_auto_relogin]: Trying steam_client.relogin()...")
+                STEAM_RELOGINS.labels(self.name).inc()
                 self.steam_client.relogin()
                 return
         except Exception:
@@ -204,6 +1027,7 @@ class SteamAPI:
 
         if self._creds:
             logger.warning("SteamAPI[_auto_relogin]: Trying login by password for %s...", self._creds.username)
+            STEAM_RELOGINS.labels(self.name).inc()
             res = self.steam_client.login(
                 username=self._creds.username,
                 password=self._creds.password,
@@ -212,65 +1036,204 @@ class SteamAPI:
             )
             logger.warning("SteamAPI[_auto_relogin]: %r", res)
 
-    def _ensure_gc_usable(self, timeout_sec: int = 20) -> None:
-        if self.cs_client.connection_status == GCConnectionStatus.HAVE_SESSION:
+    def _await_gc_session(self, deadline: Optional[float] = None) -> None:
+        give_up_at = time.monotonic() + self.breaker.launch_timeout_sec
+
+        while self.cs_client.connection_status != GCConnectionStatus.HAVE_SESSION:
+            self._check_deadline(deadline, stage="the GC session came up")
+
+            state = self.breaker.state
+            if state == GCState.READY and time.monotonic() < give_up_at:
+                # event handlers run in their own greenlets: the session is gone, notready is not handled yet
+                gevent.sleep(0.05)
+            elif state == GCState.LAUNCHING and self.breaker.seconds_to_deadline() > 0:
+                timeout = self.breaker.seconds_to_deadline()
+                if deadline is not None:
+                    timeout = min(timeout, remaining_sec(deadline))
+                self._gc_ready.wait(timeout=timeout)
+            else:
+                GC_FAST_FAILS.labels(self.name).inc()
+                raise SteamGCUnavailableException(
+                    f"GC of account {self.name} is {state.value}",
+                    retry_after=self.breaker.retry_after(),
+                )
+
+    def _launch_gc(self) -> None:
+        self.breaker.on_launch()
+        self._gc_launched = True
+        gevent.spawn(self.cs_client.launch)
+        self._supervisor_wakeup.set()
+
+    def _trip_gc(self, reason: str) -> None:
+        """
+        Opens the circuit and drops the GC session; the supervisor relaunches it after the backoff.
+        """
+        if self.breaker.state == GCState.BACKOFF:
             return
-        self.cs_client.launch()
 
-        end = time.time() + timeout_sec
-        while time.time() < end:
-            if self.cs_client.connection_status == GCConnectionStatus.HAVE_SESSION:
-                return
-            gevent.sleep(0.2)
-
-        logger.warning("SteamAPI[_ensure_gc_usable]: GC status still %r after %ss (continue anyway)",
-                       self.cs_client.connection_status, timeout_sec)
-
-    def _relaunch_gc(self, reason: str = "") -> None:
-        now = time.time()
-        if now - self._last_gc_relaunch_ts < 5.0:
-            return
-        self._last_gc_relaunch_ts = now
-
-        logger.warning("SteamAPI[_relaunch_gc]: Relaunching GC (reason=%s)", reason)
+        delay = self.breaker.on_failure()
+        logger.warning(
+            "SteamAPI[_trip_gc]: GC circuit open (account=%s, reason=%s, failures=%s), relaunch in %.1fs",
+            self.name, reason, self.breaker.failures, delay,
+        )
+        GC_RELAUNCHES.labels(self.name, reason).inc()
         try:
             self.cs_client.exit()
         except Exception:
-            pass
-        gevent.sleep(1.5)
-        try:
-            self.cs_client.launch()
-        except Exception:
-            pass
+            logger.exception("SteamAPI[_trip_gc]: cs_client.exit failed")
+        self._supervisor_wakeup.set()
 
-    def _watchdog(self) -> None:
+    def _supervisor(self) -> None:
         while True:
             try:
-                if not self.steam_client.connected:
-                    self._ensure_connected()
-                    self._auto_relogin()
+                timeout = self._supervise()
+            except Exception:
+                logger.exception("SteamAPI[_supervisor]: supervisor error")
+                timeout = _SUPERVISOR_IDLE_SEC
 
-                if self.cs_client.connection_status != GCConnectionStatus.HAVE_SESSION:
-                    if self._gc_lock.acquire(blocking=False):
-                        try:
-                            self._relaunch_gc(reason=f"watchdog:{self.cs_client.connection_status!r}")
-                        finally:
-                            self._gc_lock.release()
+            self._supervisor_wakeup.wait(timeout=timeout)
+            self._supervisor_wakeup.clear()
 
+    def _supervise(self) -> float:
+        """
+        Moves the Steam connection and the GC state machine one step; returns how long to sleep
+        unless an event comes first.
+        """
+        if not self.steam_client.connected:
+            try:
+                self._ensure_connected()
+            except SteamAPIException:
+                self._steam_reconnect_failures += 1
+                return min(_STEAM_RECONNECT_BACKOFF_MAX_SEC, 2.0 ** self._steam_reconnect_failures)
+            self._steam_reconnect_failures = 0
+            self._auto_relogin()
+
+        # before login there is nothing to launch (launch() would block until logged_on)
+        if not self.steam_client.logged_on or self.login_user is None:
+            if self.breaker.state == GCState.LAUNCHING and self.breaker.seconds_to_deadline() == 0:
+                logger.warning("SteamAPI[_supervise]: Not logged back in after a disconnect (account=%s)", self.name)
+                self.breaker.on_offline()
+            timeout = self.breaker.seconds_to_deadline()
+            return _SUPERVISOR_IDLE_SEC if not timeout else min(timeout, _SUPERVISOR_IDLE_SEC)
+
+        state = self.breaker.state
+        if state == GCState.OFFLINE or (state == GCState.LAUNCHING and not self._gc_launched):
+            # logged on again after a disconnect
+            self._launch_gc()
+        elif state == GCState.LAUNCHING and self.breaker.seconds_to_deadline() == 0:
+            self._trip_gc(reason="launch_timeout")
+        elif state == GCState.BACKOFF and self.breaker.seconds_to_deadline() == 0:
+            logger.warning("SteamAPI[_supervise]: Relaunching GC (account=%s, attempt %s)", self.name, self.breaker.failures + 1)
+            self._launch_gc()
+
+        timeout = self.breaker.seconds_to_deadline()
+        return _SUPERVISOR_IDLE_SEC if timeout is None else timeout
+
+    def _cm_prober(self) -> None:
+        while True:
+            try:
+                reachable = self._cm_servers.probe(STEAM_CM_PROBE_TIMEOUT_SEC, STEAM_CM_PROBE_CONCURRENCY)
+                best_latency = self._cm_servers.best_latency()
+                logger.info(
+                    "SteamAPI[_cm_prober]: %s of %s CM servers reachable, best %s (account=%s)",
+                    reachable, len(self._cm_servers),
+                    "n/a" if best_latency is None else f"{best_latency * 1000:.0f}ms", self.name,
+                )
             except Exception:
-                logger.exception("SteamAPI[_watchdog]: watchdog error")
-
-            gevent.sleep(5)
+                logger.exception("SteamAPI[_cm_prober]: CM probe failed")
 
+            gevent.sleep(STEAM_CM_PROBE_INTERVAL_SEC)
 
     def _on_disconnected(self, *args, **kwargs):
         logger.warning("SteamAPI[_on_disconnected]: Steam disconnected event")
 
+        server_addr = getattr(self.steam_client, "current_server_addr", None)
+        if self._cm_servers is not None and server_addr is not None:
+            # reconnect to the next best CM, not to the one that just dropped us
+            self._cm_servers.mark_bad(server_addr)
+            STEAM_CM_FAILOVERS.labels(self.name).inc()
+
+        # the supervisor logs back in by itself: requests wait for that like for a launch instead of failing
+        relogin_possible = bool(getattr(self.steam_client, "relogin_available", False) or self._creds)
+        self._on_gc_lost(offline=True, reconnecting=self.login_user is not None and relogin_possible)
+
+    def _on_logged_on(self, *args, **kwargs):
+        self._supervisor_wakeup.set()
+
+    def _on_new_login_key(self, *args, **kwargs):
+        try:
+            self.session_store.save_login_key(self.steam_client.username, self.steam_client.login_key)
+        except OSError:
+            logger.exception("SteamAPI[_on_new_login_key]: Failed to save login key")
+
     def _on_logged_off(self, result=None, *args, **kwargs):
         logger.warning("SteamAPI[_on_logged_off]: Steam logged_off event: %r", result)
+        self._on_gc_lost(offline=True)
 
     def _on_gc_notready(self, *args, **kwargs):
         logger.warning("SteamAPI[_on_gc_notready]: GC notready event")
+        self._on_gc_lost(offline=False)
 
     def _on_gc_ready(self, *args, **kwargs):
         logger.info("SteamAPI[_on_gc_ready]: GC ready event")
+        self.breaker.on_ready()
+        self._gc_ready.set()
+        self._supervisor_wakeup.set()
+
+    def _on_gc_lost(self, offline: bool, reconnecting: bool = False) -> None:
+        if reconnecting:
+            self.breaker.on_reconnect()
+        elif offline:
+            self.breaker.on_offline()
+        else:
+            self.breaker.on_session_lost()
+        if offline:
+            self._gc_launched = False
+        self._gc_ready.clear()
+
+        # replies for requests sent to the lost session will never come: their lookups send them again
+        pending = list(self._pending.values()) + list(self._pending_players.values())
+        self._pending, self._pending_players = {}, {}
+        for waiters in pending:
+            for waiter in waiters:
+                waiter.set_exception(
+                    SteamGCSessionLostException("GC session lost", retry_after=self.breaker.retry_after())
+                )
+
+        self._supervisor_wakeup.set()
+
+    def _on_full_match_info(self, message, *args, **kwargs):
+        match_ids = [match.matchid for match in message.matches]
+
+        if STEAM_RECORD_FIXTURES_DIR and match_ids:
+            try:
+                save_match_list(message, STEAM_RECORD_FIXTURES_DIR)
+            except OSError:
+                logger.exception("SteamAPI[_on_full_match_info]: Failed to record fixture")
+
+        # GC answers unknown/expired matches with an empty list; only attributable when one match is pending
+        if not match_ids and len(self._pending) == 1:
+            match_ids = list(self._pending)
+
+        for match_id in match_ids:
+            for waiter in self._pending.pop(match_id, ()):
+                waiter.set(message)
+
+        self.breaker.on_reply()
+
+        if not match_ids:
+            logger.warning("SteamAPI[_on_full_match_info]: Unattributable full_match_info with no matches")
+
+    def _on_recent_user_games(self, message, *args, **kwargs):
+        account_id = message.accountid
+        if not account_id and len(self._pending_players) == 1:
+            account_id = next(iter(self._pending_players))
+
+        waiters = self._pending_players.pop(account_id, ())
+        for waiter in waiters:
+            waiter.set(message)
+
+        self.breaker.on_reply()
+
+        if not waiters:
+            logger.warning("SteamAPI[_on_recent_user_games]: Unattributable recent_user_games for %s", account_id)
@@ -0,0 +1,44 @@
+from collections import deque
+
+# percentile is recomputed every this many samples, not on every request
+_RECOMPUTE_EVERY = 32
+
+
+class AdaptiveTimeout:
+    """
+    GC request timeout derived from recent round trips: p99 * factor, clamped to [min_sec, max_sec].
+    Stays at max_sec until the first round trip was seen.
+
+    Timeouts are not recorded: the GC answers quickly or drops the request, and counting drops
+    as latency would ratchet the timeout up to max_sec. A GC that slows down gradually stays
+    within the factor's headroom. Used from one hub thread only.
+    """
+
+    def __init__(
+        self,
+        min_sec: float,
+        max_sec: float,
+        factor: float,
+        window: int = 512,
+    ):
+        self.min_sec = min_sec
+        self.max_sec = max_sec
+        self.factor = factor
+
+        self._samples: deque[float] = deque(maxlen=window)
+        self._since_recompute = 0
+        self.value = max_sec
+
+    def observe(self, latency_sec: float) -> None:
+        self._samples.append(latency_sec)
+        self._since_recompute += 1
+
+        # while the window fills up every sample counts
+        if self._since_recompute >= _RECOMPUTE_EVERY or len(self._samples) < _RECOMPUTE_EVERY:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        self._since_recompute = 0
+        samples = sorted(self._samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        self.value = min(self.max_sec, max(self.min_sec, p99 * self.factor))
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import gevent
+
+from components.metrics.definitions import EVENT_LOOP_BLOCKED
+from components.steam.hub import GeventHubThread
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class BlockedLoop:
+    loop: str
+    started_at: float
+    # grows until the loop runs again
+    blocked_sec: float
+    stack: str
+
+
+class _Heartbeat:
+    __slots__ = ("name", "thread_id", "last_beat", "blocked")
+
+    def __init__(self, name: str, thread_id: int):
+        self.name = name
+        self.thread_id = thread_id
+        self.last_beat = time.monotonic()
+        # the stall in progress, once reported
+        self.blocked: Optional[BlockedLoop] = None
+
+    def beat(self) -> None:
+        self.last_beat = time.monotonic()
+        self.blocked = None
+
+
+class BlockingMonitor:
+    """
+    Detects event loops (the asyncio loop, gevent hubs) that did not run for longer than threshold_sec.
+
+    Each watched loop bumps a heartbeat every interval; a watchdog OS thread notices a heartbeat that
+    stopped and records the stack the loop's thread is executing right then, i.e. the code that blocks it.
+    """
+
+    def __init__(self, threshold_sec: float, size: int = 50):
+        self.threshold_sec = threshold_sec
+        self.interval_sec = threshold_sec / 4
+        # appended by the watchdog thread, read by the API: both under _events_lock
+        self._events: deque[BlockedLoop] = deque(maxlen=size)
+        self._events_lock = threading.Lock()
+
+        self._heartbeats: list[_Heartbeat] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._asyncio_beat: Optional[asyncio.TimerHandle] = None
+
+    def recent(self) -> list[BlockedLoop]:
+        """
+        Snapshot of the recorded stalls, newest first.
+        """
+        with self._events_lock:
+            return list(reversed(self._events))
+
+    def watch_asyncio(self) -> None:
+        """
+        Watches the running asyncio loop; must be called from it.
+        """
+        heartbeat = _Heartbeat("asyncio", threading.get_ident())
+        self._heartbeats.append(heartbeat)
+        loop = asyncio.get_running_loop()
+
+        def _beat() -> None:
+            heartbeat.beat()
+            self._asyncio_beat = loop.call_later(self.interval_sec, _beat)
+
+        _beat()
+
+    def watch_gevent(self, name: str, hub_thread: GeventHubThread) -> None:
+        heartbeat = _Heartbeat(f"gevent:{name}", hub_thread.thread_id)
+        self._heartbeats.append(heartbeat)
+
+        def _beat() -> None:
+            while not self._stop.is_set():
+                heartbeat.beat()
+                gevent.sleep(self.interval_sec)
+
+        hub_thread.spawn_threadsafe(_beat)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._watchdog, name="blocking-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._asyncio_beat is not None:
+            self._asyncio_beat.cancel()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _watchdog(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            now = time.monotonic()
+            for heartbeat in self._heartbeats:
+                # the loop was due to beat interval_sec after the last beat
+                blocked_sec = now - heartbeat.last_beat - self.interval_sec
+                if blocked_sec < self.threshold_sec:
+                    continue
+                if heartbeat.blocked is not None:
+                    heartbeat.blocked.blocked_sec = blocked_sec
+                    continue
+
+                frame = sys._current_frames().get(heartbeat.thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no Python frame>\n"
+                heartbeat.blocked = BlockedLoop(heartbeat.name, time.time() - blocked_sec, blocked_sec, stack)
+                with self._events_lock:
+                    self._events.append(heartbeat.blocked)
+                EVENT_LOOP_BLOCKED.labels(heartbeat.name).inc()
+                logger.warning(
+                    "BlockingMonitor[_watchdog]: %s loop blocked for %.2fs in:\n%s", heartbeat.name, blocked_sec, stack
+                )
@@ -0,0 +1,85 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+
+SERVER_TIMING_HEADER = b"server-timing"
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Timed spans of one HTTP request. Spans may be added from the gevent hub thread too:
+    GeventHubThread.submit runs the hub side in the caller's contextvars context.
+    """
+
+    __slots__ = ("method", "path", "status", "started_at", "started", "duration", "spans")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.status = 0
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        # (name, offset from the request start, duration), all in seconds
+        self.spans: list[tuple[str, float, float]] = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self, status: int) -> None:
+        self.status = status
+        self.duration = self.elapsed()
+
+    def server_timing(self) -> bytes:
+        """
+        Server-Timing value: time per span name (repeated spans, e.g. retries, are summed) and the total so far.
+        """
+        totals: dict[str, float] = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        totals["total"] = self.elapsed()
+        return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in totals.items()).encode()
+
+
+def start_trace(method: str, path: str) -> tuple[RequestTrace, Token]:
+    trace = RequestTrace(method, path)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, started - trace.started, time.perf_counter() - started))
+
+
+class SlowRequestLog:
+    """
+    Ring buffer of the most recent requests slower than threshold_sec. Used from the asyncio loop only.
+    """
+
+    def __init__(self, threshold_sec: float, size: int = 100):
+        self.threshold_sec = threshold_sec
+        self._traces: deque[RequestTrace] = deque(maxlen=size)
+
+    def record(self, trace: RequestTrace) -> None:
+        if trace.duration is not None and trace.duration >= self.threshold_sec:
+            self._traces.append(trace)
+
+    def slowest(self) -> list[RequestTrace]:
+        return sorted(self._traces, key=lambda trace: trace.duration, reverse=True)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from utils.process import pid_alive
+from utils.sqlite import connect_wal, to_sqlite_int
+
+
+class LookupClaims:
+    """
+    Match ids being looked up right now, in a SQLite (WAL) table shared by the worker processes on this host:
+    the cross-process counterpart of the in-process single-flight.
+
+    A claim belongs to a process id. It is taken over once its process is gone or it is older than ttl_sec,
+    so a worker that crashed or hangs mid-lookup does not block the match for the others.
+    Claims of one process are reentrant.
+
+    Waits for the database lock are short (busy_timeout_sec): a busy table is reported as sqlite3.OperationalError,
+    the caller then does the lookup on its own. The a* methods run the queries off the event loop.
+    """
+
+    def __init__(self, path: str, ttl_sec: float = 120.0, owner: int | None = None, busy_timeout_sec: float = 0.1):
+        self.ttl_sec = ttl_sec
+        self.owner = owner if owner is not None else os.getpid()
+
+        self._lock = threading.Lock()
+        # match_id -> number of holders in this process
+        self._held: dict[int, int] = {}
+        self._db = connect_wal(path, timeout=busy_timeout_sec)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lookup_claims (
+                match_id INTEGER PRIMARY KEY,
+                owner INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    async def atry_claim(self, match_id: int) -> bool:
+        return await asyncio.to_thread(self.try_claim, match_id)
+
+    async def arelease(self, match_id: int) -> None:
+        await asyncio.to_thread(self.release, match_id)
+
+    async def aclaimed_elsewhere(self, match_id: int) -> bool:
+        return await asyncio.to_thread(self.claimed_elsewhere, match_id)
+
+    def try_claim(self, match_id: int) -> bool:
+        with self._lock:
+            if match_id in self._held:
+                self._held[match_id] += 1
+                return True
+
+            now = time.time()
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                row = self._db.execute(
+                    "SELECT owner, expires_at FROM lookup_claims WHERE match_id = ?", (to_sqlite_int(match_id),)
+                ).fetchone()
+                if row is not None and self._live(row, now):
+                    return False
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO lookup_claims (match_id, owner, expires_at) VALUES (?, ?, ?)",
+                    (to_sqlite_int(match_id), self.owner, now + self.ttl_sec),
+                )
+
+            self._held[match_id] = 1
+            return True
+
+    def release(self, match_id: int) -> None:
+        with self._lock:
+            holders = self._held.get(match_id, 0)
+            if holders > 1:
+                self._held[match_id] = holders - 1
+                return
+            self._held.pop(match_id, None)
+
+            try:
+                self._db.execute(
+                    "DELETE FROM lookup_claims WHERE match_id = ? AND owner = ?", (to_sqlite_int(match_id), self.owner)
+                )
+            except sqlite3.Error:
+                # left behind, it is taken over after ttl_sec
+                pass
+
+    def claimed_elsewhere(self, match_id: int) -> bool:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT owner, expires_at FROM lookup_claims WHERE match_id = ?", (to_sqlite_int(match_id),)
+                ).fetchone()
+            except sqlite3.Error:
+                # unknown: stop waiting, the caller looks the match up again
+                return False
+            return row is not None and self._live(row, time.time())
+
+    def _live(self, row: tuple, now: float) -> bool:
+        owner, expires_at = row
+        return owner != self.owner and expires_at > now and pid_alive(owner)
@@ -0,0 +1,67 @@
+import fcntl
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSlotException(Exception):
+    pass
+
+
+class WorkerSlot:
+    """
+    One of `workers` numbered slots, held with an exclusive flock on its lock file for the life of the process.
+
+    Worker processes started side by side (uvicorn --workers) each take the lowest free slot; the lock goes away
+    with the process, so a worker replacing a dead one inherits its slot, and with it its accounts and job items.
+    """
+
+    def __init__(self, index: int, workers: int, fd: int):
+        self.index = index
+        self.workers = workers
+        self._fd: Optional[int] = fd
+
+    @classmethod
+    def acquire(cls, lock_dir: str, workers: int) -> "WorkerSlot":
+        os.makedirs(lock_dir, exist_ok=True)
+
+        for index in range(workers):
+            fd = os.open(os.path.join(lock_dir, f"slot-{index}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+
+            logger.info("WorkerSlot[acquire]: Process %s took worker slot %s/%s", os.getpid(), index, workers)
+            return cls(index, workers, fd)
+
+        raise WorkerSlotException(f"All {workers} worker slots in {lock_dir} are taken by running processes")
+
+    def accounts(self, account_names: list[str]) -> list[str]:
+        """
+        This slot's share of the accounts, round robin: every account is run by exactly one worker.
+        """
+        names = account_names[self.index :: self.workers]
+        if not names:
+            raise WorkerSlotException(
+                f"Worker slot {self.index} has no Steam account: "
+                f"{len(account_names)} accounts are configured for {self.workers} workers"
+            )
+        return names
+
+    def directory(self, path: str) -> str:
+        """
+        This slot's own subdirectory of a directory shared by the workers.
+        """
+        return os.path.join(path, f"slot-{self.index}")
+
+    def sibling_directories(self, path: str) -> list[str]:
+        return [os.path.join(path, f"slot-{index}") for index in range(self.workers) if index != self.index]
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
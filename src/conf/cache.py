@@ -0,0 +1,17 @@
+import os
+
+from conf.state import STATE_DIR
+
+DEMO_CACHE_PATH = os.getenv("DEMO_CACHE_PATH", os.path.join(STATE_DIR, "demo_cache.sqlite3"))
+DEMO_CACHE_TTL_SEC = int(os.getenv("DEMO_CACHE_TTL_SEC", str(30 * 24 * 3600)))
+DEMO_CACHE_MEMORY_SIZE = int(os.getenv("DEMO_CACHE_MEMORY_SIZE", "10000"))
+DEMO_CACHE_DISK_SIZE = int(os.getenv("DEMO_CACHE_DISK_SIZE", "1000000"))
+
+DEMO_FILES_PATH = os.getenv("DEMO_FILES_PATH", os.path.join(STATE_DIR, "demos"))
+DEMO_FILES_MAX_BYTES = int(os.getenv("DEMO_FILES_MAX_BYTES", str(20 * 1024 ** 3)))
+DEMO_FILES_DOWNLOAD_TIMEOUT_SEC = float(os.getenv("DEMO_FILES_DOWNLOAD_TIMEOUT_SEC", "60"))
+DEMO_FILES_POOL_SIZE = int(os.getenv("DEMO_FILES_POOL_SIZE", "16"))
+
+DEMO_VERIFY_TTL_SEC = int(os.getenv("DEMO_VERIFY_TTL_SEC", str(24 * 3600)))
+DEMO_VERIFY_TIMEOUT_SEC = float(os.getenv("DEMO_VERIFY_TIMEOUT_SEC", "5"))
+DEMO_VERIFY_POOL_SIZE = int(os.getenv("DEMO_VERIFY_POOL_SIZE", "32"))
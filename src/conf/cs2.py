@@ -0,0 +1,9 @@
+import os
+
+CS2_DEMO_BATCH_MAX_SIZE = int(os.getenv("CS2_DEMO_BATCH_MAX_SIZE", "5000"))
+# lookups of one batch in flight at a time: a big batch is paced through the GC rate limit instead of throttled
+CS2_BATCH_CONCURRENCY = int(os.getenv("CS2_BATCH_CONCURRENCY", "32"))
+# each player costs one recent_user_games GC request
+CS2_PLAYERS_BATCH_MAX_SIZE = int(os.getenv("CS2_PLAYERS_BATCH_MAX_SIZE", "100"))
+# decoded / encoded share codes kept in memory
+CS2_MATCH_CODE_CACHE_SIZE = int(os.getenv("CS2_MATCH_CODE_CACHE_SIZE", "65536"))
@@ -0,0 +1,10 @@
+import os
+
+from conf.state import STATE_DIR
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(STATE_DIR, "jobs.sqlite3"))
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "16"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+JOBS_RETRY_DELAY_SEC = float(os.getenv("JOBS_RETRY_DELAY_SEC", "30"))
+JOBS_CALLBACK_TIMEOUT_SEC = float(os.getenv("JOBS_CALLBACK_TIMEOUT_SEC", "10"))
+JOBS_CALLBACK_ATTEMPTS = int(os.getenv("JOBS_CALLBACK_ATTEMPTS", "3"))
@@ -1,10 +1,16 @@
 import os
 
-LOGGING_CONFIG = {
-    "level": os.getenv("LOGGING_LEVEL", "INFO"),
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
+LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "INFO").upper()
+# text / json
+LOGGING_FORMAT = os.getenv("LOGGING_FORMAT", "text")
+# records waiting for the listener thread; beyond that they are dropped. 0 = log synchronously
+LOGGING_QUEUE_SIZE = int(os.getenv("LOGGING_QUEUE_SIZE", "10000"))
+# at most BURST records with the same message template per WINDOW_SEC; 0 = no limit
+LOGGING_RATE_LIMIT_BURST = int(os.getenv("LOGGING_RATE_LIMIT_BURST", "20"))
+LOGGING_RATE_LIMIT_WINDOW_SEC = float(os.getenv("LOGGING_RATE_LIMIT_WINDOW_SEC", "60"))
+
+_FORMATTERS = {
+    "text": {
         "default": {
             "format": "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
         },
@@ -12,15 +18,25 @@ LOGGING_CONFIG = {
             "format": "%(asctime)s | %(levelname)s | uvicorn.access | %(message)s",
         },
     },
+    "json": {
+        "default": {"()": "components.logs.formatters.JsonFormatter"},
+        "access": {"()": "components.logs.formatters.JsonFormatter"},
+    },
+}
+
+LOGGING_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": _FORMATTERS[LOGGING_FORMAT],
     "handlers": {
         "default": {"class": "logging.StreamHandler", "formatter": "default"},
         "access": {"class": "logging.StreamHandler", "formatter": "access"},
     },
     "loggers": {
-        "": {"handlers": ["default"], "level": "INFO"},
-        "uvicorn.error": {"handlers": ["default"], "level": "INFO", "propagate": False},
-        "uvicorn.access": {"handlers": ["access"], "level": "INFO", "propagate": False},
+        "": {"handlers": ["default"], "level": LOGGING_LEVEL},
+        "uvicorn.error": {"handlers": ["default"], "level": LOGGING_LEVEL, "propagate": False},
+        "uvicorn.access": {"handlers": ["access"], "level": LOGGING_LEVEL, "propagate": False},
         "app": {"handlers": ["default"], "level": "DEBUG", "propagate": False},
-        "SteamClient": {"handlers": ["default"], "level": "INFO", "propagate": False},
+        "SteamClient": {"handlers": ["default"], "level": LOGGING_LEVEL, "propagate": False},
     },
-}
\ No newline at end of file
+}
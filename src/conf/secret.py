@@ -4,3 +4,18 @@ from utils.type_cast import strtobool
 
 API_SECRET_KEY = os.getenv("API_SECRET_KEY", "default")
 API_SECRET_KEY_REQUIRED = strtobool(os.getenv("API_SECRET_KEY_REQUIRED", "true"))
+
+# API clients with their own key and limits: API_CLIENTS=web,backfill plus API_CLIENT_<NAME>_KEY and optional
+# API_CLIENT_<NAME>_RATE_PER_SEC / _BURST (request quota) and _MAX_CONCURRENT; 0 = unlimited.
+# API_CLIENT_<NAME>_PRIORITY (interactive / bulk) is the GC lane of the client's lookups.
+# API_SECRET_KEY is the key of the "default" client unless API_CLIENT_DEFAULT_KEY is set
+API_CLIENTS = {
+    name: {
+        "key": os.getenv(f"API_CLIENT_{name.upper()}_KEY", API_SECRET_KEY if name == "default" else ""),
+        "rate_per_sec": float(os.getenv(f"API_CLIENT_{name.upper()}_RATE_PER_SEC", "0")),
+        "burst": float(os.getenv(f"API_CLIENT_{name.upper()}_BURST", "0")),
+        "max_concurrent": int(os.getenv(f"API_CLIENT_{name.upper()}_MAX_CONCURRENT", "0")),
+        "priority": os.getenv(f"API_CLIENT_{name.upper()}_PRIORITY", "interactive"),
+    }
+    for name in ["default"] + [name.strip() for name in os.getenv("API_CLIENTS", "").split(",") if name.strip()]
+}
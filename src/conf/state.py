@@ -0,0 +1,3 @@
+import os
+
+STATE_DIR = os.getenv("STATE_DIR", "/tmp/pvb-steamapi")
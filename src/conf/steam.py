@@ -1,3 +1,67 @@
 import os
 
-STEAM_GC_TIMEOUT_SEC = int(os.getenv("STEAM_GC_TIMEOUT_SEC", "60"))
\ No newline at end of file
+from conf.state import STATE_DIR
+from utils.type_cast import strtobool
+
+# GC request timeout adapts to observed latency: p99 * STEAM_GC_TIMEOUT_P99_FACTOR,
+# clamped to [STEAM_GC_TIMEOUT_MIN_SEC, STEAM_GC_TIMEOUT_SEC]
+STEAM_GC_TIMEOUT_SEC = float(os.getenv("STEAM_GC_TIMEOUT_SEC", "60"))
+STEAM_GC_TIMEOUT_MIN_SEC = float(os.getenv("STEAM_GC_TIMEOUT_MIN_SEC", "5"))
+STEAM_GC_TIMEOUT_P99_FACTOR = float(os.getenv("STEAM_GC_TIMEOUT_P99_FACTOR", "3"))
+# retries are drawn from a budget shared by all accounts: RATIO per lookup plus MIN_PER_SEC
+STEAM_GC_RETRY_BUDGET_RATIO = float(os.getenv("STEAM_GC_RETRY_BUDGET_RATIO", "0.2"))
+STEAM_GC_RETRY_BUDGET_MIN_PER_SEC = float(os.getenv("STEAM_GC_RETRY_BUDGET_MIN_PER_SEC", "10"))
+STEAM_GC_MAX_IN_FLIGHT = int(os.getenv("STEAM_GC_MAX_IN_FLIGHT", "8"))
+
+# comma separated account names; each one gets its own Steam session and GC
+STEAM_ACCOUNTS = [name.strip() for name in os.getenv("STEAM_ACCOUNTS", "default").split(",") if name.strip()]
+
+# optional credentials for login at startup: STEAM_ACCOUNT_<NAME>_USERNAME / STEAM_ACCOUNT_<NAME>_PASSWORD
+STEAM_ACCOUNT_CREDENTIALS = {
+    name: (
+        os.environ[f"STEAM_ACCOUNT_{name.upper()}_USERNAME"],
+        os.environ[f"STEAM_ACCOUNT_{name.upper()}_PASSWORD"],
+    )
+    for name in STEAM_ACCOUNTS
+    if f"STEAM_ACCOUNT_{name.upper()}_USERNAME" in os.environ and f"STEAM_ACCOUNT_{name.upper()}_PASSWORD" in os.environ
+}
+
+# per-account CM server list, sentry files and login key, so a restart logs back in without a password or codes
+# and skips CM discovery; empty disables persistence
+STEAM_CREDENTIALS_DIR = os.getenv("STEAM_CREDENTIALS_DIR", os.path.join(STATE_DIR, "steam"))
+
+# CM servers are probed every STEAM_CM_PROBE_INTERVAL_SEC (0 = never) and connected to fastest first
+STEAM_CM_PROBE_INTERVAL_SEC = float(os.getenv("STEAM_CM_PROBE_INTERVAL_SEC", "300"))
+STEAM_CM_PROBE_TIMEOUT_SEC = float(os.getenv("STEAM_CM_PROBE_TIMEOUT_SEC", "2"))
+STEAM_CM_PROBE_CONCURRENCY = int(os.getenv("STEAM_CM_PROBE_CONCURRENCY", "16"))
+
+# in-process fake Steam/GC (components.steam.fake) instead of real Steam, for load tests and local runs
+STEAM_FAKE = strtobool(os.getenv("STEAM_FAKE", "false"))
+STEAM_FAKE_LATENCY_SEC = float(os.getenv("STEAM_FAKE_LATENCY_SEC", "0.2"))
+STEAM_FAKE_DROP_RATE = float(os.getenv("STEAM_FAKE_DROP_RATE", "0"))
+STEAM_FAKE_DISCONNECT_RATE = float(os.getenv("STEAM_FAKE_DISCONNECT_RATE", "0"))
+STEAM_FAKE_LAUNCH_LATENCY_SEC = float(os.getenv("STEAM_FAKE_LAUNCH_LATENCY_SEC", "0.5"))
+STEAM_FAKE_FIXTURES_DIR = os.getenv("STEAM_FAKE_FIXTURES_DIR") or None
+
+# when set, every full_match_info received from the real GC is saved here as a fixture for the fake GC
+STEAM_RECORD_FIXTURES_DIR = os.getenv("STEAM_RECORD_FIXTURES_DIR") or None
+
+# GC readiness / circuit breaker: a launch that gets no session within STEAM_GC_LAUNCH_TIMEOUT_SEC opens the circuit,
+# relaunches back off exponentially up to STEAM_GC_BACKOFF_MAX_SEC
+STEAM_GC_LAUNCH_TIMEOUT_SEC = float(os.getenv("STEAM_GC_LAUNCH_TIMEOUT_SEC", "20"))
+STEAM_GC_BACKOFF_BASE_SEC = float(os.getenv("STEAM_GC_BACKOFF_BASE_SEC", "2"))
+STEAM_GC_BACKOFF_MAX_SEC = float(os.getenv("STEAM_GC_BACKOFF_MAX_SEC", "120"))
+# consecutive full_match_info timeouts with a session up before the session is considered wedged and relaunched
+STEAM_GC_TRIP_TIMEOUTS = int(os.getenv("STEAM_GC_TRIP_TIMEOUTS", "3"))
+
+# admission control per account: token bucket on GC requests (0 = unlimited) and a bounded queue;
+# lookups expected to wait longer than STEAM_GC_QUEUE_MAX_WAIT_SEC get a 429 before reaching the gevent hub
+STEAM_GC_RATE_PER_SEC = float(os.getenv("STEAM_GC_RATE_PER_SEC", "10"))
+STEAM_GC_RATE_BURST = float(os.getenv("STEAM_GC_RATE_BURST", "20"))
+STEAM_GC_QUEUE_MAX = int(os.getenv("STEAM_GC_QUEUE_MAX", "256"))
+STEAM_GC_QUEUE_MAX_WAIT_SEC = float(os.getenv("STEAM_GC_QUEUE_MAX_WAIT_SEC", "10"))
+# share of GC requests bulk lookups get while interactive ones are waiting too
+STEAM_GC_BULK_MIN_SHARE = float(os.getenv("STEAM_GC_BULK_MIN_SHARE", "0.2"))
+# bulk lookups are never rejected for the rate or the queue: at most STEAM_GC_BULK_MAX_QUEUED of them per account
+# are handed to the GC queue, the others wait their turn on the asyncio side
+STEAM_GC_BULK_MAX_QUEUED = int(os.getenv("STEAM_GC_BULK_MAX_QUEUED", "32"))
@@ -0,0 +1,13 @@
+import os
+
+from utils.type_cast import strtobool
+
+# per-request spans: Server-Timing header and the slow request log
+TRACING_ENABLED = strtobool(os.getenv("TRACING_ENABLED", "true"))
+TRACING_SLOW_REQUEST_MS = float(os.getenv("TRACING_SLOW_REQUEST_MS", "1000"))
+TRACING_SLOW_REQUESTS_SIZE = int(os.getenv("TRACING_SLOW_REQUESTS_SIZE", "100"))
+
+# watchdog of the asyncio loop and the gevent hubs
+BLOCKING_MONITOR_ENABLED = strtobool(os.getenv("BLOCKING_MONITOR_ENABLED", "false"))
+BLOCKING_MONITOR_THRESHOLD_MS = float(os.getenv("BLOCKING_MONITOR_THRESHOLD_MS", "500"))
+BLOCKING_MONITOR_SIZE = int(os.getenv("BLOCKING_MONITOR_SIZE", "50"))
@@ -0,0 +1,16 @@
+import os
+
+from conf.state import STATE_DIR
+
+# number of worker processes; uvicorn reads the same variable as its --workers default
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+# with several workers each one holds a lock file here for its slot, which decides its Steam accounts
+WORKERS_LOCK_DIR = os.getenv("WORKERS_LOCK_DIR", os.path.join(STATE_DIR, "workers"))
+
+# match ids being looked up, shared by the workers so a match is asked to the GC by one of them only;
+# a claim older than LOOKUP_CLAIM_TTL_SEC is taken over, waiters look for the result every LOOKUP_CLAIM_POLL_SEC
+LOOKUP_CLAIMS_PATH = os.getenv("LOOKUP_CLAIMS_PATH", os.path.join(STATE_DIR, "lookup_claims.sqlite3"))
+LOOKUP_CLAIM_TTL_SEC = float(os.getenv("LOOKUP_CLAIM_TTL_SEC", "120"))
+LOOKUP_CLAIM_POLL_SEC = float(os.getenv("LOOKUP_CLAIM_POLL_SEC", "0.05"))
+# a claims table busier than this (the other workers' transactions) is skipped: the lookup is done without a claim
+LOOKUP_CLAIM_BUSY_TIMEOUT_SEC = float(os.getenv("LOOKUP_CLAIM_BUSY_TIMEOUT_SEC", "0.1"))
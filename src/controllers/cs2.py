@@ -1,19 +1,116 @@
-from csgo import sharecode
+import asyncio
+import functools
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException
 from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from api_models.cs2 import (
+    CS2DemoBatchItem,
+    CS2DemoBatchRequest,
+    CS2DemoUrlResponse,
+    CS2MatchInfoResponse,
+    CS2MatchPlayer,
+    CS2PlayerDemosBatchItem,
+    CS2PlayerDemosBatchRequest,
+    CS2PlayerDemosResponse,
+    CS2PlayerMatchDemo,
+)
+from components.cache.constants import DemoCacheStatus, DemoVerifyStatus
+from components.cache.demo_files import DemoFileCache, DemoFileNotFoundException, iter_bz2_decompressed
+from components.cache.demo_verify import DemoUrlVerifier
+from components.steam.constants import DemoLookupStatus, LookupPriority
+from components.steam.demo import MatchDemo
+from components.steam.match_code import MatchRef, decode_match_code, decode_match_codes, encode_match_code
+from components.steam.match_info import parse_match_fields
+from components.steam.pool import SteamAPIPool
+from components.steam.steam import (
+    SteamAPIException,
+    SteamGCThrottledException,
+    SteamGCTimeoutException,
+    SteamGCUnavailableException,
+    steamid_to_account_id,
+)
+from components.tracing.trace import span
+from conf.cs2 import CS2_BATCH_CONCURRENCY
+from utils.deadline import request_deadline
+from utils.priority import request_priority
+
+logger = logging.getLogger(__name__)
+
+_BatchItem = TypeVar("_BatchItem", CS2DemoBatchItem, CS2PlayerDemosBatchItem)
+# looks up one batch item, holding one of the batch's slots while it waits on the GC
+_BatchLookup = Callable[[_BatchItem, asyncio.Semaphore], Awaitable[_BatchItem]]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEMO_MEDIA_TYPE = "application/octet-stream"
+
+CACHE_STATUS_HEADER = "Cache-Status"
+CACHE_STATUS_NAME = "pvb-steamapi"
+
+
+class _DemoFileResponse(FileResponse):
+    # releases the demo file pin once the file is sent or the client is gone
+    def __init__(self, *args, release: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+class _DemoStreamingResponse(StreamingResponse):
+    def __init__(self, *args, release: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def _cache_status_value(status: DemoCacheStatus, stored: bool) -> str:
+    # RFC 9211 Cache-Status syntax
+    if status == DemoCacheStatus.HIT:
+        return f"{CACHE_STATUS_NAME}; hit"
+    if stored:
+        return f"{CACHE_STATUS_NAME}; fwd=miss; stored"
+    return f"{CACHE_STATUS_NAME}; fwd=miss"
 
-from api_models.cs2 import CS2DemoUrlResponse
-from components.steam.steam import SteamAPI
 
+async def get_demo_url_controller(
+    request: Request,
+    response: Response,
+    match_code: str,
+    verify: bool = False,
+    timeout_ms: int | None = None,
+) -> CS2DemoUrlResponse:
 
-async def get_demo_url_controller(request: Request, match_code: str) -> CS2DemoUrlResponse:
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    deadline = request_deadline(request, timeout_ms)
+    priority = request_priority(request)
+    # a malformed code is a 400 here, before any Steam work
+    match_id, outcome_id, token = decode_match_code(match_code)
 
-    steam_api: SteamAPI = request.app.state.steam_api
-    decoded = sharecode.decode(match_code)
-    match_id = int(decoded["matchid"])
-    outcome_id = int(decoded["outcomeid"])
-    token = int(decoded["token"])
+    demo_url, cache_status = await steam_pool.aget_demo_url(
+        match_id, outcome_id, token, deadline=deadline, priority=priority
+    )
+    response.headers[CACHE_STATUS_HEADER] = _cache_status_value(cache_status, stored=demo_url is not None)
 
-    demo_url = steam_api.get_cs2_match_url(match_code)
+    demo_status, demo_size = None, None
+    if verify and demo_url is not None:
+        demo_verifier: DemoUrlVerifier = request.app.state.demo_verifier
+        with span("verify"):
+            demo_status, demo_size = await demo_verifier.averify(match_id, outcome_id, token, demo_url)
 
     return CS2DemoUrlResponse(
         match_code=match_code,
@@ -21,4 +118,278 @@ async def get_demo_url_controller(request: Request, match_code: str) -> CS2DemoU
         outcome_id=outcome_id,
         token=token,
         demo_url=demo_url,
-    )
\ No newline at end of file
+        demo_status=demo_status,
+        demo_size=demo_size,
+    )
+
+
+async def get_match_info_controller(
+    request: Request,
+    response: Response,
+    match_code: str,
+    fields: str | None = None,
+    timeout_ms: int | None = None,
+) -> CS2MatchInfoResponse:
+    """
+    Match metadata (map, score, duration, players, ...) from the GC's full_match_info, without the demo.
+    ?fields= is a comma separated subset of the match fields; only those are parsed and returned.
+    """
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    wanted = parse_match_fields(fields)
+    match_id, outcome_id, token = decode_match_code(match_code)
+
+    match_info, cache_status = await steam_pool.aget_match_info(
+        match_id,
+        outcome_id,
+        token,
+        # the demo URL tells whether the info was cached: it is stored along with the URL only
+        fields=wanted | {"demo_url"},
+        deadline=request_deadline(request, timeout_ms),
+        priority=request_priority(request),
+    )
+    if match_info is None:
+        raise HTTPException(status_code=404, detail="GC returned no info for the match")
+    response.headers[CACHE_STATUS_HEADER] = _cache_status_value(cache_status, stored=match_info.demo_url is not None)
+
+    values = {name: getattr(match_info, name) for name in wanted}
+    if values.get("players") is not None:
+        values["players"] = [
+            CS2MatchPlayer(
+                account_id=player.account_id,
+                kills=player.kills,
+                assists=player.assists,
+                deaths=player.deaths,
+                score=player.score,
+                mvps=player.mvps,
+                headshots=player.headshots,
+            )
+            for player in match_info.players
+        ]
+
+    return CS2MatchInfoResponse(
+        match_code=match_code, match_id=match_id, outcome_id=outcome_id, token=token, **values
+    )
+
+
+async def get_demo_file_controller(
+    request: Request,
+    match_id: int,
+    match_code: str | None = None,
+    decompress: bool = False,
+    timeout_ms: int | None = None,
+) -> Response:
+    """
+    Serves the demo file of a match from the on-disk cache, downloading it from the replay server on a miss.
+    Without match_code the demo URL must already be cached from an earlier lookup.
+    """
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    demo_files: DemoFileCache = request.app.state.demo_files
+
+    if match_code is not None:
+        code_match_id, outcome_id, token = decode_match_code(match_code)
+        if code_match_id != match_id:
+            raise ValueError(f"Match code {match_code} is not for match {match_id}")
+        demo_url, _ = await steam_pool.aget_demo_url(
+            match_id,
+            outcome_id,
+            token,
+            deadline=request_deadline(request, timeout_ms),
+            priority=request_priority(request),
+        )
+        entry = None
+        if steam_pool.demo_cache is not None:
+            entry = await steam_pool.demo_cache.aget(match_id, outcome_id, token)
+    else:
+        entry = await steam_pool.demo_cache.afind(match_id) if steam_pool.demo_cache is not None else None
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Demo URL of the match is not known, pass match_code")
+        demo_url = entry.demo_url
+
+    if demo_url is None:
+        raise HTTPException(status_code=404, detail="Match has no demo")
+    if entry is not None and entry.verify_status == DemoVerifyStatus.EXPIRED:
+        raise DemoFileNotFoundException(f"Demo {demo_url} has expired")
+
+    with span("demo_file"):
+        filepath, cache_status = await demo_files.aget(demo_url)
+    headers = {CACHE_STATUS_HEADER: _cache_status_value(cache_status, stored=True)}
+    filename = os.path.basename(filepath)
+    release = functools.partial(demo_files.release, filepath)
+
+    if decompress and filename.endswith(".bz2"):
+        filename = filename.removesuffix(".bz2")
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # a sync iterator: starlette runs it in the threadpool, chunk by chunk
+        return _DemoStreamingResponse(
+            iter_bz2_decompressed(filepath), media_type=DEMO_MEDIA_TYPE, headers=headers, release=release
+        )
+
+    # Range requests and sendfile are handled by FileResponse
+    return _DemoFileResponse(filepath, media_type=DEMO_MEDIA_TYPE, filename=filename, headers=headers, release=release)
+
+
+async def _lookup_demo_url_item(
+    steam_pool: SteamAPIPool,
+    demo_verifier: Optional[DemoUrlVerifier],
+    item: CS2DemoBatchItem,
+    slots: asyncio.Semaphore,
+    deadline: Optional[float],
+    priority: LookupPriority,
+) -> CS2DemoBatchItem:
+    async with slots:
+        demo_url, _ = await steam_pool.aget_demo_url(
+            item.match_id, item.outcome_id, item.token, deadline=deadline, priority=priority
+        )
+
+    if demo_url is None:
+        return item.model_copy(update={"status": DemoLookupStatus.NO_URL})
+
+    update = {"status": DemoLookupStatus.OK, "demo_url": demo_url}
+    if demo_verifier is not None:
+        # HEADs of the batch run concurrently, like the lookups
+        update["demo_status"], update["demo_size"] = await demo_verifier.averify(
+            item.match_id, item.outcome_id, item.token, demo_url
+        )
+    return item.model_copy(update=update)
+
+
+async def _lookup_batch_item(
+    item: _BatchItem, lookup: _BatchLookup[_BatchItem], slots: asyncio.Semaphore
+) -> _BatchItem:
+    """
+    The looked up item, or the item with the status of the error when the lookup failed:
+    the response is already streaming, an exception would cut it short for every remaining item.
+    """
+    try:
+        return await lookup(item, slots)
+    except SteamGCTimeoutException as exc:
+        return item.model_copy(update={"status": DemoLookupStatus.TIMEOUT, "detail": str(exc)})
+    except SteamGCUnavailableException as exc:
+        return item.model_copy(update={"status": DemoLookupStatus.UNAVAILABLE, "detail": str(exc)})
+    except SteamGCThrottledException as exc:
+        return item.model_copy(update={"status": DemoLookupStatus.THROTTLED, "detail": str(exc)})
+    except SteamAPIException as exc:
+        return item.model_copy(update={"status": DemoLookupStatus.ERROR, "detail": str(exc)})
+    except Exception as exc:
+        logger.exception("cs2[_lookup_batch_item]: Lookup of batch item %s failed", item.model_dump_json())
+        return item.model_copy(update={"status": DemoLookupStatus.ERROR, "detail": str(exc)})
+
+
+async def _stream_batch(items: list[_BatchItem], lookup: _BatchLookup[_BatchItem]) -> AsyncIterator[str]:
+    """
+    NDJSON lines of the batch items: the ones rejected upfront right away, the others as their lookups complete.
+    """
+    # the whole batch at once would be throttled by the GC rate limit: its lookups take turns instead
+    slots = asyncio.Semaphore(CS2_BATCH_CONCURRENCY)
+    lookups = []
+    for item in items:
+        if item.status != DemoLookupStatus.OK:
+            yield item.model_dump_json() + "\n"
+        else:
+            lookups.append(asyncio.ensure_future(_lookup_batch_item(item, lookup, slots)))
+
+    try:
+        # completion order, not submission order: the client can start on the first demos right away
+        for lookup_done in asyncio.as_completed(lookups):
+            yield (await lookup_done).model_dump_json() + "\n"
+    finally:
+        for pending in lookups:
+            pending.cancel()
+
+
+async def get_demo_urls_batch_controller(
+    request: Request,
+    payload: CS2DemoBatchRequest,
+    timeout_ms: int | None = None,
+) -> StreamingResponse:
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    # one deadline and lane for the whole batch
+    deadline = request_deadline(request, timeout_ms)
+    priority = request_priority(request)
+
+    items = []
+    for match_code, ref in zip(payload.match_codes, decode_match_codes(payload.match_codes)):
+        if not isinstance(ref, MatchRef):
+            items.append(CS2DemoBatchItem(match_code=match_code, status=DemoLookupStatus.INVALID_CODE, detail=str(ref)))
+            continue
+
+        items.append(
+            CS2DemoBatchItem(
+                match_code=match_code,
+                status=DemoLookupStatus.OK,
+                match_id=ref.match_id,
+                outcome_id=ref.outcome_id,
+                token=ref.token,
+            )
+        )
+
+    demo_verifier: Optional[DemoUrlVerifier] = request.app.state.demo_verifier if payload.verify else None
+    lookup = functools.partial(_lookup_demo_url_item, steam_pool, demo_verifier, deadline=deadline, priority=priority)
+    return StreamingResponse(_stream_batch(items, lookup), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _player_match_demos(demos: list[MatchDemo]) -> list[CS2PlayerMatchDemo]:
+    return [
+        CS2PlayerMatchDemo(
+            match_code=encode_match_code(demo.match_id, demo.outcome_id, demo.token),
+            match_id=demo.match_id,
+            outcome_id=demo.outcome_id,
+            token=demo.token,
+            match_time=demo.match_time,
+            demo_url=demo.demo_url,
+        )
+        for demo in demos
+    ]
+
+
+async def get_player_demos_controller(
+    request: Request,
+    steamid: str,
+    timeout_ms: int | None = None,
+) -> CS2PlayerDemosResponse:
+
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    deadline = request_deadline(request, timeout_ms)
+    priority = request_priority(request)
+    account_id = steamid_to_account_id(steamid)
+
+    demos = await steam_pool.aget_recent_demos(account_id, deadline=deadline, priority=priority)
+
+    return CS2PlayerDemosResponse(steamid=steamid, account_id=account_id, matches=_player_match_demos(demos))
+
+
+async def _lookup_player_demos_item(
+    steam_pool: SteamAPIPool,
+    item: CS2PlayerDemosBatchItem,
+    slots: asyncio.Semaphore,
+    deadline: Optional[float],
+    priority: LookupPriority,
+) -> CS2PlayerDemosBatchItem:
+    async with slots:
+        demos = await steam_pool.aget_recent_demos(item.account_id, deadline=deadline, priority=priority)
+    return item.model_copy(update={"status": DemoLookupStatus.OK, "matches": _player_match_demos(demos)})
+
+
+async def get_players_demos_batch_controller(
+    request: Request,
+    payload: CS2PlayerDemosBatchRequest,
+    timeout_ms: int | None = None,
+) -> StreamingResponse:
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    deadline = request_deadline(request, timeout_ms)
+    priority = request_priority(request)
+
+    items = []
+    for steamid in payload.steamids:
+        try:
+            account_id = steamid_to_account_id(steamid)
+        except ValueError as exc:
+            items.append(
+                CS2PlayerDemosBatchItem(steamid=steamid, status=DemoLookupStatus.INVALID_STEAMID, detail=str(exc))
+            )
+            continue
+
+        items.append(CS2PlayerDemosBatchItem(steamid=steamid, status=DemoLookupStatus.OK, account_id=account_id))
+
+    lookup = functools.partial(_lookup_player_demos_item, steam_pool, deadline=deadline, priority=priority)
+    return StreamingResponse(_stream_batch(items, lookup), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from api_models.debug import BlockedLoopEvent, BlockedLoopsResponse, SlowRequest, SlowRequestsResponse, TraceSpan
+from components.tracing.blocking import BlockingMonitor
+from components.tracing.trace import SlowRequestLog
+
+
+async def slow_requests_controller(request: Request) -> SlowRequestsResponse:
+    slow_requests: Optional[SlowRequestLog] = request.app.state.slow_requests
+    if slow_requests is None:
+        raise HTTPException(status_code=404, detail="Tracing is disabled")
+
+    return SlowRequestsResponse(
+        threshold_ms=slow_requests.threshold_sec * 1000,
+        requests=[
+            SlowRequest(
+                method=trace.method,
+                path=trace.path,
+                status=trace.status,
+                started_at=trace.started_at,
+                duration_ms=trace.duration * 1000,
+                spans=[
+                    TraceSpan(name=name, start_ms=start * 1000, duration_ms=duration * 1000)
+                    for name, start, duration in trace.spans
+                ],
+            )
+            for trace in slow_requests.slowest()
+        ],
+    )
+
+
+async def blocked_loops_controller(request: Request) -> BlockedLoopsResponse:
+    blocking_monitor: Optional[BlockingMonitor] = request.app.state.blocking_monitor
+    if blocking_monitor is None:
+        return BlockedLoopsResponse(enabled=False, events=[])
+
+    return BlockedLoopsResponse(
+        enabled=True,
+        events=[
+            BlockedLoopEvent(
+                loop=event.loop,
+                started_at=event.started_at,
+                blocked_ms=event.blocked_sec * 1000,
+                stack=event.stack,
+            )
+            for event in blocking_monitor.recent()
+        ],
+    )
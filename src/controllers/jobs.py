@@ -0,0 +1,77 @@
+import dataclasses
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from api_models.jobs import CS2JobCreateRequest, CS2JobItem, CS2JobResponse
+from components.jobs.constants import JobItemState
+from components.jobs.runner import JobRunner
+from components.jobs.store import Job, JobItem, JobStore
+from components.steam.constants import DemoLookupStatus
+from components.steam.match_code import MatchRef, decode_match_codes
+
+
+def _job_response(job: Job) -> CS2JobResponse:
+    return CS2JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        callback_url=job.callback_url,
+        callback_status=job.callback_status,
+        total=job.total,
+        remaining=job.remaining,
+        items=[
+            CS2JobItem.model_validate(
+                {key: value for key, value in dataclasses.asdict(item).items() if key not in ("job_id", "position")}
+            )
+            for item in job.items
+        ],
+    )
+
+
+async def create_job_controller(request: Request, payload: CS2JobCreateRequest) -> CS2JobResponse:
+    job_store: JobStore = request.app.state.job_store
+    job_runner: JobRunner = request.app.state.job_runner
+
+    items = []
+    for match_code, ref in zip(payload.match_codes, decode_match_codes(payload.match_codes)):
+        if not isinstance(ref, MatchRef):
+            items.append(
+                JobItem(
+                    job_id="",
+                    position=len(items),
+                    match_code=match_code,
+                    state=JobItemState.FINISHED,
+                    status=DemoLookupStatus.INVALID_CODE,
+                    detail=str(ref),
+                )
+            )
+            continue
+
+        items.append(
+            JobItem(
+                job_id="",
+                position=len(items),
+                match_code=match_code,
+                match_id=ref.match_id,
+                outcome_id=ref.outcome_id,
+                token=ref.token,
+            )
+        )
+
+    job_id = await job_store.acreate_job(items, callback_url=payload.callback_url)
+    job = await job_store.aget_job(job_id, with_items=False)
+    job_runner.notify(job)
+
+    return _job_response(job)
+
+
+async def get_job_controller(request: Request, job_id: str) -> CS2JobResponse:
+    job_store: JobStore = request.app.state.job_store
+
+    job = await job_store.aget_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_response(job)
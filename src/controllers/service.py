@@ -1,7 +1,29 @@
 from starlette.requests import Request
 from starlette.responses import Response, PlainTextResponse
 
+from api_models.service import ReadinessResponse
+from components.metrics.prometheus import CONTENT_TYPE, REGISTRY
+from components.steam.pool import SteamAPIPool
+
 
 def ping_controller(request: Request) -> PlainTextResponse:
 
-    return PlainTextResponse("pong")
\ No newline at end of file
+    return PlainTextResponse("pong")
+
+
+def ready_controller(request: Request, response: Response) -> ReadinessResponse:
+    # 200 once some account's GC has a session, so deploys can hold traffic until then
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    ready = steam_pool.ready
+    if not ready:
+        response.status_code = 503
+
+    return ReadinessResponse(
+        ready=ready,
+        accounts={name: steam_api.gc_status.name for name, steam_api in steam_pool.accounts.items()},
+    )
+
+
+def metrics_controller(request: Request) -> Response:
+
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,13 +1,14 @@
 from starlette.requests import Request
 from starlette.responses import Response
 
-from api_models.steam import SteamLoginRequest, SteamLoginResponse, SteamLoginInfo
-from components.steam.steam import SteamAPI
+from api_models.steam import SteamAccountInfo, SteamLoginRequest, SteamLoginResponse, SteamLoginInfo, SteamStatsResponse
+from components.steam.pool import SteamAPIPool
 
 
 async def steam_login_controller(request: Request, payload: SteamLoginRequest) -> SteamLoginResponse:
-    steam_api: SteamAPI = request.app.state.steam_api
-    success, status = steam_api.login(
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    success, status = await steam_pool.alogin(
+        account=payload.account,
         username=payload.username,
         password=payload.password,
         email_code=payload.email_code,
@@ -17,19 +18,40 @@ async def steam_login_controller(request: Request, payload: SteamLoginRequest) -
     return SteamLoginResponse(success=success, status=status)
 
 
-async def steam_logout_controller(request: Request) -> Response:
-    steam_api: SteamAPI = request.app.state.steam_api
-    steam_api.logout()
+async def steam_logout_controller(request: Request, account: str | None = None) -> Response:
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    await steam_pool.alogout(account)
 
     return Response(status_code=204)
 
 async def steam_login_info_controller(request: Request) -> SteamLoginInfo:
-    steam_api: SteamAPI = request.app.state.steam_api
-
-    current_username = steam_api.login_user
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+
+    accounts = [
+        SteamAccountInfo(
+            account=steam_api.name,
+            username=steam_api.login_user,
+            gc_status=steam_api.gc_status.name,
+            gc_state=steam_api.gc_state,
+            gc_retry_after=steam_api.gc_retry_after,
+            in_flight=steam_api.in_flight,
+        )
+        for steam_api in steam_pool.accounts.values()
+    ]
 
     return SteamLoginInfo(
-        username=current_username,
+        username=steam_pool.get().login_user,
+        accounts=accounts,
     )
 
 
+async def steam_stats_controller(request: Request) -> SteamStatsResponse:
+    steam_pool: SteamAPIPool = request.app.state.steam_pool
+    stats = steam_pool.stats()
+
+    return SteamStatsResponse(
+        lookups=stats.lookups,
+        coalesced_lookups=stats.coalesced_lookups,
+        gc_requests=stats.gc_requests,
+        in_flight=steam_pool.in_flight,
+    )
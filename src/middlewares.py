@@ -1,50 +1,155 @@
+import hashlib
+import hmac
 import logging
+import math
+from typing import Iterable, Optional
 
-from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from components.admission.clients import ApiClient, ApiClientLimiter, build_limiters
+from components.metrics.definitions import REQUESTS_REJECTED
+from components.tracing.trace import SERVER_TIMING_HEADER, SlowRequestLog, end_trace, start_trace
 
 logger = logging.getLogger(__name__)
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: FastAPI, api_key: str, api_key_required: bool = True):
-        super().__init__(app)
-        self.api_key = api_key
-        self.api_key_required = api_key_required
+API_KEY_HEADER = b"x-api-key"
+
+# reachable without an API key
+EXEMPT_PATHS = frozenset({"/docs", "/openapi.json", "/redoc", "/metrics", "/api/ready"})
 
-    async def dispatch(self, request: Request, call_next):
-        if not self.api_key_required:
-            return await call_next(request)
 
-        if request.url.path in ("/docs", "/openapi.json", "/redoc"):
-            return await call_next(request)
+def hash_api_key(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
 
-        client_key = request.headers.get("X-API-Key")
 
-        if not client_key or client_key != self.api_key:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Unauthorized"},
-            )
+class RequestPipelineMiddleware:
+    """
+    API key check, per-client admission, exception -> status mapping and request tracing in one pure ASGI layer.
+
+    Unlike BaseHTTPMiddleware it adds no task or memory stream per request, and streaming / file responses
+    pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        api_clients: list[ApiClient],
+        api_key_required: bool = True,
+        exception_status_codes: Optional[dict[type[Exception], int]] = None,
+        exempt_paths: Iterable[str] = EXEMPT_PATHS,
+        slow_requests: Optional[SlowRequestLog] = None,
+    ):
+        self.app = app
+        self.api_key_required = api_key_required
+        self.exempt_paths = frozenset(exempt_paths)
+        # tracing is on when there is a log to keep slow requests in
+        self.slow_requests = slow_requests
+        # (key digest, limiter); a presented key is compared against all of them, see _authenticate
+        self.limiters = [(hash_api_key(key), limiter) for key, limiter in build_limiters(api_clients).items()]
 
-        response = await call_next(request)
-        return response
+        self.exception_status_codes = dict(exception_status_codes or {})
+        # exception class -> status of its most specific mapped base, filled on first use
+        self._status_by_class: dict[type, Optional[int]] = {}
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class ExceptionMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: FastAPI, exc_class: type[Exception], status_code: int = 500):
-        super().__init__(app)
-        self.exc_class = exc_class
-        self.status_code = status_code
+        if self.slow_requests is None:
+            await self._handle(scope, receive, send)
+            return
+
+        trace, token = start_trace(scope["method"], scope["path"])
+
+        async def send_traced(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (SERVER_TIMING_HEADER, trace.server_timing())]
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            return await call_next(request)
+            await self._handle(scope, receive, send_traced)
+        finally:
+            end_trace(token)
+            trace.finish(trace.status or 500)
+            self.slow_requests.record(trace)
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = None
+        if self.api_key_required and scope["path"] not in self.exempt_paths:
+            limiter = self._authenticate(scope)
+            if limiter is None:
+                await JSONResponse(status_code=401, content={"detail": "Unauthorized"})(scope, receive, send)
+                return
+
+            admitted, reason, retry_after = limiter.try_acquire()
+            if not admitted:
+                REQUESTS_REJECTED.labels(limiter.client.name, reason).inc()
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": f"Too many requests ({reason})"},
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                await response(scope, receive, send)
+                return
+
+            scope.setdefault("state", {})["api_client"] = limiter.client
 
-        except self.exc_class as exc:
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            # returns once the whole body is sent, streaming responses included
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            status_code = self._status_code(type(exc))
+            if status_code is None or response_started:
+                raise
             logger.exception(exc)
-            return JSONResponse(
-                status_code=self.status_code,
-                content={"detail": str(exc)},
-            )
+            await self._error_response(exc, status_code)(scope, receive, send)
+        finally:
+            if limiter is not None:
+                limiter.release()
+
+    def _authenticate(self, scope: Scope) -> Optional[ApiClientLimiter]:
+        presented = next((value for name, value in scope["headers"] if name == API_KEY_HEADER), None)
+        if presented is None:
+            return None
+
+        # fixed-length digests, constant-time compares and no early exit:
+        # the time taken says nothing about which key, or how much of it, was guessed right
+        digest = hash_api_key(presented.decode("latin-1"))
+        matched = None
+        for key_digest, limiter in self.limiters:
+            if hmac.compare_digest(digest, key_digest):
+                matched = limiter
+        return matched
+
+    def _status_code(self, exc_class: type) -> Optional[int]:
+        try:
+            return self._status_by_class[exc_class]
+        except KeyError:
+            pass
+
+        status_code = next(
+            (self.exception_status_codes[base] for base in exc_class.__mro__ if base in self.exception_status_codes),
+            None,
+        )
+        self._status_by_class[exc_class] = status_code
+        return status_code
+
+    @staticmethod
+    def _error_response(exc: Exception, status_code: int) -> JSONResponse:
+        headers = None
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+        return JSONResponse(status_code=status_code, content={"detail": str(exc)}, headers=headers)
@@ -1,16 +1,51 @@
 from fastapi import FastAPI
 
-from controllers.cs2 import get_demo_url_controller
-from controllers.service import ping_controller
-from controllers.steam import steam_login_controller, steam_logout_controller, steam_login_info_controller
+from controllers.cs2 import (
+    get_demo_file_controller,
+    get_demo_url_controller,
+    get_demo_urls_batch_controller,
+    get_match_info_controller,
+    get_player_demos_controller,
+    get_players_demos_batch_controller,
+)
+from controllers.debug import blocked_loops_controller, slow_requests_controller
+from controllers.jobs import create_job_controller, get_job_controller
+from controllers.service import metrics_controller, ping_controller, ready_controller
+from controllers.steam import (
+    steam_login_controller,
+    steam_logout_controller,
+    steam_login_info_controller,
+    steam_stats_controller,
+)
 
 
 def prepare_routes(app: FastAPI) -> None:
 
     app.add_api_route("/api/ping/", ping_controller, methods=["GET"], tags=["Service"])
+    app.add_api_route("/api/ready", ready_controller, methods=["GET"], tags=["Service"])
+    app.add_api_route("/metrics", metrics_controller, methods=["GET"], tags=["Service"], include_in_schema=False)
+
+    app.add_api_route("/api/debug/slow_requests/", slow_requests_controller, methods=["GET"], tags=["Debug"])
+    app.add_api_route("/api/debug/blocked_loops/", blocked_loops_controller, methods=["GET"], tags=["Debug"])
 
     app.add_api_route("/api/steam/login/", steam_login_controller, methods=["POST"], tags=["Steam"])
     app.add_api_route("/api/steam/logout/", steam_logout_controller, methods=["POST"], tags=["Steam"])
     app.add_api_route("/api/steam/login_info/", steam_login_info_controller, methods=["GET"], tags=["Steam"])
+    app.add_api_route("/api/steam/stats/", steam_stats_controller, methods=["GET"], tags=["Steam"])
+
+    app.add_api_route("/api/cs2/demo/", get_demo_url_controller, methods=["GET"], tags=["CS2"])
+    app.add_api_route("/api/cs2/demo/{match_id}/file", get_demo_file_controller, methods=["GET"], tags=["CS2"])
+    app.add_api_route(
+        "/api/cs2/match/",
+        get_match_info_controller,
+        methods=["GET"],
+        tags=["CS2"],
+        # fields left out with ?fields= are left out of the response
+        response_model_exclude_unset=True,
+    )
+    app.add_api_route("/api/cs2/demos/", get_demo_urls_batch_controller, methods=["POST"], tags=["CS2"])
+    app.add_api_route("/api/cs2/players/demos/", get_players_demos_batch_controller, methods=["POST"], tags=["CS2"])
+    app.add_api_route("/api/cs2/players/{steamid}/demos", get_player_demos_controller, methods=["GET"], tags=["CS2"])
 
-    app.add_api_route("/api/cs2/demo/", get_demo_url_controller, methods=["GET"], tags=["CS2"])
\ No newline at end of file
+    app.add_api_route("/api/cs2/jobs/", create_job_controller, methods=["POST"], tags=["CS2"])
+    app.add_api_route("/api/cs2/jobs/{job_id}", get_job_controller, methods=["GET"], tags=["CS2"])
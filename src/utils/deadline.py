@@ -0,0 +1,26 @@
+import time
+from typing import Optional
+
+from starlette.requests import Request
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+
+def request_deadline(request: Request, timeout_ms: Optional[int] = None) -> Optional[float]:
+    """
+    time.monotonic() deadline of a request from ?timeout_ms= or the X-Request-Timeout-Ms header,
+    None when the caller did not set one. The query parameter wins.
+    """
+    if timeout_ms is None:
+        header = request.headers.get(DEADLINE_HEADER)
+        if header is None:
+            return None
+        try:
+            timeout_ms = int(header)
+        except ValueError:
+            raise ValueError(f"{DEADLINE_HEADER} must be an integer number of milliseconds") from None
+
+    if timeout_ms <= 0:
+        raise ValueError("timeout_ms must be positive")
+
+    return time.monotonic() + timeout_ms / 1000
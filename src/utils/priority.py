@@ -0,0 +1,29 @@
+from starlette.requests import Request
+
+from components.steam.constants import LookupPriority
+
+PRIORITY_HEADER = "X-Priority"
+
+# most urgent first
+_LANES = list(LookupPriority)
+
+
+def request_priority(request: Request) -> LookupPriority:
+    """
+    GC lane of a request: the priority of the caller's API client, else interactive.
+    The X-Priority header can move a request to a less urgent lane, never to a more urgent one.
+    """
+    api_client = getattr(request.state, "api_client", None)
+    priority = api_client.priority if api_client is not None else LookupPriority.INTERACTIVE
+
+    header = request.headers.get(PRIORITY_HEADER)
+    if header is None:
+        return priority
+
+    try:
+        requested = LookupPriority(header.strip().lower())
+    except ValueError:
+        raise ValueError(
+            f"{PRIORITY_HEADER} must be one of: {', '.join(lane.value for lane in LookupPriority)}"
+        ) from None
+    return max(priority, requested, key=_LANES.index)
@@ -0,0 +1,27 @@
+import os
+import sqlite3
+
+_INT64_MAX = 2 ** 63 - 1
+_UINT64 = 2 ** 64
+
+
+def to_sqlite_int(value: int) -> int:
+    # match/outcome ids are uint64, SQLite INTEGER is int64
+    return value - _UINT64 if value > _INT64_MAX else value
+
+
+def from_sqlite_int(value: int | None) -> int | None:
+    if value is None:
+        return None
+    return value + _UINT64 if value < 0 else value
+
+
+def connect_wal(path: str, timeout: float = 5.0) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import functools
+import http.server
+import os
+import tempfile
+import threading
+
+import pytest
+
+# conf reads the environment on import: the app under test runs against the fake Steam client in a state dir of its own
+API_KEY = "test-key"
+os.environ.update(
+    STATE_DIR=tempfile.mkdtemp(prefix="pvb-steamapi-tests-"),
+    API_SECRET_KEY=API_KEY,
+    STEAM_FAKE="true",
+    STEAM_FAKE_LAUNCH_LATENCY_SEC="0.1",
+    STEAM_ACCOUNTS="a",
+    STEAM_ACCOUNT_A_USERNAME="a",
+    STEAM_ACCOUNT_A_PASSWORD="p",
+    WEB_CONCURRENCY="1",
+    LOGGING_LEVEL="CRITICAL",
+)
+
+
+class _DemoRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        super().do_GET()
+
+    def do_HEAD(self):
+        self.server.heads.append(self.path)
+        super().do_HEAD()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def replay_server(tmp_path):
+    """
+    A replay server stand-in serving the files of its `directory`, recording GET requests in `hits`
+    and HEAD requests in `heads`.
+    """
+    directory = tmp_path / "replay"
+    directory.mkdir()
+    httpd = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(_DemoRequestHandler, directory=str(directory))
+    )
+    httpd.hits = []
+    httpd.heads = []
+    httpd.directory = directory
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def running_app():
+    """
+    Starts the app and yields it with an httpx client sending the API key, once an account has a GC session.
+
+        async with running_app() as (app, client):
+            ...
+    """
+    import httpx
+
+    import app as app_module
+
+    @contextlib.asynccontextmanager
+    async def run():
+        fastapi_app = app_module.prepare_app()
+        async with fastapi_app.router.lifespan_context(fastapi_app):
+            async with asyncio.timeout(10):
+                while not fastapi_app.state.steam_pool.ready:
+                    await asyncio.sleep(0.02)
+
+            transport = httpx.ASGITransport(fastapi_app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test", headers={"X-API-Key": API_KEY}
+            ) as client:
+                yield fastapi_app, client
+
+    return run
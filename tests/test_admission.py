@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import components.admission.limits as limits_module
+from components.admission.clients import ApiClient, ApiClientLimiter, build_limiters
+from components.admission.limits import TokenBucket
+from components.steam.match_code import encode_match_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(limits_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate_per_sec=10, burst=3)
+    assert [bucket.reserve(max_wait_sec=0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve(max_wait_sec=0) is None
+
+    # reservations queue up behind each other
+    assert bucket.reserve(max_wait_sec=1) == pytest.approx(0.1)
+    assert bucket.reserve(max_wait_sec=1) == pytest.approx(0.2)
+    assert bucket.wait_sec() == pytest.approx(0.3)
+
+    clock[0] += 0.31
+    assert bucket.reserve(max_wait_sec=0) == 0
+    # idle time refills up to the burst only
+    clock[0] += 60
+    assert [bucket.reserve(max_wait_sec=0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve(max_wait_sec=0) is None
+
+
+def test_api_client_concurrency_and_quota(clock):
+    limiter = ApiClientLimiter(ApiClient(name="c", key="k", rate_per_sec=1, burst=2, max_concurrent=1))
+    assert limiter.try_acquire() == (True, "", 0.0)
+    assert limiter.try_acquire()[:2] == (False, "concurrency")
+    limiter.release()
+
+    assert limiter.try_acquire()[0]
+    limiter.release()
+    admitted, reason, retry_after = limiter.try_acquire()
+    assert (admitted, reason) == (False, "quota")
+    assert retry_after == pytest.approx(1.0)
+
+
+def test_api_clients_must_not_share_keys():
+    with pytest.raises(ValueError):
+        build_limiters([ApiClient(name="a", key="k"), ApiClient(name="b", key="k")])
+
+
+def test_unknown_and_missing_api_keys_are_rejected(running_app):
+    async def main():
+        async with running_app() as (_, client):
+            assert (await client.get("/api/ping/")).status_code == 200
+            assert (await client.get("/api/ping/", headers={"X-API-Key": "wrong"})).status_code == 401
+            del client.headers["X-API-Key"]
+            assert (await client.get("/api/ping/")).status_code == 401
+
+    asyncio.run(main())
+
+
+def test_bulk_lookups_are_paced_not_rejected(running_app):
+    # more than STEAM_GC_BULK_MAX_QUEUED: the rest wait for a slot instead of failing
+    codes = [encode_match_code(3_600_000_000_000_013_000 + n, 3_600_000_000_000_013_500, n) for n in range(40)]
+
+    async def main():
+        async with running_app() as (_, client):
+            responses = await asyncio.gather(
+                *(
+                    client.get("/api/cs2/demo/", params={"match_code": code}, headers={"X-Priority": "bulk"})
+                    for code in codes
+                )
+            )
+            assert {response.status_code for response in responses} == {200}
+
+    asyncio.run(main())
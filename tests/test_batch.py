@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from components.steam.match_code import encode_match_code
+
+
+def test_demo_url_batch_streams_ndjson(running_app):
+    codes = [encode_match_code(3_600_000_000_000_006_000 + n, 3_600_000_000_000_006_500, n) for n in range(10)]
+
+    async def main():
+        async with running_app() as (app, client):
+            response = await client.post("/api/cs2/demos/", json={"match_codes": [*codes, "bogus", codes[0]]})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+
+            items = [json.loads(line) for line in response.text.splitlines()]
+            # invalid codes come first, the lookups in completion order
+            assert (items[0]["match_code"], items[0]["status"]) == ("bogus", "invalid_code")
+            assert sorted(item["match_code"] for item in items[1:]) == sorted([*codes, codes[0]])
+            assert {item["status"] for item in items[1:]} == {"ok"}
+            assert all(item["demo_url"] for item in items[1:])
+            # the duplicate code was coalesced
+            assert app.state.steam_pool.stats().gc_requests == 10
+
+    asyncio.run(main())
+
+
+def test_demo_url_batch_of_invalid_codes_only(running_app):
+    async def main():
+        async with running_app() as (_, client):
+            response = await client.post("/api/cs2/demos/", json={"match_codes": ["bogus", "CSGO-"]})
+            assert [json.loads(line)["status"] for line in response.text.splitlines()] == ["invalid_code"] * 2
+
+    asyncio.run(main())
+
+
+def test_demo_url_batch_item_errors_do_not_cut_the_stream(running_app):
+    codes = [encode_match_code(3_600_000_000_000_006_100 + n, 3_600_000_000_000_006_600, n) for n in range(4)]
+
+    async def main():
+        async with running_app() as (app, client):
+            pool = app.state.steam_pool
+            aget_demo_url = pool.aget_demo_url
+
+            async def failing(match_id, *args, **kwargs):
+                if match_id % 2:
+                    raise RuntimeError("boom")
+                return await aget_demo_url(match_id, *args, **kwargs)
+
+            pool.aget_demo_url = failing
+            response = await client.post("/api/cs2/demos/", json={"match_codes": codes})
+            statuses = sorted(json.loads(line)["status"] for line in response.text.splitlines())
+            assert statuses == ["error", "error", "ok", "ok"]
+
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+import pytest
+
+from components.steam.breaker import GCCircuitBreaker
+from components.steam.constants import GCState
+
+
+@pytest.fixture
+def breaker():
+    return GCCircuitBreaker(launch_timeout_sec=20, backoff_base_sec=5, backoff_max_sec=60, trip_after_timeouts=3)
+
+
+def test_starts_offline(breaker):
+    assert breaker.state == GCState.OFFLINE
+    assert not breaker.allows_requests
+    assert breaker.retry_after(now=0) == 20
+    assert breaker.seconds_to_deadline(now=0) is None
+
+
+def test_launch_then_ready(breaker):
+    breaker.on_launch(now=100)
+    assert breaker.state == GCState.LAUNCHING
+    # callers wait for the session instead of failing
+    assert breaker.allows_requests
+    assert breaker.seconds_to_deadline(now=105) == 15
+    assert breaker.retry_after(now=105) == 15
+
+    breaker.on_ready()
+    assert breaker.state == GCState.READY
+    assert breaker.allows_requests
+    assert breaker.retry_after(now=105) == 0
+    assert breaker.seconds_to_deadline(now=105) is None
+
+
+def test_launch_failures_back_off_exponentially(breaker):
+    delays = []
+    for _ in range(6):
+        breaker.on_launch(now=0)
+        delays.append(breaker.on_failure(now=0))
+        assert breaker.state == GCState.BACKOFF
+        assert not breaker.allows_requests
+
+    for delay, full in zip(delays, [5, 10, 20, 40, 60, 60]):
+        # with up to 20% jitter
+        assert 0.8 * full <= delay <= full
+    assert breaker.retry_after(now=0) == pytest.approx(delays[-1])
+
+    breaker.on_launch(now=0)
+    breaker.on_ready()
+    assert breaker.failures == 0
+
+
+def test_consecutive_timeouts_trip(breaker):
+    breaker.on_launch(now=0)
+    breaker.on_ready()
+
+    assert not breaker.on_timeout()
+    assert not breaker.on_timeout()
+    # a reply in between starts the count over
+    breaker.on_reply()
+    assert not breaker.on_timeout()
+    assert not breaker.on_timeout()
+    assert breaker.on_timeout()
+
+
+def test_timeouts_only_count_when_ready(breaker):
+    breaker.on_launch(now=0)
+    for _ in range(5):
+        assert not breaker.on_timeout()
+
+
+def test_session_lost_relaunches_only_from_ready(breaker):
+    breaker.on_launch(now=0)
+    breaker.on_ready()
+    breaker.on_session_lost(now=50)
+    assert breaker.state == GCState.LAUNCHING
+    assert breaker.seconds_to_deadline(now=50) == 20
+
+    breaker.on_failure(now=60)
+    breaker.on_session_lost(now=61)
+    assert breaker.state == GCState.BACKOFF
+
+
+def test_reconnect_keeps_pending_backoff(breaker):
+    breaker.on_launch(now=0)
+    breaker.on_failure(now=0)
+    breaker.on_reconnect(now=1)
+    assert breaker.state == GCState.BACKOFF
+
+    breaker.on_launch(now=10)
+    breaker.on_ready()
+    breaker.on_reconnect(now=20)
+    assert breaker.state == GCState.LAUNCHING
+    assert breaker.seconds_to_deadline(now=20) == 20
+
+
+def test_offline(breaker):
+    breaker.on_launch(now=0)
+    breaker.on_ready()
+    breaker.on_offline()
+    assert breaker.state == GCState.OFFLINE
+    assert not breaker.allows_requests
@@ -0,0 +1,50 @@
+from steam.core.cm import CMServerList
+
+from components.steam.cm import RankedCMServerList
+
+SERVERS = [("10.0.0.1", 27017), ("10.0.0.2", 27017), ("10.0.0.3", 27017), ("10.0.0.4", 27017)]
+
+
+def make_server_list():
+    server_list = RankedCMServerList()
+    server_list.merge_list(SERVERS)
+    return server_list
+
+
+def test_fastest_first_then_unmeasured():
+    server_list = make_server_list()
+    server_list.observe(SERVERS[2], 0.05)
+    server_list.observe(SERVERS[1], 0.02)
+    ranked = server_list.ranked()
+    assert ranked[:2] == [SERVERS[1], SERVERS[2]]
+    assert sorted(ranked[2:]) == [SERVERS[0], SERVERS[3]]
+    assert server_list.best_latency() == 0.02
+
+
+def test_latency_is_smoothed():
+    server_list = make_server_list()
+    server_list.observe(SERVERS[0], 0.01)
+    server_list.observe(SERVERS[0], 0.2)
+    server_list.observe(SERVERS[1], 0.15)
+    # one slow connect does not drop the best server behind a consistently slower one
+    assert 0.01 < server_list.latency[SERVERS[0]] < 0.2
+    assert server_list.ranked()[0] == SERVERS[0]
+
+
+def test_passed_over_servers_are_marked_bad():
+    server_list = make_server_list()
+    for server_addr, latency_sec in zip(SERVERS, (0.01, 0.02, 0.03, 0.04)):
+        server_list.observe(server_addr, latency_sec)
+
+    servers = iter(server_list)
+    assert next(servers) == SERVERS[0]
+    assert next(servers) == SERVERS[1]
+    assert server_list.list[SERVERS[0]]["quality"] == CMServerList.Bad
+    assert server_list.ranked() == SERVERS[1:]
+
+
+def test_starts_over_when_all_are_bad():
+    server_list = make_server_list()
+    for server_addr in SERVERS:
+        server_list.mark_bad(server_addr)
+    assert sorted(server_list.ranked()) == SERVERS
@@ -0,0 +1,26 @@
+import asyncio
+
+from components.steam.match_code import encode_match_code
+
+
+def test_concurrent_lookups_of_a_match_share_one_gc_request(running_app):
+    code = encode_match_code(3_600_000_000_000_004_001, 3_600_000_000_000_004_002, 1)
+
+    async def main():
+        async with running_app() as (app, client):
+            responses = await asyncio.gather(
+                *(client.get("/api/cs2/demo/", params={"match_code": code}) for _ in range(20))
+            )
+            assert {response.status_code for response in responses} == {200}
+            assert len({response.json()["demo_url"] for response in responses}) == 1
+
+            stats = app.state.steam_pool.stats()
+            assert stats.gc_requests == 1
+            assert stats.coalesced_lookups == 19
+
+            # answered from the cache from now on
+            response = await client.get("/api/cs2/demo/", params={"match_code": code})
+            assert response.headers["Cache-Status"] == "pvb-steamapi; hit"
+            assert app.state.steam_pool.stats().gc_requests == 1
+
+    asyncio.run(main())
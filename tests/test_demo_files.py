@@ -0,0 +1,153 @@
+import asyncio
+import bz2
+import os
+
+import pytest
+
+from components.cache.constants import DemoCacheStatus
+from components.cache.demo_files import (
+    DemoDownloadException,
+    DemoFileCache,
+    DemoFileNotFoundException,
+    demo_file_name,
+    iter_bz2_decompressed,
+)
+
+
+def _publish(replay_server, name: str, data: bytes) -> str:
+    (replay_server.directory / name).write_bytes(data)
+    return f"{replay_server.url}/{name}"
+
+
+def test_demo_file_name():
+    assert demo_file_name("http://replay1.valve.net/730/003_004.dem.bz2") == "003_004.dem.bz2"
+    with pytest.raises(DemoDownloadException):
+        demo_file_name("http://replay1.valve.net/730/../etc/passwd")
+
+
+def test_download_then_hit(tmp_path, replay_server):
+    url = _publish(replay_server, "1_2.dem.bz2", b"demo" * 100)
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=10_000)
+
+    async def main():
+        filepath, status = await cache.aget(url)
+        assert status == DemoCacheStatus.MISS
+        assert open(filepath, "rb").read() == b"demo" * 100
+        cache.release(filepath)
+
+        filepath, status = await cache.aget(url)
+        assert status == DemoCacheStatus.HIT
+        cache.release(filepath)
+
+    asyncio.run(main())
+    cache.close()
+    assert replay_server.hits == ["/1_2.dem.bz2"]
+
+
+def test_concurrent_requests_share_one_download(tmp_path, replay_server):
+    url = _publish(replay_server, "1_2.dem", b"x" * 1000)
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=10_000)
+
+    async def main():
+        return await asyncio.gather(*(cache.aget(url) for _ in range(5)))
+
+    results = asyncio.run(main())
+    cache.close()
+    assert len({filepath for filepath, _ in results}) == 1
+    assert len(replay_server.hits) == 1
+
+
+def test_index_survives_restart(tmp_path, replay_server):
+    url = _publish(replay_server, "1_2.dem", b"x" * 1000)
+    path = str(tmp_path / "demos")
+
+    cache = DemoFileCache(path, max_bytes=10_000)
+    asyncio.run(cache.aget(url))
+    cache.close()
+
+    cache = DemoFileCache(path, max_bytes=10_000)
+    _, status = asyncio.run(cache.aget(url))
+    cache.close()
+    assert status == DemoCacheStatus.HIT
+    assert len(replay_server.hits) == 1
+
+
+def test_missing_demo_is_not_found(tmp_path, replay_server):
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=10_000)
+
+    with pytest.raises(DemoFileNotFoundException):
+        asyncio.run(cache.aget(f"{replay_server.url}/1_2.dem.bz2"))
+    cache.close()
+    assert os.listdir(tmp_path / "demos") == []
+
+
+def test_demo_larger_than_cache_is_rejected(tmp_path, replay_server):
+    url = _publish(replay_server, "1_2.dem", b"x" * 2000)
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=1000, chunk_size=100)
+
+    with pytest.raises(DemoDownloadException):
+        asyncio.run(cache.aget(url))
+    cache.close()
+    assert os.listdir(tmp_path / "demos") == []
+
+
+def test_eviction_is_least_recently_used(tmp_path, replay_server):
+    urls = [_publish(replay_server, f"{n}_1.dem", b"x" * 1000) for n in range(3)]
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=2500)
+
+    async def fetch(url):
+        filepath, _ = await cache.aget(url)
+        cache.release(filepath)
+        return filepath
+
+    async def main():
+        first = await fetch(urls[0])
+        second = await fetch(urls[1])
+        # touch the first one so the second is the least recently used
+        await fetch(urls[0])
+        third = await fetch(urls[2])
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    cache.close()
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert os.path.exists(third)
+
+
+def test_pinned_file_is_not_evicted_until_released(tmp_path, replay_server):
+    urls = [_publish(replay_server, f"{n}_1.dem", b"x" * 1000) for n in range(2)]
+    cache = DemoFileCache(str(tmp_path / "demos"), max_bytes=1500)
+
+    async def main():
+        served, _ = await cache.aget(urls[0])
+        other, _ = await cache.aget(urls[1])
+        # still being served: over budget rather than removed under the response
+        assert os.path.exists(served)
+
+        cache.release(served)
+        assert not os.path.exists(served)
+        assert os.path.exists(other)
+        cache.release(other)
+
+    asyncio.run(main())
+    cache.close()
+
+
+def test_iter_bz2_decompressed(tmp_path):
+    data = os.urandom(300_000)
+    filepath = tmp_path / "1_2.dem.bz2"
+    # two concatenated streams, like pbzip2 writes
+    filepath.write_bytes(bz2.compress(data[:100_000]) + bz2.compress(data[100_000:]))
+
+    chunks = list(iter_bz2_decompressed(str(filepath), chunk_size=64 * 1024))
+    assert b"".join(chunks) == data
+    assert max(len(chunk) for chunk in chunks) <= 64 * 1024
+
+
+def test_iter_bz2_decompressed_truncated(tmp_path):
+    filepath = tmp_path / "1_2.dem.bz2"
+    filepath.write_bytes(bz2.compress(os.urandom(10_000))[:-100])
+
+    with pytest.raises(DemoDownloadException):
+        list(iter_bz2_decompressed(str(filepath)))
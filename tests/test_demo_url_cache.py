@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+import components.cache.demo_url as demo_url_module
+from components.cache.constants import DemoVerifyStatus
+from components.cache.demo_url import DemoUrlCache
+
+# ids above 2**63 do not fit a signed SQLite integer as they are
+MATCH_ID = 3_600_000_000_000_000_123
+OUTCOME_ID = 9_300_000_000_000_000_500
+TOKEN = 4242
+URL = "http://replay183.valve.net/730/003600000000000000123_0000004242.dem.bz2"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "demo_cache.sqlite3")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Settable time.time() of the cache module.
+    """
+    now = [1_000_000.0]
+    monkeypatch.setattr(demo_url_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_memory_only():
+    cache = DemoUrlCache(path=None, memory_size=2)
+    cache.put(1, 2, 3, "url-1")
+    cache.put(4, 5, 6, "url-4")
+    assert cache.get(1, 2, 3).demo_url == "url-1"
+
+    cache.put(7, 8, 9, "url-7")
+    # (4, 5, 6) was the least recently used
+    assert cache.get(4, 5, 6) is None
+    assert cache.find(1).demo_url == "url-1"
+    assert cache.find(4) is None
+    cache.close()
+
+
+def test_persists_across_instances(db_path):
+    cache = DemoUrlCache(path=db_path)
+    cache.put(MATCH_ID, OUTCOME_ID, TOKEN, URL, match_info=b"info")
+    cache.put_many([(1, 2, 3, "url-1", None), (4, 5, 6, "url-4", b"info-4")])
+    cache.close()
+
+    cache = DemoUrlCache(path=db_path)
+    entry = cache.get(MATCH_ID, OUTCOME_ID, TOKEN)
+    assert (entry.match_id, entry.outcome_id, entry.token, entry.demo_url) == (MATCH_ID, OUTCOME_ID, TOKEN, URL)
+    assert cache.find(MATCH_ID) == entry
+    assert cache.get_match_info(MATCH_ID, OUTCOME_ID, TOKEN) == b"info"
+    assert cache.get_match_info(1, 2, 3) is None
+    assert cache.get_match_info(4, 5, 6) == b"info-4"
+    assert cache.get(1, 2, 4) is None
+    cache.close()
+
+
+def test_match_info_readable_before_it_is_written(db_path):
+    cache = DemoUrlCache(path=db_path)
+    cache.put(MATCH_ID, OUTCOME_ID, TOKEN, URL, match_info=b"info")
+    assert cache.get_match_info(MATCH_ID, OUTCOME_ID, TOKEN) == b"info"
+    assert cache.flush(timeout=5)
+    assert cache.get_match_info(MATCH_ID, OUTCOME_ID, TOKEN) == b"info"
+    cache.close()
+
+
+def test_flush_makes_writes_visible_to_other_connections(db_path):
+    writer = DemoUrlCache(path=db_path)
+    reader = DemoUrlCache(path=db_path)
+    writer.put(MATCH_ID, OUTCOME_ID, TOKEN, URL)
+    assert writer.flush(timeout=5)
+    assert reader.get(MATCH_ID, OUTCOME_ID, TOKEN).demo_url == URL
+    writer.close()
+    reader.close()
+
+
+def test_async_reads(db_path):
+    cache = DemoUrlCache(path=db_path)
+    cache.put(MATCH_ID, OUTCOME_ID, TOKEN, URL, match_info=b"info")
+    cache.close()
+
+    cache = DemoUrlCache(path=db_path)
+
+    async def main():
+        # from the disk, then from memory
+        for _ in range(2):
+            assert (await cache.aget(MATCH_ID, OUTCOME_ID, TOKEN)).demo_url == URL
+        assert (await cache.afind(MATCH_ID)).demo_url == URL
+        assert await cache.aget_match_info(MATCH_ID, OUTCOME_ID, TOKEN) == b"info"
+        assert await cache.aget(1, 2, 3) is None
+
+    asyncio.run(main())
+    cache.close()
+
+
+def test_ttl(db_path, clock):
+    cache = DemoUrlCache(path=db_path, ttl_sec=60)
+    entry = cache.put(1, 2, 3, "url-1")
+    cache.put(4, 5, 6, "url-4")
+    cache.set_verification(entry, DemoVerifyStatus.EXPIRED, None)
+    cache.close()
+
+    clock[0] += 61
+    cache = DemoUrlCache(path=db_path, ttl_sec=60)
+    assert cache.get(4, 5, 6) is None
+    # an expired replay is kept: it never comes back, the GC need not be asked again
+    assert cache.get(1, 2, 3).verify_status == DemoVerifyStatus.EXPIRED
+    cache.close()
+
+
+def test_verification_persists(db_path):
+    cache = DemoUrlCache(path=db_path)
+    entry = cache.put(MATCH_ID, OUTCOME_ID, TOKEN, URL)
+    entry = cache.set_verification(entry, DemoVerifyStatus.VERIFIED, 1234)
+    assert cache.get(MATCH_ID, OUTCOME_ID, TOKEN) == entry
+    cache.close()
+
+    cache = DemoUrlCache(path=db_path)
+    entry = cache.get(MATCH_ID, OUTCOME_ID, TOKEN)
+    assert (entry.verify_status, entry.content_length) == (DemoVerifyStatus.VERIFIED, 1234)
+    cache.close()
+
+
+def test_disk_size_prune(db_path, clock, monkeypatch):
+    monkeypatch.setattr(demo_url_module, "_PRUNE_EVERY", 1)
+    cache = DemoUrlCache(path=db_path, disk_size=2)
+    for match_id in range(1, 4):
+        clock[0] += 1
+        cache.put(match_id, 0, 0, f"url-{match_id}")
+    cache.close()
+
+    cache = DemoUrlCache(path=db_path, disk_size=2)
+    assert cache.get(1, 0, 0) is None
+    assert cache.get(2, 0, 0).demo_url == "url-2"
+    assert cache.get(3, 0, 0).demo_url == "url-3"
+    cache.close()
@@ -0,0 +1,49 @@
+from google.protobuf.json_format import MessageToDict
+
+from components.steam.demo import extract_demo_url, extract_demo_url_scan, extract_match_demos, match_demo_url
+from components.steam.fixtures import build_match_list, build_recent_games
+
+MATCH_ID = 3_600_000_000_000_000_123
+OUTCOME_ID = 3_600_000_000_000_000_500
+TOKEN = 4242
+URL = "http://replay183.valve.net/730/003600000000000000123_0000004242.dem.bz2"
+
+
+def test_url_from_last_round():
+    msg = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN)
+    assert extract_demo_url(msg, MATCH_ID, TOKEN) == URL
+    assert match_demo_url(msg.matches[0], MATCH_ID, TOKEN) == URL
+
+
+def test_url_from_replay_prefix():
+    msg = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN)
+    msg.matches[0].roundstatsall[-1].map = "http://replay183.valve.net/730/"
+    assert extract_demo_url(msg, MATCH_ID, TOKEN) == URL
+
+
+def test_url_from_legacy_round_stats():
+    msg = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN)
+    del msg.matches[0].roundstatsall[:]
+    msg.matches[0].roundstats_legacy.map = URL
+    assert extract_demo_url(msg, MATCH_ID, TOKEN) == URL
+
+
+def test_match_without_demo():
+    msg = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN)
+    msg.matches[0].roundstatsall[-1].map = ""
+    assert extract_demo_url(msg, MATCH_ID, TOKEN) is None
+
+
+def test_scan_of_plain_objects_agrees_with_the_typed_path():
+    msg = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN)
+    assert extract_demo_url_scan(MessageToDict(msg), MATCH_ID, TOKEN) == URL
+    assert extract_demo_url_scan({"server": "replay183.valve.net"}, MATCH_ID, TOKEN) == URL
+    assert extract_demo_url_scan({"nothing": "here"}, MATCH_ID, TOKEN) is None
+
+
+def test_recent_games():
+    demos = extract_match_demos(build_recent_games(39734289, matches=5))
+    assert len(demos) == 5
+    for demo in demos:
+        assert demo.demo_url == f"http://replay183.valve.net/730/{demo.match_id:021d}_{demo.token:010d}.dem.bz2"
+        assert demo.outcome_id
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from components.cache.constants import DemoVerifyStatus
+from components.cache.demo_url import DemoUrlCache
+from components.cache.demo_verify import DemoUrlVerifier
+
+MATCH = (1, 2, 3)
+
+
+@pytest.fixture
+def demo_cache(tmp_path):
+    demo_cache = DemoUrlCache(path=str(tmp_path / "demo_cache.sqlite3"))
+    yield demo_cache
+    demo_cache.close()
+
+
+def test_verified_result_is_cached(demo_cache, replay_server):
+    (replay_server.directory / "1_3.dem.bz2").write_bytes(b"x" * 1234)
+    url = f"{replay_server.url}/1_3.dem.bz2"
+    demo_cache.put(*MATCH, url)
+    verifier = DemoUrlVerifier(demo_cache, ttl_sec=60)
+
+    async def main():
+        results = await asyncio.gather(*(verifier.averify(*MATCH, url) for _ in range(5)))
+        assert set(results) == {(DemoVerifyStatus.VERIFIED, 1234)}
+        assert await verifier.averify(*MATCH, url) == (DemoVerifyStatus.VERIFIED, 1234)
+
+    asyncio.run(main())
+    verifier.close()
+    # concurrent checks share one HEAD, later ones read the cache
+    assert len(replay_server.heads) == 1
+    entry = demo_cache.get(*MATCH)
+    assert (entry.verify_status, entry.content_length) == (DemoVerifyStatus.VERIFIED, 1234)
+
+
+def test_missing_then_expired(demo_cache, replay_server):
+    url = f"{replay_server.url}/1_3.dem.bz2"
+    demo_cache.put(*MATCH, url)
+    verifier = DemoUrlVerifier(demo_cache, ttl_sec=0)
+
+    async def main():
+        assert await verifier.averify(*MATCH, url) == (DemoVerifyStatus.MISSING, None)
+
+        (replay_server.directory / "1_3.dem.bz2").write_bytes(b"x")
+        assert (await verifier.averify(*MATCH, url))[0] == DemoVerifyStatus.VERIFIED
+
+        # gone after it was there: expired, and trusted for good
+        (replay_server.directory / "1_3.dem.bz2").unlink()
+        assert await verifier.averify(*MATCH, url) == (DemoVerifyStatus.EXPIRED, None)
+        heads = len(replay_server.heads)
+        assert await verifier.averify(*MATCH, url) == (DemoVerifyStatus.EXPIRED, None)
+        assert len(replay_server.heads) == heads
+
+    asyncio.run(main())
+    verifier.close()
+
+
+def test_unreachable_server_is_unknown_and_not_stored(demo_cache):
+    url = "http://127.0.0.1:9/1_3.dem.bz2"
+    demo_cache.put(*MATCH, url)
+    verifier = DemoUrlVerifier(demo_cache, timeout_sec=1)
+
+    assert asyncio.run(verifier.averify(*MATCH, url)) == (DemoVerifyStatus.UNKNOWN, None)
+    verifier.close()
+    assert demo_cache.get(*MATCH).verify_status is None
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from components.jobs.constants import JobCallbackStatus, JobItemState, JobStatus
+from components.jobs.runner import JobRunner
+from components.jobs.store import JobItem, JobStore
+from components.steam.constants import DemoLookupStatus
+from components.steam.steam import SteamAPIException, SteamGCUnavailableException
+
+MATCH_ID = 3_600_000_000_000_000_123
+OUTCOME_ID = 9_300_000_000_000_000_500
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def _items(count: int) -> list[JobItem]:
+    return [
+        JobItem(
+            job_id="",
+            position=position,
+            match_code=f"code-{position}",
+            match_id=MATCH_ID + position,
+            outcome_id=OUTCOME_ID,
+            token=position,
+        )
+        for position in range(count)
+    ]
+
+
+def test_claim_finish(store):
+    job_id = store.create_job(_items(2), callback_url="http://callback")
+
+    first, second = store.claim(2)
+    assert (first.state, first.attempts) == (JobItemState.RUNNING, 1)
+    assert (first.match_id, first.outcome_id) == (MATCH_ID, OUTCOME_ID)
+    assert store.claim(1) == []
+
+    assert not store.finish(first, DemoLookupStatus.OK, demo_url="url-0")
+    assert store.finish(second, DemoLookupStatus.NO_URL)
+    # a second finish of the same item does not count twice
+    assert not store.finish(second, DemoLookupStatus.OK)
+
+    job = store.get_job(job_id)
+    assert (job.status, job.remaining, job.callback_status) == (JobStatus.DONE, 0, JobCallbackStatus.PENDING)
+    assert [(item.state, item.status, item.demo_url) for item in job.items] == [
+        (JobItemState.FINISHED, DemoLookupStatus.OK, "url-0"),
+        (JobItemState.FINISHED, DemoLookupStatus.NO_URL, None),
+    ]
+    assert store.pending_callbacks() == [job_id]
+    store.set_callback_status(job_id, JobCallbackStatus.DELIVERED)
+    assert store.pending_callbacks() == []
+
+
+def test_items_finished_on_creation(store):
+    invalid = JobItem(
+        job_id="", position=0, match_code="bogus", state=JobItemState.FINISHED, status=DemoLookupStatus.INVALID_CODE
+    )
+    job_id = store.create_job([invalid])
+    assert store.get_job(job_id).status == JobStatus.DONE
+    assert store.claim(1) == []
+
+
+def test_retry_delay(store, monkeypatch):
+    import components.jobs.store as store_module
+
+    now = [1_000_000.0]
+    monkeypatch.setattr(store_module.time, "time", lambda: now[0])
+    store.create_job(_items(1))
+
+    (item,) = store.claim(1)
+    store.retry(item, delay_sec=30, detail="later")
+    assert store.claim(1) == []
+
+    now[0] += 31
+    (item,) = store.claim(1)
+    assert (item.attempts, item.detail) == (2, "later")
+
+    store.retry(item, delay_sec=0, count_attempt=False)
+    (item,) = store.claim(1)
+    assert item.attempts == 2
+
+
+def test_retry_of_finished_item_is_ignored(store):
+    store.create_job(_items(1))
+    (item,) = store.claim(1)
+    store.finish(item, DemoLookupStatus.OK, demo_url="url")
+    store.retry(item, delay_sec=0)
+    assert store.claim(1) == []
+    assert store.queue_depth() == 0
+
+
+def test_requeue_running_of_own_slot(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = JobStore(path, owner=0), JobStore(path, owner=1)
+    first.create_job(_items(2))
+    first.claim(1)
+    second.claim(1)
+
+    # the process that held slot 0 died: its replacement takes back only slot 0's items
+    replacement = JobStore(path, owner=0)
+    assert replacement.requeue_running() == 1
+    (item,) = replacement.claim(1)
+    assert item.position == 0
+    for store in (first, second, replacement):
+        store.close()
+
+
+class _LookupPool:
+    """
+    Stands in for SteamAPIPool.aget_demo_url, answering from a list of results or exceptions.
+    """
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def aget_demo_url(self, match_id, outcome_id, token, priority):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result, False
+
+
+async def _run_until_done(store: JobStore, runner: JobRunner, job_id: str):
+    runner.start()
+    try:
+        async with asyncio.timeout(10):
+            while (job := await store.aget_job(job_id)).status != JobStatus.DONE:
+                await asyncio.sleep(0.01)
+    finally:
+        await runner.stop()
+    return job
+
+
+def test_runner_unavailable_gc_does_not_use_up_attempts(store):
+    unavailable = SteamGCUnavailableException("GC down", retry_after=0)
+    pool = _LookupPool([unavailable, unavailable, unavailable, "url"])
+    runner = JobRunner(store, pool, workers=1, max_attempts=2, retry_delay_sec=0)
+    job_id = store.create_job(_items(1))
+
+    job = asyncio.run(_run_until_done(store, runner, job_id))
+    assert pool.calls == 4
+    assert (job.items[0].status, job.items[0].demo_url, job.items[0].attempts) == (DemoLookupStatus.OK, "url", 1)
+
+
+def test_runner_gives_up_after_max_attempts(store):
+    pool = _LookupPool([SteamAPIException("boom")] * 3)
+    runner = JobRunner(store, pool, workers=1, max_attempts=3, retry_delay_sec=0)
+    job_id = store.create_job(_items(1))
+
+    job = asyncio.run(_run_until_done(store, runner, job_id))
+    assert pool.calls == 3
+    assert (job.items[0].status, job.items[0].detail) == (DemoLookupStatus.ERROR, "boom")
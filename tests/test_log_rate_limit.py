@@ -0,0 +1,36 @@
+import logging
+
+from components.logs.handlers import RateLimitFilter
+
+
+def make_record(msg, level=logging.WARNING, args=None):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+def test_suppressed_records_are_counted_in_the_next_one():
+    rate_limit = RateLimitFilter(burst=2, window_sec=0)
+    rate_limit.window_sec = 3600
+    passed = [rate_limit.filter(make_record("GC timeout for %s", args=(n,))) for n in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # the window is over: the next record says how many were dropped
+    rate_limit.window_sec = 0
+    record = make_record("GC timeout for %s", args=(5,))
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "GC timeout for 5 (3 similar messages suppressed)"
+
+
+def test_keys_on_the_template_and_level():
+    rate_limit = RateLimitFilter(burst=1, window_sec=3600)
+    assert rate_limit.filter(make_record("first %s", args=(1,)))
+    assert not rate_limit.filter(make_record("first %s", args=(2,)))
+    assert rate_limit.filter(make_record("second"))
+    assert rate_limit.filter(make_record("first %s", level=logging.ERROR, args=(3,)))
+    # logger.exception(exc): keyed on the exception type
+    assert rate_limit.filter(make_record(TimeoutError("a")))
+    assert not rate_limit.filter(make_record(TimeoutError("b")))
+
+
+def test_records_below_min_level_pass():
+    rate_limit = RateLimitFilter(burst=1, window_sec=3600)
+    assert all(rate_limit.filter(make_record("request", level=logging.INFO)) for _ in range(10))
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from components.steam.match_code import (
+    MatchRef,
+    decode_match_code,
+    decode_match_codes,
+    encode_match_code,
+    encode_match_codes,
+)
+
+# a share code and its ids, as decoded by csgo.sharecode
+KNOWN_CODE = "CSGO-GADqf-jjyJ8-cSP2r-smZRo-TO2xK"
+KNOWN_REF = MatchRef(3230642215713767580, 3230647599455273103, 55788)
+
+
+def test_known_code():
+    assert decode_match_code(KNOWN_CODE) == KNOWN_REF
+    assert encode_match_code(*KNOWN_REF) == KNOWN_CODE
+
+
+def test_round_trip():
+    rng = random.Random(25)
+    for _ in range(1000):
+        ref = MatchRef(rng.getrandbits(64), rng.getrandbits(64), rng.getrandbits(16))
+        assert decode_match_code(encode_match_code(*ref)) == ref
+
+
+def test_extremes_round_trip():
+    for ref in (MatchRef(0, 0, 0), MatchRef(2**64 - 1, 2**64 - 1, 2**16 - 1)):
+        assert decode_match_code(encode_match_code(*ref)) == ref
+
+
+def test_prefix_and_dashes_are_optional():
+    bare = KNOWN_CODE.removeprefix("CSGO-")
+    assert decode_match_code(bare) == KNOWN_REF
+    assert decode_match_code(bare.replace("-", "")) == KNOWN_REF
+
+
+def test_compatible_with_csgo_sharecode():
+    sharecode = pytest.importorskip("csgo.sharecode")
+    rng = random.Random(1)
+    for _ in range(100):
+        ref = MatchRef(rng.getrandbits(64), rng.getrandbits(64), rng.getrandbits(16))
+        code = encode_match_code(*ref)
+        assert sharecode.encode(*ref) == code
+        decoded = sharecode.decode(code)
+        assert MatchRef(decoded["matchid"], decoded["outcomeid"], decoded["token"]) == ref
+
+
+@pytest.mark.parametrize(
+    "match_code",
+    [
+        "",
+        "CSGO-",
+        KNOWN_CODE[:-1],
+        KNOWN_CODE + "a",
+        # 0, 1, I and l are not in the alphabet
+        KNOWN_CODE[:-1] + "0",
+        KNOWN_CODE[:-1] + "l",
+        # 25 digits above 144 bits
+        "CSGO-99999-99999-99999-99999-99999",
+    ],
+)
+def test_invalid_codes(match_code):
+    with pytest.raises(ValueError):
+        decode_match_code(match_code)
+
+
+def test_batch_decode_keeps_errors_in_place():
+    decoded = decode_match_codes([KNOWN_CODE, "bogus", KNOWN_CODE])
+    assert decoded[0] == decoded[2] == KNOWN_REF
+    assert isinstance(decoded[1], ValueError)
+
+
+def test_batch_encode():
+    assert encode_match_codes([KNOWN_REF, tuple(KNOWN_REF)]) == [KNOWN_CODE, KNOWN_CODE]
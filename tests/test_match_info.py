@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from components.steam.fixtures import build_match_list
+from components.steam.match_code import encode_match_code
+from components.steam.match_info import MATCH_INFO_FIELDS, compact_match, parse_match_fields, parse_match_info
+
+MATCH_ID = 3_600_000_000_000_000_123
+OUTCOME_ID = 3_600_000_000_000_000_500
+TOKEN = 4242
+
+
+def test_compact_match_keeps_what_match_info_reads():
+    match = build_match_list(MATCH_ID, OUTCOME_ID, TOKEN, rounds=30).matches[0]
+    data = compact_match(match)
+    assert len(data) < len(match.SerializeToString()) / 10
+
+    info = parse_match_info(data, MATCH_ID, OUTCOME_ID, TOKEN)
+    last_round = match.roundstatsall[-1]
+    assert (info.match_time, info.map, info.rounds, info.duration) == (1700000000, "de_mirage", 30, 30 * 110)
+    assert info.team_scores == tuple(last_round.team_scores)
+    assert info.demo_url == last_round.map
+    assert [player.account_id for player in info.players] == list(last_round.reservation.account_ids)
+    assert [player.kills for player in info.players] == list(last_round.kills)
+
+
+def test_only_requested_fields_are_parsed():
+    data = compact_match(build_match_list(MATCH_ID, OUTCOME_ID, TOKEN).matches[0])
+    info = parse_match_info(data, MATCH_ID, OUTCOME_ID, TOKEN, fields={"map", "rounds"})
+    assert (info.map, info.rounds) == ("de_mirage", 30)
+    assert info.players is None and info.demo_url is None
+
+
+def test_parse_match_fields():
+    assert parse_match_fields(None) == MATCH_INFO_FIELDS
+    assert parse_match_fields(" map, rounds ,") == {"map", "rounds"}
+    with pytest.raises(ValueError):
+        parse_match_fields("map,bogus")
+
+
+def test_match_endpoint_projects_fields(running_app):
+    code = encode_match_code(3_600_000_000_000_024_001, 3_600_000_000_000_024_002, 7)
+
+    async def main():
+        async with running_app() as (app, client):
+            response = await client.get("/api/cs2/match/", params={"match_code": code, "fields": "map,rounds"})
+            assert response.status_code == 200
+            assert set(response.json()) == {"match_code", "match_id", "outcome_id", "token", "map", "rounds"}
+            assert response.headers["Cache-Status"].endswith("stored")
+
+            # served from the cached match info, the demo URL lookup included
+            response = await client.get("/api/cs2/match/", params={"match_code": code})
+            assert response.json()["players"]
+            response = await client.get("/api/cs2/demo/", params={"match_code": code})
+            assert response.headers["Cache-Status"] == "pvb-steamapi; hit"
+            assert app.state.steam_pool.stats().gc_requests == 1
+
+            response = await client.get("/api/cs2/match/", params={"match_code": code, "fields": "bogus"})
+            assert response.status_code == 400
+
+    asyncio.run(main())
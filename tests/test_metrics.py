@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from components.metrics.prometheus import Registry
+
+
+def test_render():
+    registry = Registry()
+    requests = registry.counter("test_requests", "Requests", ["result"])
+    depth = registry.gauge("test_depth", "Queue depth")
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.labels("hit").inc()
+    requests.labels(result='quoted "miss"\n').inc(2)
+    depth.set(1.5)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_requests Requests",
+        "# TYPE test_requests counter",
+        'test_requests_total{result="hit"} 1',
+        'test_requests_total{result="quoted \\"miss\\"\\n"} 2',
+        "# HELP test_depth Queue depth",
+        "# TYPE test_depth gauge",
+        "test_depth 1.5",
+        "# HELP test_latency_seconds Latency",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        "test_latency_seconds_sum 5.55",
+        "test_latency_seconds_count 3",
+    ]
+
+
+def test_counts_from_every_thread_add_up():
+    registry = Registry()
+    counter = registry.counter("test_increments", "Increments")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert "test_increments_total 80000" in registry.render()
+
+
+def test_gauge_function_and_remove():
+    registry = Registry()
+    gauge = registry.gauge("test_status", "Status", ["account"])
+    gauge.labels("a").set_function(lambda: 3)
+    gauge.labels("b").set(1)
+    gauge.remove("b")
+    assert registry.render().splitlines()[2:] == ['test_status{account="a"} 3']
+
+
+def test_duplicate_names_are_rejected():
+    registry = Registry()
+    registry.counter("test_total", "Total")
+    with pytest.raises(ValueError):
+        registry.gauge("test_total", "Total")
+
+
+def test_metrics_endpoint(running_app):
+    async def main():
+        async with running_app() as (_, client):
+            await client.get("/api/ping/")
+            # scraped without an API key
+            response = await client.get("/metrics", headers={"X-API-Key": ""})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+            assert "# TYPE pvb_gc_requests counter" in response.text
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from components.steam.match_code import decode_match_code
+
+STEAMID = "76561198000000017"
+ACCOUNT_ID = 39734289
+
+
+def test_player_demos(running_app):
+    async def main():
+        async with running_app() as (app, client):
+            response = await client.get(f"/api/cs2/players/{STEAMID}/demos")
+            assert response.status_code == 200
+            body = response.json()
+            assert (body["steamid"], body["account_id"]) == (STEAMID, ACCOUNT_ID)
+            assert body["matches"]
+            for match in body["matches"]:
+                assert tuple(decode_match_code(match["match_code"])) == (
+                    match["match_id"],
+                    match["outcome_id"],
+                    match["token"],
+                )
+
+            # the recent games put the demo URLs of the matches in the cache
+            match = next(match for match in body["matches"] if match["demo_url"])
+            entry = await app.state.steam_pool.demo_cache.aget(match["match_id"], match["outcome_id"], match["token"])
+            assert entry.demo_url == match["demo_url"]
+
+            assert (await client.get("/api/cs2/players/bogus/demos")).status_code == 400
+
+    asyncio.run(main())
+
+
+def test_player_demos_batch(running_app):
+    steamids = [STEAMID, "bogus", "76561198000000018"]
+
+    async def main():
+        async with running_app() as (_, client):
+            response = await client.post("/api/cs2/players/demos/", json={"steamids": steamids})
+            items = [json.loads(line) for line in response.text.splitlines()]
+            assert (items[0]["steamid"], items[0]["status"]) == ("bogus", "invalid_steamid")
+            assert sorted(item["steamid"] for item in items[1:]) == sorted([STEAMID, "76561198000000018"])
+            assert all(item["status"] == "ok" and item["matches"] for item in items[1:])
+
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from components.steam.constants import LookupPriority
+from components.steam.match_code import encode_match_code
+from components.steam.steam import SteamGCUnavailableException
+
+
+def test_pick_ready_account(running_app):
+    async def main():
+        async with running_app() as (app, _):
+            pool = app.state.steam_pool
+            assert pool.pick(LookupPriority.INTERACTIVE) is pool.accounts["a"]
+
+    asyncio.run(main())
+
+
+def test_no_logged_in_account_is_retryable(running_app):
+    code = encode_match_code(3_600_000_000_000_005_001, 3_600_000_000_000_005_002, 1)
+
+    async def main():
+        async with running_app() as (app, client):
+            pool = app.state.steam_pool
+            for steam_api in pool.accounts.values():
+                steam_api.login_user = None
+
+            with pytest.raises(SteamGCUnavailableException) as exc_info:
+                pool.pick()
+            assert exc_info.value.retry_after >= 0
+
+            response = await client.get("/api/cs2/demo/", params={"match_code": code})
+            assert response.status_code == 503
+            assert "Retry-After" in response.headers
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+import time
+
+import gevent
+import pytest
+from starlette.requests import Request
+
+from components.admission.clients import ApiClient
+from components.steam.constants import LookupPriority
+from components.steam.scheduler import GCScheduler, GCTicket
+from utils.priority import request_priority
+
+
+def _grant_order(scheduler: GCScheduler, lanes: list[LookupPriority]) -> list[LookupPriority]:
+    """
+    Queues a ticket per lane while the only slot is taken, then frees it: the order the tickets are granted in.
+    """
+    hold = GCTicket(LookupPriority.INTERACTIVE)
+    assert scheduler.acquire(hold)
+
+    granted = []
+
+    def lookup(lane):
+        assert scheduler.acquire(GCTicket(lane), timeout=5)
+        granted.append(lane)
+        scheduler.release()
+
+    greenlets = [gevent.spawn(lookup, lane) for lane in lanes]
+    gevent.sleep(0)
+    scheduler.release()
+    gevent.joinall(greenlets, raise_error=True)
+    return granted
+
+
+def test_interactive_first_with_bulk_min_share():
+    scheduler = GCScheduler(max_in_flight=1, rate_per_sec=0, burst=0, bulk_min_share=0.25)
+    granted = _grant_order(scheduler, [LookupPriority.BULK] * 8 + [LookupPriority.INTERACTIVE] * 8)
+
+    interactive, bulk = LookupPriority.INTERACTIVE, LookupPriority.BULK
+    # one grant in four goes to bulk while both lanes wait, the rest of bulk after the interactive lane drained
+    assert granted == [interactive] * 3 + [bulk] + [interactive] * 3 + [bulk] + [interactive] * 2 + [bulk] * 6
+
+
+def test_bulk_only():
+    scheduler = GCScheduler(max_in_flight=1, rate_per_sec=0, burst=0, bulk_min_share=0.25)
+    assert _grant_order(scheduler, [LookupPriority.BULK] * 3) == [LookupPriority.BULK] * 3
+
+
+def test_promote_moves_a_waiting_ticket():
+    scheduler = GCScheduler(max_in_flight=1, rate_per_sec=0, burst=0, bulk_min_share=0)
+    hold = GCTicket(LookupPriority.INTERACTIVE)
+    scheduler.acquire(hold)
+
+    tickets = [GCTicket(LookupPriority.BULK), GCTicket(LookupPriority.INTERACTIVE)]
+    greenlets = [gevent.spawn(scheduler.acquire, ticket) for ticket in tickets]
+    gevent.sleep(0)
+    # an interactive caller joined the bulk lookup: it moves to the back of the interactive lane
+    scheduler.promote(tickets[0], LookupPriority.INTERACTIVE)
+    assert scheduler.queue_depth(LookupPriority.BULK) == 0
+    assert scheduler.queue_depth(LookupPriority.INTERACTIVE) == 2
+
+    scheduler.release()
+    gevent.sleep(0)
+    assert tickets[1].granted and not tickets[0].granted
+    scheduler.release()
+    gevent.joinall(greenlets)
+    assert tickets[0].granted
+
+
+def test_rate_limit():
+    scheduler = GCScheduler(max_in_flight=10, rate_per_sec=20, burst=1, bulk_min_share=0)
+    started = time.monotonic()
+    for _ in range(5):
+        assert scheduler.acquire(GCTicket(LookupPriority.INTERACTIVE), timeout=5)
+    # the first one from the burst, then one every 50ms
+    assert time.monotonic() - started >= 0.19
+
+
+def test_acquire_timeout_leaves_the_queue():
+    scheduler = GCScheduler(max_in_flight=1, rate_per_sec=0, burst=0, bulk_min_share=0)
+    assert scheduler.acquire(GCTicket(LookupPriority.INTERACTIVE))
+    assert not scheduler.acquire(GCTicket(LookupPriority.INTERACTIVE), timeout=0.01)
+    assert scheduler.queue_depth(LookupPriority.INTERACTIVE) == 0
+
+
+def _request(header=None, client_priority=None) -> Request:
+    headers = [(b"x-priority", header.encode())] if header is not None else []
+    state = {}
+    if client_priority is not None:
+        state["api_client"] = ApiClient(name="c", key="k", priority=client_priority)
+    return Request({"type": "http", "headers": headers, "state": state})
+
+
+@pytest.mark.parametrize(
+    "header, client_priority, expected",
+    [
+        (None, None, LookupPriority.INTERACTIVE),
+        ("bulk", None, LookupPriority.BULK),
+        (" Bulk ", LookupPriority.INTERACTIVE, LookupPriority.BULK),
+        (None, LookupPriority.BULK, LookupPriority.BULK),
+        # the header cannot put a bulk client in the interactive lane
+        ("interactive", LookupPriority.BULK, LookupPriority.BULK),
+        ("interactive", None, LookupPriority.INTERACTIVE),
+    ],
+)
+def test_request_priority(header, client_priority, expected):
+    assert request_priority(_request(header, client_priority)) == expected
+
+
+def test_request_priority_rejects_unknown_lanes():
+    with pytest.raises(ValueError):
+        request_priority(_request("urgent"))
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import app as app_module
+from components.steam.match_code import encode_match_code
+from components.steam.retry import RetryBudget
+from components.steam.timeouts import AdaptiveTimeout
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, min_per_sec=0, max_tokens=2)
+    assert budget.try_withdraw()
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+    # two lookups earn one retry
+    budget.deposit()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    assert budget.try_withdraw()
+
+
+def test_retry_budget_refills_over_time(monkeypatch):
+    import components.steam.retry as retry_module
+
+    now = [1000.0]
+    monkeypatch.setattr(retry_module.time, "monotonic", lambda: now[0])
+    budget = RetryBudget(ratio=0, min_per_sec=2, max_tokens=1)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+    now[0] += 0.5
+    assert budget.try_withdraw()
+    # never more than max_tokens, however long it was idle
+    now[0] += 60
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+
+def test_adaptive_timeout():
+    timeout = AdaptiveTimeout(min_sec=1, max_sec=60, factor=3, window=100)
+    assert timeout.value == 60
+
+    for _ in range(100):
+        timeout.observe(0.5)
+    assert timeout.value == 1.5
+
+    # recomputed every 32 samples, once the slow ones left the window
+    for _ in range(128):
+        timeout.observe(0.01)
+    assert timeout.value == 1
+
+    for _ in range(1000):
+        timeout.observe(100)
+    assert timeout.value == 60
+
+
+def test_coalesced_caller_keeps_its_own_deadline(running_app, monkeypatch):
+    monkeypatch.setattr(app_module, "STEAM_FAKE_LATENCY_SEC", 0.5)
+    code = encode_match_code(3_600_000_000_000_012_001, 3_600_000_000_000_012_002, 1)
+
+    async def main():
+        async with running_app() as (app, client):
+            async def follower():
+                await asyncio.sleep(0.05)
+                return await client.get("/api/cs2/demo/", params={"match_code": code})
+
+            leader, follower = await asyncio.gather(
+                client.get("/api/cs2/demo/", params={"match_code": code, "timeout_ms": 100}), follower()
+            )
+            # the leader's deadline does not cut short the lookup the follower joined
+            assert leader.status_code == 504
+            assert follower.status_code == 200
+            assert follower.json()["demo_url"]
+            assert app.state.steam_pool.stats().gc_requests == 1
+
+    asyncio.run(main())
+
+
+def test_request_deadline_validation(running_app):
+    code = encode_match_code(3_600_000_000_000_012_003, 3_600_000_000_000_012_004, 1)
+
+    async def main():
+        async with running_app() as (_, client):
+            for params, headers in (({"timeout_ms": 0}, {}), ({}, {"X-Request-Timeout-Ms": "soon"})):
+                response = await client.get("/api/cs2/demo/", params={"match_code": code, **params}, headers=headers)
+                assert response.status_code == 400
+
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import components.workers.claims as claims_module
+from components.cache.demo_files import DemoFileCache
+from components.workers.claims import LookupClaims
+from components.workers.slots import WorkerSlot, WorkerSlotException
+
+MATCH_ID = 3_600_000_000_000_000_123
+
+
+@pytest.fixture
+def claims_path(tmp_path):
+    return str(tmp_path / "lookup_claims.sqlite3")
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_claim_is_exclusive_and_reentrant(claims_path):
+    # the other worker: a live process that is not this one
+    mine, theirs = LookupClaims(claims_path), LookupClaims(claims_path, owner=os.getppid())
+
+    assert mine.try_claim(MATCH_ID)
+    assert mine.try_claim(MATCH_ID)
+    assert not theirs.try_claim(MATCH_ID)
+    assert theirs.claimed_elsewhere(MATCH_ID)
+    assert not mine.claimed_elsewhere(MATCH_ID)
+
+    # held twice: the first release keeps it
+    mine.release(MATCH_ID)
+    assert theirs.claimed_elsewhere(MATCH_ID)
+    mine.release(MATCH_ID)
+    assert not theirs.claimed_elsewhere(MATCH_ID)
+    assert theirs.try_claim(MATCH_ID)
+    mine.close()
+    theirs.close()
+
+
+def test_claim_of_dead_process_is_taken_over(claims_path):
+    dead, alive = LookupClaims(claims_path, owner=_dead_pid()), LookupClaims(claims_path)
+    assert dead.try_claim(MATCH_ID)
+    assert not alive.claimed_elsewhere(MATCH_ID)
+    assert alive.try_claim(MATCH_ID)
+    dead.close()
+    alive.close()
+
+
+def test_expired_claim_is_taken_over(claims_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(claims_module.time, "time", lambda: now[0])
+    # hung mid-lookup, still alive
+    hung, other = LookupClaims(claims_path, ttl_sec=60, owner=os.getppid()), LookupClaims(claims_path, ttl_sec=60)
+    assert hung.try_claim(MATCH_ID)
+    assert not other.try_claim(MATCH_ID)
+
+    now[0] += 61
+    assert other.try_claim(MATCH_ID)
+    assert hung.claimed_elsewhere(MATCH_ID)
+    hung.close()
+    other.close()
+
+
+def test_busy_table_fails_fast(claims_path):
+    claims = LookupClaims(claims_path, busy_timeout_sec=0.05)
+    blocker = sqlite3.connect(claims_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            claims.try_claim(MATCH_ID)
+        # unknown counts as not claimed: waiters go on with the lookup themselves
+        assert not asyncio.run(claims.aclaimed_elsewhere(MATCH_ID))
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert asyncio.run(claims.atry_claim(MATCH_ID))
+    claims.close()
+
+
+def test_worker_slots(tmp_path):
+    lock_dir = str(tmp_path / "workers")
+    first, second = WorkerSlot.acquire(lock_dir, 2), WorkerSlot.acquire(lock_dir, 2)
+    assert (first.index, second.index) == (0, 1)
+    with pytest.raises(WorkerSlotException):
+        WorkerSlot.acquire(lock_dir, 2)
+
+    # a replacement inherits the slot of the worker that went away
+    first.release()
+    replacement = WorkerSlot.acquire(lock_dir, 2)
+    assert replacement.index == 0
+
+    accounts = ["a", "b", "c"]
+    assert replacement.accounts(accounts) == ["a", "c"]
+    assert second.accounts(accounts) == ["b"]
+    with pytest.raises(WorkerSlotException):
+        second.accounts(["a"])
+    replacement.release()
+    second.release()
+
+
+def test_demo_file_is_downloaded_once_for_all_slots(tmp_path, replay_server):
+    (replay_server.directory / "1_2.dem").write_bytes(b"x" * 1000)
+    url = f"{replay_server.url}/1_2.dem"
+    root = str(tmp_path / "demos")
+    slots = [WorkerSlot(index, 2, -1) for index in range(2)]
+    caches = [
+        DemoFileCache(slot.directory(root), max_bytes=1500, sibling_paths=slot.sibling_directories(root))
+        for slot in slots
+    ]
+
+    async def main():
+        paths = []
+        for cache in caches:
+            filepath, _ = await cache.aget(url)
+            cache.release(filepath)
+            paths.append(filepath)
+        return paths
+
+    first, second = asyncio.run(main())
+    assert len(replay_server.hits) == 1
+    assert first != second
+    assert os.path.samefile(first, second)
+
+    # evicting its own copy does not take the file from the other slot
+    (replay_server.directory / "3_4.dem").write_bytes(b"y" * 1000)
+    asyncio.run(caches[0].aget(f"{replay_server.url}/3_4.dem"))
+    assert not os.path.exists(first)
+    assert open(second, "rb").read() == b"x" * 1000
+    for cache in caches:
+        cache.close()